@@ -1,25 +1,27 @@
 # Plik inicjalizacyjny pakietu
 # Może pozostać pusty, ponieważ cała logika inicjalizacji jest w app.py 
 
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from flask_principal import Principal, Permission, RoleNeed
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config
 import logging
-from sqlalchemy import event
-import locale
-import math
-
-# Ustawienie locale na polski
-try:
-    locale.setlocale(locale.LC_ALL, 'pl_PL.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'Polish_Poland.1250')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from utils.ingest_jobs import ingest_queue
+from utils.upload_cache import parse_cache
+from utils.sql_instrumentation import sql_instrumentation
+from utils.pool_metrics import configure_pool, pool_metrics
+from utils.user_cache import user_cache
+from utils.role_cache import role_cache
+from utils.server_session import server_sessions
+from utils.auth_activity import auth_activity
+from utils.login_guard import login_guard
+from utils.fragment_cache import fragment_cache
+from utils.s3_storage import s3_storage
+from utils.formatters import format_currency, format_exchange_rate, format_number
 
 # Konfiguracja logowania
 logging.basicConfig(
@@ -39,23 +41,6 @@ supplier_permission = Permission(RoleNeed('supplier'))
 staff_permission = Permission(RoleNeed('staff'))
 admin_permission = Permission(RoleNeed('admin'))
 
-# Funkcje obsługi zdarzeń SQLAlchemy
-def checkout_listener(dbapi_connection, connection_record, connection_proxy):
-    """Monitoruje pobranie połączenia z puli."""
-    logger.debug("Połączenie pobrane z puli")
-
-def checkin_listener(dbapi_connection, connection_record):
-    """Monitoruje zwrot połączenia do puli."""
-    logger.debug("Połączenie zwrócone do puli")
-
-def connect_listener(dbapi_connection, connection_record):
-    """Monitoruje utworzenie nowego połączenia."""
-    logger.debug("Nowe połączenie utworzone")
-
-def close_listener(dbapi_connection, connection_record):
-    """Monitoruje zamknięcie połączenia."""
-    logger.debug("Połączenie zamknięte")
-
 def create_app(config_name='default'):
     app = Flask(__name__)
     
@@ -63,11 +48,28 @@ def create_app(config_name='default'):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
+    # Za odwrotnym proxy (nginx, load balancer) adres klienta pochodzi z X-Forwarded-For -
+    # request.remote_addr używają m.in. limity prób logowania. TRUSTED_PROXY_COUNT to liczba
+    # zaufanych proxy przed aplikacją; bez proxy nagłówki nie są brane pod uwagę (klient mógłby je podrobić).
+    trusted_proxies = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+    
+    # Ustawienia puli połączeń (per środowisko lub ze zmiennych środowiskowych)
+    configure_pool(app)
+    
     # Inicjalizacja rozszerzeń
     db.init_app(app)
+    server_sessions.init_app(app)
+    login_guard.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
     principals.init_app(app)
+    ingest_queue.init_app(app)
+    parse_cache.init_app(app)
+    sql_instrumentation.init_app(app)
+    pool_metrics.init_app(app)
+    s3_storage.init_app(app)
     
     # Konfiguracja CSRF
     app.config['WTF_CSRF_ENABLED'] = True
@@ -79,8 +81,7 @@ def create_app(config_name='default'):
     login_manager.login_message = 'Proszę się zalogować, aby uzyskać dostęp.'
     login_manager.login_message_category = 'warning'
     
-    @login_manager.user_loader
-    def load_user(user_id):
+    def query_user(user_id):
         # Sprawdzamy najpierw, czy ID zaczyna się od 'SUP/' (dostawca)
         if user_id.startswith('SUP/'):
             from models.supplier.supplier import Supplier
@@ -94,39 +95,43 @@ def create_app(config_name='default'):
             from models.MAIN.user import User
             return User.query.get(user_id)
     
+    @login_manager.user_loader
+    def load_user(user_id):
+        # Odłączona kopia użytkownika z pamięci podręcznej - baza odpytywana tylko przy braku wpisu
+        return user_cache.load(user_id, query_user)
+    
     # Konfiguracja Flask-Principal
     from flask_login import current_user
     from flask_principal import identity_loaded, UserNeed, RoleNeed
     
+    def query_staff_role(related_id):
+        # Rola pracownika z danych logowania (admin lub staff)
+        from models.MAIN.user import User
+        role = User.query.with_entities(User.role).filter_by(related_id=related_id).scalar()
+        return 'admin' if role == 'admin' else 'staff'
+    
     @identity_loaded.connect_via(app)
     def on_identity_loaded(sender, identity):
-        # Dodaj logi do śledzenia procesu
-        logger.info(f"Identity loaded: {identity.id}")
-        
         # Dodaj UserNeed do tożsamości
         if hasattr(current_user, 'get_id') and current_user.get_id() is not None:
             identity.provides.add(UserNeed(current_user.get_id()))
-            logger.info(f"Added UserNeed: {current_user.get_id()}")
         
         # Dodaj RoleNeed na podstawie typu użytkownika
         if hasattr(current_user, 'id_supplier'):
             identity.provides.add(RoleNeed('supplier'))
-            logger.info("Added RoleNeed: supplier")
         elif hasattr(current_user, 'id_staff'):
-            # Sprawdź, czy to pracownik czy administrator
-            from models.MAIN.user import User
-            user_auth = User.query.filter_by(related_id=current_user.id_staff).first()
-            if user_auth and user_auth.role == 'admin':
-                identity.provides.add(RoleNeed('admin'))
-                logger.info("Added RoleNeed: admin")
-            else:
-                identity.provides.add(RoleNeed('staff'))
-                logger.info("Added RoleNeed: staff")
+            # Rola pracownika ustalana przy logowaniu i przechowywana w sesji (role_cache)
+            identity.provides.add(RoleNeed(role_cache.resolve(current_user.id_staff)))
         
-        # Wypisz wszystkie uprawnienia
-        logger.info(f"All permissions: {identity.provides}")
+        logger.debug("Identity loaded: %s, uprawnienia: %s", identity.id, identity.provides)
     
     # Konfiguracja CSP
+    # Przeglądarka wysyła pliki dostaw bezpośrednio do S3 (podpisany formularz POST)
+    s3_upload_origin = app.config.get('S3_UPLOAD_ORIGIN') or app.config.get('S3_ENDPOINT_URL') or (
+        f"https://{app.config['S3_BUCKET']}.s3.{app.config.get('AWS_REGION')}.amazonaws.com"
+        if app.config.get('S3_BUCKET') else ''
+    )
+    
     @app.after_request
     def add_security_headers(response):
         if response.mimetype == 'text/html':
@@ -136,87 +141,28 @@ def create_app(config_name='default'):
                 "style-src 'self' 'unsafe-inline'; "
                 "img-src 'self' data: blob: https://flowbite.s3.amazonaws.com; "
                 "font-src 'self' data:; "
-                "connect-src 'self'"
+                f"connect-src 'self' {s3_upload_origin}".rstrip()
             )
         return response
     
-    # Dodanie filtrów Jinja2
-    @app.template_filter('format_number')
-    def format_number_filter(value):
-        """Formatuje liczbę w formacie polskim z dwoma miejscami po przecinku."""
-        if value is None:
-            return '0,00'
-        try:
-            # Najpierw konwertujemy na string i czyścimy
-            str_value = str(value).replace(' ', '').replace(',', '.')
-            # Konwertujemy na float i formatujemy
-            num_value = float(str_value)
-            # Używamy format zamiast locale.format_string dla większej kontroli
-            formatted = '{:,.2f}'.format(num_value)
-            # Zamieniamy separatory na format polski
-            return formatted.replace(',', ' ').replace('.', ',')
-        except (ValueError, TypeError, AttributeError) as e:
-            print(f"Błąd formatowania liczby {value}: {str(e)}")
-            return '0,00'
-    
-    @app.template_filter('format_exchange_rate')
-    def format_exchange_rate_filter(value):
-        """Formatuje kurs wymiany w formacie polskim z czterema miejscami po przecinku."""
-        if value is None:
-            return '0,0000'
-        try:
-            # Najpierw konwertujemy na string i czyścimy
-            str_value = str(value).replace(' ', '').replace(',', '.')
-            # Konwertujemy na float i formatujemy
-            num_value = float(str_value)
-            # Używamy format zamiast locale.format_string dla większej kontroli
-            formatted = '{:,.4f}'.format(num_value)
-            # Zamieniamy separatory na format polski
-            return formatted.replace(',', ' ').replace('.', ',')
-        except (ValueError, TypeError, AttributeError) as e:
-            print(f"Błąd formatowania kursu {value}: {str(e)}")
-            return '0,0000'
-    
-    @app.template_filter('format_currency')
-    def format_currency_filter(value, currency='PLN'):
-        """Formatuje kwotę w formacie polskim z symbolem waluty."""
-        if value is None:
-            return '0,00 zł' if currency == 'PLN' else '0,00 €'
-        try:
-            # Konwertujemy na float
-            num_value = float(str(value).replace(' ', '').replace(',', '.'))
-            if math.isnan(num_value):
-                return '0,00 zł' if currency == 'PLN' else '0,00 €'
-            
-            # Formatujemy liczbę w polskim stylu
-            locale.setlocale(locale.LC_ALL, 'pl_PL.UTF-8')
-            formatted = locale.format_string('%.2f', num_value, grouping=True)
-            
-            # Dodajemy symbol waluty zgodnie z polskim formatem
-            if currency == 'PLN':
-                return f'{formatted} zł'
-            elif currency == 'EUR':
-                return f'{formatted} €'
-            else:
-                return f'{formatted} {currency}'
-        except (ValueError, TypeError, AttributeError) as e:
-            print(f"Błąd formatowania waluty {value}: {str(e)}")
-            return '0,00 zł' if currency == 'PLN' else '0,00 €'
+    # Dodanie filtrów Jinja2 (formatowanie polskie bez locale - utils/formatters.py)
+    app.add_template_filter(format_number, 'format_number')
+    app.add_template_filter(format_exchange_rate, 'format_exchange_rate')
+    app.add_template_filter(format_currency, 'format_currency')
     
     with app.app_context():
         # Import modeli
         from models.MAIN.user import User
         from models.supplier.supplier import Supplier
         from models.staff.staff import Staff
+        from models.supplier.delivery_general import DeliveryGeneral
         
-        # Inicjalizacja bazy danych
-        db.create_all()
-        
-        # Rejestracja obsługi zdarzeń SQLAlchemy
-        event.listen(db.engine, 'checkout', checkout_listener)
-        event.listen(db.engine, 'checkin', checkin_listener)
-        event.listen(db.engine, 'connect', connect_listener)
-        event.listen(db.engine, 'close', close_listener)
+        # Pamięć podręczna użytkowników unieważniana po zatwierdzeniu zmian ich wierszy
+        user_cache.init_app(app, db.session, (Supplier, Staff, User))
+        role_cache.init_app(app, db.session, User, query_staff_role)
+        auth_activity.init_app(app, User.__table__)
+        # Fragmenty szablonów dostawcy unieważniane po zatwierdzeniu zmian jego dostaw
+        fragment_cache.init_app(app, db.session, DeliveryGeneral, 'id_supplier')
     
     # Rejestracja blueprintów
     from routes.MAIN.routes import main_bp
@@ -240,4 +186,11 @@ def create_app(config_name='default'):
     except ImportError:
         pass
     
+    # Schemat bazy tworzony na żądanie (flask --app app init-db), a nie przy każdym starcie workera
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Tworzy brakujące tabele bazy danych (zmiany istniejących tabel: migrations/*.sql)."""
+        db.create_all()
+        click.echo('Utworzono brakujące tabele bazy danych.')
+    
     return app 
\ No newline at end of file
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mikrobenchmark formatowania liczb: dotychczasowe filtry Jinja2 (parsowanie
+przez str(), locale.format_string) a utils/formatters.py.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/bench_formatters.py [liczba_wierszy]
+"""
+
+import locale
+import math
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.formatters import format_currency, format_number, round_number, round_numbers
+
+
+def legacy_format_number(value):
+    """Dotychczasowy filtr format_number."""
+    if value is None:
+        return '0,00'
+    try:
+        num_value = float(str(value).replace(' ', '').replace(',', '.'))
+        return '{:,.2f}'.format(num_value).replace(',', ' ').replace('.', ',')
+    except (ValueError, TypeError, AttributeError):
+        return '0,00'
+
+
+def legacy_format_currency(value, currency='PLN', locale_name='pl_PL.UTF-8'):
+    """Dotychczasowy filtr format_currency (locale ustawiane przy każdym wywołaniu)."""
+    if value is None:
+        return '0,00 zł' if currency == 'PLN' else '0,00 €'
+    try:
+        num_value = float(str(value).replace(' ', '').replace(',', '.'))
+        if math.isnan(num_value):
+            return '0,00 zł' if currency == 'PLN' else '0,00 €'
+        locale.setlocale(locale.LC_ALL, locale_name)
+        formatted = locale.format_string('%.2f', num_value, grouping=True)
+        return f'{formatted} zł' if currency == 'PLN' else f'{formatted} {currency}'
+    except (ValueError, TypeError, AttributeError):
+        return '0,00 zł' if currency == 'PLN' else '0,00 €'
+
+
+def legacy_round_number(value, decimals=2):
+    """Dotychczasowa funkcja format_number z routes/supplier/routes.py."""
+    if value is None:
+        return 0.0
+    try:
+        return round(float(str(value).replace(' ', '').replace(',', '.')), decimals)
+    except (ValueError, TypeError, AttributeError):
+        return 0.0
+
+
+def available_locale():
+    """Zwraca pl_PL.UTF-8 lub, jeśli nie jest zainstalowane, C.UTF-8 (ten sam koszt setlocale)."""
+    current = locale.setlocale(locale.LC_ALL)
+    for name in ('pl_PL.UTF-8', 'C.UTF-8'):
+        try:
+            locale.setlocale(locale.LC_ALL, name)
+            return name
+        except locale.Error:
+            continue
+        finally:
+            locale.setlocale(locale.LC_ALL, current)
+    return None
+
+
+def measure(label, func, repeat=5):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'  {label:<44} {best * 1000:9.2f} ms')
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    random.seed(0)
+    values = [Decimal(random.randint(0, 10 ** 9)) / 100 for _ in range(rows)]
+
+    assert [legacy_format_number(value) for value in values] == [format_number(value) for value in values]
+    assert [legacy_round_number(value) for value in values] == round_numbers(values)
+
+    print(f'Formatowanie {rows} wartości Decimal (najlepszy z 5 przebiegów)')
+
+    print('format_number:')
+    legacy = measure('dotychczasowy filtr (str -> float)', lambda: [legacy_format_number(v) for v in values])
+    single = measure('formatters.format_number', lambda: [format_number(v) for v in values])
+    print(f'  przyspieszenie: {legacy / single:.1f}x')
+
+    print('format_currency:')
+    locale_name = available_locale()
+    if locale_name:
+        legacy = measure(f'dotychczasowy filtr (setlocale {locale_name})',
+                         lambda: [legacy_format_currency(v, locale_name=locale_name) for v in values])
+    else:
+        legacy = None
+        print('  dotychczasowy filtr: brak locale pl_PL.UTF-8 w systemie - filtr kończył się błędem')
+    single = measure('formatters.format_currency', lambda: [format_currency(v) for v in values])
+    if legacy:
+        print(f'  przyspieszenie: {legacy / single:.1f}x')
+
+    print('zaokrąglanie do JSON (routes):')
+    legacy = measure('dotychczasowa format_number (str -> float)', lambda: [legacy_round_number(v) for v in values])
+    single = measure('formatters.round_number', lambda: [round_number(v) for v in values])
+    batch = measure('formatters.round_numbers', lambda: round_numbers(values))
+    print(f'  przyspieszenie: {legacy / single:.1f}x (pojedynczo), {legacy / batch:.1f}x (kolumna)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pomiar czasu startu procesu aplikacji: import pakietu, create_app() oraz czas
+importu poszczególnych modułów (python -X importtime). Każdy przebieg
+uruchamiany jest w nowym procesie, tak jak start workera serwera.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/bench_startup.py [--config default] [--repeat 5] [--top 20] [--json wynik.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Moduły, których załadowanie przy starcie sprawdzamy osobno
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'boto3', 'botocore')
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from __init__ import create_app
+imported = time.perf_counter()
+app = create_app(sys.argv[1])
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'factory_ms': (created - imported) * 1000,
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules]
+}))
+"""
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def run_once(config_name):
+    """Uruchamia start aplikacji w nowym procesie i zwraca (wynik, czasy importu modułów w ms)."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, config_name, *HEAVY_MODULES],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+        sys.exit('Start aplikacji zakończył się błędem:\n' + '\n'.join(errors[-20:]))
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result, modules
+
+
+def is_project_module(name):
+    return name == '__init__' or name.split('.', 1)[0] in ('routes', 'models', 'utils')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'default'), help='Nazwa konfiguracji dla create_app()')
+    parser.add_argument('--repeat', type=int, default=5, help='Liczba przebiegów (wynik: najlepszy przebieg)')
+    parser.add_argument('--top', type=int, default=20, help='Liczba wyświetlanych modułów')
+    parser.add_argument('--json', help='Zapisz wyniki do pliku JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.config) for _ in range(args.repeat)]
+    best, _ = min(runs, key=lambda run: run[0]['import_ms'] + run[0]['factory_ms'])
+    # Czas importu modułu: minimum z przebiegów (najmniej zakłócony pomiar)
+    modules = {}
+    for _, timings in runs:
+        for name, elapsed in timings.items():
+            modules[name] = min(elapsed, modules.get(name, elapsed))
+
+    print(f"Start aplikacji (konfiguracja '{args.config}', najlepszy z {args.repeat} przebiegów)")
+    print(f"  {'import pakietu aplikacji':<44} {best['import_ms']:9.1f} ms")
+    print(f"  {'create_app()':<44} {best['factory_ms']:9.1f} ms")
+    print(f"  {'razem':<44} {best['import_ms'] + best['factory_ms']:9.1f} ms")
+
+    print('Moduły ciężkie załadowane po starcie:')
+    for name in HEAVY_MODULES:
+        loaded = 'tak' if name in best['loaded'] else 'nie'
+        print(f"  {name:<44} {loaded:>9}  ({modules[name]:.1f} ms)" if name in modules else f"  {name:<44} {loaded:>9}")
+
+    print('Moduły aplikacji (czas skumulowany importu):')
+    project = sorted(((name, ms) for name, ms in modules.items() if is_project_module(name)), key=lambda item: -item[1])
+    for name, elapsed in project[:args.top]:
+        print(f"  {name:<44} {elapsed:9.1f} ms")
+
+    print('Najwolniejsze importy zewnętrzne (czas skumulowany):')
+    external = sorted(
+        ((name, ms) for name, ms in modules.items() if not is_project_module(name) and '.' not in name),
+        key=lambda item: -item[1]
+    )
+    for name, elapsed in external[:args.top]:
+        print(f"  {name:<44} {elapsed:9.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump({'config': args.config, 'best': best, 'modules_ms': modules}, output, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
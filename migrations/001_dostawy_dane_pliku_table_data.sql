@@ -0,0 +1,10 @@
+-- Kompaktowe, kolumnowe przechowywanie zawartości plików dostaw.
+-- Wiersze zapisywane są jednokrotnie w table_data (utils/compact_table.py),
+-- kolumny data i file_content nie zawierają już kopii wierszy.
+
+ALTER TABLE dostawy_dane_pliku
+    ADD COLUMN table_data LONGBLOB NULL
+        COMMENT 'Wiersze pliku w kompaktowym formacie kolumnowym (utils.compact_table)'
+        AFTER file_content,
+    MODIFY COLUMN file_content JSON NULL
+        COMMENT 'Metadane przetworzenia pliku (podsumowanie, analiza LOT) w formacie JSON';
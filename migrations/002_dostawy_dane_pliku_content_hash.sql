@@ -0,0 +1,9 @@
+-- Odcisk SHA-256 zawartości pliku dostawy.
+-- Pozwala rozpoznać ponowne przesłanie tego samego pliku przez dostawcę
+-- i użyć istniejącego rekordu zamiast przetwarzać plik od nowa.
+
+ALTER TABLE dostawy_dane_pliku
+    ADD COLUMN content_hash CHAR(64) NULL
+        COMMENT 'Odcisk SHA-256 zawartości pliku'
+        AFTER file_size,
+    ADD INDEX idx_dostawy_dane_pliku_content_hash (content_hash);
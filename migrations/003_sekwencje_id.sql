@@ -0,0 +1,23 @@
+-- Licznik identyfikatorów dostaw (przydział blokami metodą hi-lo).
+-- Zastępuje wyszukiwanie MAX() po całej tabeli dostawy_general przy każdej nowej dostawie.
+-- Licznik inicjowany jest jednorazowo numerem następującym po najwyższym istniejącym ID.
+
+CREATE TABLE IF NOT EXISTS sekwencje_id (
+    name VARCHAR(50) NOT NULL,
+    next_value BIGINT NOT NULL COMMENT 'Następny niezarezerwowany numer',
+    PRIMARY KEY (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO sekwencje_id (name, next_value)
+SELECT 'dostawy_general', COALESCE(
+    MAX(
+        CASE
+            WHEN id_delivery LIKE 'DEL/%' THEN CAST(SUBSTRING_INDEX(id_delivery, '/', -1) AS UNSIGNED)
+            WHEN id_delivery LIKE 'DEL%' THEN CAST(SUBSTRING(id_delivery, 4) AS UNSIGNED)
+            ELSE 0
+        END
+    ), 0
+) + 1
+FROM dostawy_general
+WHERE id_delivery LIKE 'DEL%'
+ON DUPLICATE KEY UPDATE next_value = GREATEST(next_value, VALUES(next_value));
@@ -0,0 +1,11 @@
+-- Indeksy listy produktów dostawy.
+-- Lista produktów w modalach pobierana jest stronami (kursor) z filtrami
+-- prefiksowymi po EAN, ASIN, LOT i numerze palety oraz domyślnym sortowaniem
+-- po numerze wiersza pliku - wszystkie zapytania zawężone są do jednej dostawy.
+
+ALTER TABLE delivery_produkty_hybrid
+    ADD INDEX idx_produkty_dostawa_wiersz (id_delivery, row_num),
+    ADD INDEX idx_produkty_dostawa_ean (id_delivery, ean_code),
+    ADD INDEX idx_produkty_dostawa_asin (id_delivery, asin_code),
+    ADD INDEX idx_produkty_dostawa_lot (id_delivery, lot_number),
+    ADD INDEX idx_produkty_dostawa_paleta (id_delivery, pallet_number);
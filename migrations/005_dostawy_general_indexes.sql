@@ -0,0 +1,10 @@
+-- Indeksy złożone tabeli dostaw dopasowane do zapytań tras:
+--   * lista dostaw dostawcy wg statusu, sortowana malejąco po (delivery_date, id_delivery),
+--     oraz liczba takich dostaw (DeliveryGeneral.get_by_status_keyset / count_by_status);
+--     InnoDB dołącza klucz główny do indeksu, więc obejmuje on też id_delivery,
+--   * wszystkie dostawy dostawcy od najnowszej (DeliveryGeneral.get_all_by_supplier).
+-- Indeksy produktów dostaw dodała migracja 004.
+
+ALTER TABLE dostawy_general
+    ADD INDEX idx_dostawy_dostawca_status_data (id_supplier, status, delivery_date),
+    ADD INDEX idx_dostawy_dostawca_utworzono (id_supplier, created_at);
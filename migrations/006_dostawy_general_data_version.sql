@@ -0,0 +1,9 @@
+-- Wersja danych dostawy dla warunkowych żądań GET (ETag / If-None-Match)
+-- tras /api/delivery-products/<id> i /api/product-details/<id>.
+-- Zwiększana przy każdej zmianie dostawy lub jej produktów (zdarzenia modeli
+-- DeliveryGeneral i DeliveryProduct oraz DeliveryProductBulkWriter.write),
+-- dzięki czemu sprawdzenie aktualności odpowiedzi to odczyt jednego wiersza
+-- po kluczu głównym, bez zapytań o produkty.
+
+ALTER TABLE dostawy_general
+    ADD COLUMN data_version INT NOT NULL DEFAULT 1;
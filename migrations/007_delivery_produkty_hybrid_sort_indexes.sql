@@ -0,0 +1,13 @@
+-- Indeksy sortowania listy produktów dostawy.
+-- Lista produktów sortowana jest po stronie bazy po kolumnach
+-- DeliveryProduct.SORT_COLUMNS. Kolumny numeru wiersza, EAN, ASIN, LOT
+-- i palety mają indeksy z migracji 004. Bez indeksu na pozostałych kolumnach
+-- każda strona (także każde przewinięcie listy) sortowałaby wszystkie produkty
+-- dostawy (Using filesort). InnoDB dołącza id_product do indeksu, więc
+-- (id_delivery, kolumna, id_product) wyznacza kolejność stron kursora.
+
+ALTER TABLE delivery_produkty_hybrid
+    ADD INDEX idx_produkty_dostawa_nazwa (id_delivery, product_name),
+    ADD INDEX idx_produkty_dostawa_ilosc (id_delivery, quantity),
+    ADD INDEX idx_produkty_dostawa_cena (id_delivery, price),
+    ADD INDEX idx_produkty_dostawa_wartosc (id_delivery, value);
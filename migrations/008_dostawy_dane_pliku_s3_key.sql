@@ -0,0 +1,8 @@
+-- Indeks klucza pliku w S3.
+-- Potwierdzenie bezpośredniego uploadu (/api/upload-complete) sprawdza, czy
+-- plik o danym kluczu nie został już przetworzony - ponowione potwierdzenie
+-- nie może zapisać produktów drugi raz. Bez indeksu każde potwierdzenie
+-- czytałoby całą tabelę plików dostaw.
+
+ALTER TABLE dostawy_dane_pliku
+    ADD INDEX idx_dostawy_dane_pliku_s3_key (s3_key);
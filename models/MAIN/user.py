@@ -1,8 +1,11 @@
 from datetime import datetime
 import bcrypt
+import logging
 from werkzeug.security import generate_password_hash, check_password_hash
 from . import db
 
+logger = logging.getLogger(__name__)
+
 class User(db.Model):
     __tablename__ = 'login_auth_data'
     
@@ -17,31 +20,30 @@ class User(db.Model):
     created_at = db.Column(db.TIMESTAMP, nullable=True, server_default=db.text('CURRENT_TIMESTAMP'), comment='Data utworzenia')
     updated_at = db.Column(db.TIMESTAMP, nullable=True, server_default=db.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='Data aktualizacji')
 
-    def set_password(self, password):
-        """Ustawia zahaszowane hasło użytkownika"""
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method=None):
+        """Ustawia zahaszowane hasło użytkownika (method - metoda werkzeug, domyślnie scrypt)"""
+        if method:
+            self.password_hash = generate_password_hash(password, method=method)
+        else:
+            self.password_hash = generate_password_hash(password)
 
     def verify_password(self, password):
         """Weryfikuje hasło z uwzględnieniem różnych formatów haszowania"""
         try:
-            print(f"Weryfikacja hasła dla użytkownika {self.email}")  # Debug
-            print(f"Format hasła w bazie: {self.password_hash[:50]}...")  # Debug
-            
             if self.password_hash.startswith('$2'):
-                print("Używam weryfikacji bcrypt")  # Debug
                 # Format bcrypt
                 return bcrypt.checkpw(password.encode('utf-8'), 
                                     self.password_hash.encode('utf-8'))
-            else:
-                print("Używam standardowej weryfikacji Flask")  # Debug
-                # Standardowa weryfikacja
-                result = check_password_hash(self.password_hash, password)
-                print(f"Wynik weryfikacji: {result}")  # Debug
-                return result
+            # Standardowa weryfikacja
+            return check_password_hash(self.password_hash, password)
         except Exception as e:
-            print(f"Błąd weryfikacji hasła: {e}")  # Debug
+            logger.warning(f"Błąd weryfikacji hasła użytkownika {self.id_login}: {e}")
             return False
 
+    def needs_rehash(self, method):
+        """Sprawdza, czy hasło zapisano inną metodą niż docelowa (np. bcrypt zamiast scrypt)"""
+        return self.password_hash.split('$', 1)[0] != method
+
     def get_profile(self):
         """Zwraca odpowiedni profil użytkownika na podstawie roli"""
         if self.role == 'supplier':
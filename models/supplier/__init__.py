@@ -2,10 +2,12 @@ from .supplier import Supplier
 from .delivery_general import DeliveryGeneral
 from .delivery_produkty_hybrid import DeliveryProduct
 from .delivery_file_data import DeliveryFileData
+from .id_sequence import IdSequence
 
 __all__ = [
     'Supplier',
     'DeliveryGeneral',
     'DeliveryProduct',
-    'DeliveryFileData'
+    'DeliveryFileData',
+    'IdSequence'
 ] 
\ No newline at end of file
@@ -12,7 +12,7 @@ import json
 from werkzeug.utils import secure_filename
 from __init__ import db
 from sqlalchemy.sql import func
-import pandas as pd
+from utils.compact_table import CompactTable
 
 class DeliveryFileData(db.Model):
     """
@@ -26,6 +26,8 @@ class DeliveryFileData(db.Model):
         db.Index('idx_dostawy_dane_pliku_delivery', 'id_delivery'),
         db.Index('idx_dostawy_dane_pliku_processed', 'is_processed'),
         db.Index('idx_dostawy_dane_pliku_file_size', 'file_size'),
+        db.Index('idx_dostawy_dane_pliku_content_hash', 'content_hash'),
+        db.Index('idx_dostawy_dane_pliku_s3_key', 's3_key'),
         {
             'mysql_engine': 'InnoDB',
             'mysql_charset': 'utf8mb4',
@@ -53,15 +55,26 @@ class DeliveryFileData(db.Model):
         default=0,
         comment='Rozmiar pliku w bajtach'
     )
+    content_hash = db.Column(
+        db.String(64),
+        nullable=True,
+        comment='Odcisk SHA-256 zawartości pliku'
+    )
     
     # Dane zawartości
     headers = db.Column(db.JSON, nullable=True)
-    data = db.Column(db.JSON, nullable=True)
+    # Kolumna historyczna - wiersze w formacie JSON (nowe pliki używają table_data)
+    data = db.deferred(db.Column(db.JSON, nullable=True))
     file_content = db.Column(
         db.JSON,
         nullable=True,
-        comment='Zawartość pliku w formacie JSON'
+        comment='Metadane przetworzenia pliku (podsumowanie, analiza LOT) w formacie JSON'
     )
+    table_data = db.deferred(db.Column(
+        db.LargeBinary(length=2**32 - 1),
+        nullable=True,
+        comment='Wiersze pliku w kompaktowym formacie kolumnowym (utils.compact_table)'
+    ))
     
     # Dane przetwarzania
     row_count = db.Column(db.Integer, nullable=False, default=0)
@@ -85,19 +98,147 @@ class DeliveryFileData(db.Model):
             kwargs['id_file_data'] = str(uuid.uuid4())
         super(DeliveryFileData, self).__init__(**kwargs)
     
-    def update_file_content(self, processed_data):
+    def update_file_content(self, processed_data, table_data=None):
         """
         Aktualizuje zawartość pliku na podstawie przetworzonych danych.
         
+        Wiersze przechowywane są jednokrotnie w table_data (format kolumnowy,
+        skompresowany), a file_content zawiera wyłącznie metadane. Pliki
+        przetwarzane strumieniowo zapisują w table_data tylko pierwsze wiersze
+        (podgląd) - pełna zawartość pozostaje w S3 pod s3_key (zob. read_rows).
+        
         Args:
             processed_data: Słownik z przetworzonymi danymi
+            table_data: Wiersze zakodowane przez CompactTable.encode / CompactTableWriter
         """
         self.headers = processed_data.get('headers', [])
-        self.data = processed_data.get('rows', [])
-        self.file_content = processed_data
-        self.row_count = len(processed_data.get('rows', []))
+        self.data = None
+        self.table_data = table_data
+        self.file_content = {
+            key: value for key, value in processed_data.items()
+            if key not in ('rows', 'original_data', 'headers')
+        }
+        self.row_count = processed_data.get('summary', {}).get('total_rows', len(processed_data.get('rows', [])))
         self.is_processed = True
         self.processed_at = datetime.now()
+        self._table = None
+    
+    @property
+    def table(self):
+        """
+        Leniwy dostęp do wierszy pliku (CompactTable).
+        
+        Dekodowane są tylko bloki potrzebne do odczytu żądanych wierszy lub kolumn.
+        Dla rekordów zapisanych przed wprowadzeniem table_data wiersze pochodzą z kolumny data.
+        Tabela może zawierać tylko początek pliku - pełny zakres zwraca read_rows.
+        
+        Returns:
+            CompactTable lub None, jeśli plik nie zawiera danych
+        """
+        if getattr(self, '_table', None) is None:
+            if self.table_data:
+                self._table = CompactTable(self.table_data)
+            elif self.data:
+                import pandas as pd
+                self._table = CompactTable(CompactTable.encode(pd.DataFrame(self.data, columns=self.headers)))
+        return getattr(self, '_table', None)
+    
+    def read_rows(self, start=0, stop=None, columns=None):
+        """
+        Zwraca wiersze pliku z zakresu [start, stop) jako listę słowników.
+        
+        Wiersze zapisane w table_data odczytywane są z bazy. Jeśli zakres wykracza
+        poza zapisany podgląd, plik czytany jest porcjami z S3 - w pamięci
+        pozostaje tylko jedna porcja i żądany zakres wierszy.
+        
+        Args:
+            start: Indeks pierwszego wiersza
+            stop: Indeks za ostatnim wierszem (domyślnie koniec pliku)
+            columns: Opcjonalna lista kolumn (domyślnie wszystkie)
+        """
+        table = self.table
+        stored = table.row_count if table else 0
+        if stored >= self.row_count or (stop is not None and stop <= stored) or not self.s3_key:
+            return table.rows(start, stop, columns) if table else []
+        return self._read_source_rows(start, self.row_count if stop is None else stop, columns)
+    
+    def _read_source_rows(self, start, stop, columns=None):
+        """Czyta zakres wierszy z pliku w S3 (XLSX/XLS przez plik tymczasowy)."""
+        import shutil
+        import tempfile
+        from utils.delivery_ingest import DeliveryIngest
+        from utils.file_chunk_reader import FileChunkReader
+        from utils.s3_storage import s3_storage
+        
+        rows = []
+        body = s3_storage.open(self.s3_key)
+        try:
+            with tempfile.TemporaryFile(prefix='file_rows_') as tmp:
+                source = body
+                if not self.file_name.lower().endswith('.csv'):
+                    shutil.copyfileobj(body, tmp)
+                    tmp.seek(0)
+                    source = tmp
+                
+                offset = 0
+                for chunk in FileChunkReader.iter_chunks(source, self.file_name):
+                    if offset >= stop:
+                        break
+                    if offset + len(chunk) > start:
+                        df = DeliveryIngest.clean_frame(chunk.iloc[max(start - offset, 0):stop - offset])
+                        rows.extend(df.to_dict('records'))
+                    offset += len(chunk)
+        finally:
+            body.close()
+        
+        if columns is not None:
+            rows = [{name: row[name] for name in columns} for row in rows]
+        return rows
+    
+    def to_processed_data(self, preview_rows):
+        """
+        Odtwarza wynik przetwarzania pliku w formacie zwracanym przez /api/process-excel.
+        
+        Args:
+            preview_rows: Liczba wierszy podglądu dołączanych jako 'rows'
+        """
+        table = self.table
+        processed_data = dict(self.file_content or {})
+        processed_data['headers'] = self.headers or []
+        processed_data['rows'] = table.rows(0, preview_rows) if table else []
+        processed_data['preview_only'] = self.row_count > preview_rows
+        return processed_data
+    
+    @staticmethod
+    def find_reusable(supplier_id, content_hash, delivery_id=None):
+        """
+        Szuka przetworzonego pliku o tej samej zawartości w niezapisanej dostawie dostawcy.
+        
+        Dostawy przekazane do weryfikacji nie są brane pod uwagę - ponowne
+        przesłanie tego samego pliku dla nowej dostawy tworzy nowy rekord.
+        
+        Args:
+            supplier_id: ID dostawcy
+            content_hash: Odcisk SHA-256 pliku
+            delivery_id: Opcjonalne ID dostawy, do której ograniczane jest wyszukiwanie
+            
+        Returns:
+            DeliveryFileData lub None
+        """
+        from models.supplier.delivery_general import DeliveryGeneral
+        
+        if not content_hash:
+            return None
+        
+        query = DeliveryFileData.query.join(DeliveryFileData.delivery).filter(
+            DeliveryFileData.content_hash == content_hash,
+            DeliveryFileData.is_processed.is_(True),
+            DeliveryGeneral.id_supplier == supplier_id,
+            DeliveryGeneral.status == 'new'
+        )
+        if delivery_id and delivery_id != 'TEMP':
+            query = query.filter(DeliveryFileData.id_delivery == delivery_id)
+        return query.order_by(DeliveryFileData.created_at.desc()).first()
     
     @staticmethod
     def create_from_file(file, delivery_id, s3_key):
@@ -116,6 +257,7 @@ class DeliveryFileData(db.Model):
         file_size = file.tell()  # Pobierz pozycję (rozmiar)
         file.seek(0)  # Wróć na początek
         
+        import pandas as pd
         if file.filename.lower().endswith(('xlsx', 'xls')):
             df = pd.read_excel(file)
         else:  # CSV
@@ -134,29 +276,48 @@ class DeliveryFileData(db.Model):
         
         return file_data
     
-    def to_dict(self):
-        """Konwertuje obiekt na słownik."""
-        return {
+    def to_dict(self, rows=None, columns=None):
+        """
+        Konwertuje obiekt na słownik.
+        
+        Wiersze pliku dołączane są tylko na żądanie i odczytywane leniwie (read_rows).
+        
+        Args:
+            rows: Opcjonalny zakres wierszy (start, stop) do dołączenia jako 'data'
+            columns: Opcjonalna lista kolumn dołączanych wierszy
+        """
+        result = {
             'id_file_data': self.id_file_data,
             'id_delivery': self.id_delivery,
             'file_name': self.file_name,
             's3_key': self.s3_key,
             'file_type': self.file_type,
             'file_size': self.file_size,
+            'content_hash': self.content_hash,
             'headers': self.headers,
-            'data': self.data,
             'file_content': self.file_content,
             'row_count': self.row_count,
             'is_processed': bool(self.is_processed),
             'processed_at': self.processed_at.isoformat() if self.processed_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        
+        if rows is not None or columns is not None:
+            start, stop = rows or (0, None)
+            result['data'] = self.read_rows(start, stop, columns)
+        
+        return result
     
     @staticmethod
     def get_by_delivery_id(delivery_id):
         """Pobiera wszystkie pliki dla danej dostawy."""
         return DeliveryFileData.query.filter_by(id_delivery=delivery_id).all()
     
+    @staticmethod
+    def get_by_s3_key(s3_key):
+        """Pobiera plik zapisany pod podanym kluczem S3 (lub None)."""
+        return DeliveryFileData.query.filter_by(s3_key=s3_key).first()
+    
     @staticmethod
     def get_by_id(file_data_id):
         """Pobiera plik o podanym ID."""
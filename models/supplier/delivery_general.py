@@ -6,16 +6,31 @@ Model dla tabel związanych z dostawami.
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from flask import current_app
 from datetime import datetime
 from __init__ import db
 from .supplier import Supplier
+from .id_sequence import delivery_id_allocator
+from utils.keyset_pagination import keyset_paginate
+from utils.ttl_cache import TTLCache
+from sqlalchemy import event, inspect, update
 from sqlalchemy.sql import func
-from sqlalchemy import text
+from sqlalchemy.orm import Query, Session, object_session
+
+# Liczby dostaw dostawców wg statusu - zastępują COUNT(*) przy każdym wyświetleniu listy
+delivery_count_cache = TTLCache(ttl=60, max_entries=4096)
 
 class DeliveryGeneral(db.Model):
     """Model dla tabeli dostawy_general."""
     
     __tablename__ = 'dostawy_general'
+    __table_args__ = (
+        # Listy dostaw dostawcy wg statusu sortowane po dacie dostawy (InnoDB dołącza
+        # klucz główny do indeksu, więc obejmuje też sortowanie po id_delivery)
+        db.Index('idx_dostawy_dostawca_status_data', 'id_supplier', 'status', 'delivery_date'),
+        # Wszystkie dostawy dostawcy od najnowszej
+        db.Index('idx_dostawy_dostawca_utworzono', 'id_supplier', 'created_at'),
+    )
     
     # Klucz główny i klucz obcy
     id_delivery = db.Column(db.String(30), primary_key=True)
@@ -55,31 +70,21 @@ class DeliveryGeneral(db.Model):
     created_at = db.Column(db.TIMESTAMP, nullable=False, server_default=func.current_timestamp())
     updated_at = db.Column(db.TIMESTAMP, nullable=True, onupdate=func.current_timestamp())
     
+    # Wersja danych dostawy i jej produktów (ETag tras API produktów, migracja 006)
+    data_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    
     # Relacje
     supplier = db.relationship('Supplier', backref=db.backref('deliveries', lazy=True))
     
     @staticmethod
     def generate_delivery_id():
-        """Generuje unikalny ID dostawy w formacie DELXXXXXX."""
-        # Znajdź najwyższy numer
-        result = db.session.execute(
-            text("""
-            SELECT COALESCE(
-                MAX(
-                    CASE 
-                        WHEN id_delivery LIKE 'DEL/%' THEN CAST(SUBSTRING_INDEX(id_delivery, '/', -1) AS UNSIGNED)
-                        WHEN id_delivery LIKE 'DEL%' THEN CAST(SUBSTRING(id_delivery, 4) AS UNSIGNED)
-                        ELSE 0
-                    END
-                ), 0
-            ) + 1 
-            FROM dostawy_general 
-            WHERE id_delivery LIKE 'DEL%'
-            """)
-        ).scalar()
+        """
+        Generuje unikalny ID dostawy w formacie DELXXXXXX.
         
-        # Generuj nowy ID bez ukośnika
-        return f"DEL{str(result).zfill(6)}"
+        Numery przydzielane są z bloków rezerwowanych w tabeli sekwencje_id
+        (bez przeszukiwania dostawy_general), bezpiecznie dla wielu procesów.
+        """
+        return delivery_id_allocator.next_id()
 
     def __init__(self, **kwargs):
         """Inicjalizacja z automatycznym generowaniem ID."""
@@ -102,32 +107,85 @@ class DeliveryGeneral(db.Model):
         except Exception as e:
             print(f"Błąd podczas pobierania dostawcy: {str(e)}")
         
+        return DeliveryGeneral._serialize(self, supplier.company_name if supplier else None)
+    
+    @staticmethod
+    def _serialize(delivery, supplier_name):
+        """Buduje słownik dostawy z obiektu ORM lub wiersza zapytania (dostęp przez atrybuty)."""
         return {
-            'id_delivery': self.id_delivery,
-            'id_supplier': self.id_supplier,
-            'supplier_name': supplier.company_name if supplier else 'Nieznany dostawca',
-            'lot_number': self.lot_number,
-            'pallet_number': self.pallet_number,
-            'delivery_category': self.delivery_category,
-            'other_category': self.other_category,
-            'total_value': float(self.total_value) if self.total_value else 0,
-            'total_value_pln': float(self.total_value_pln) if self.total_value_pln else 0,
-            'delivery_value': float(self.delivery_value) if self.delivery_value else 0,
-            'status': self.status,
-            'product_class': self.product_class,
-            'items_count': self.items_count,
-            'vat_rate': self.vat_rate,
-            'value_percentage': self.value_percentage,
-            'currency': self.currency,
-            'exchange_rate': float(self.exchange_rate) if self.exchange_rate else None,
-            'delivery_date': self.delivery_date.strftime('%Y-%m-%d') if self.delivery_date else None,
-            'price_type': self.price_type,
-            'lots_count': self.lots_count,
-            'pallets_count': self.pallets_count,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None,
-            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
+            'id_delivery': delivery.id_delivery,
+            'id_supplier': delivery.id_supplier,
+            'supplier_name': supplier_name or 'Nieznany dostawca',
+            'lot_number': delivery.lot_number,
+            'pallet_number': delivery.pallet_number,
+            'delivery_category': delivery.delivery_category,
+            'other_category': delivery.other_category,
+            'total_value': float(delivery.total_value) if delivery.total_value else 0,
+            'total_value_pln': float(delivery.total_value_pln) if delivery.total_value_pln else 0,
+            'delivery_value': float(delivery.delivery_value) if delivery.delivery_value else 0,
+            'status': delivery.status,
+            'product_class': delivery.product_class,
+            'items_count': delivery.items_count,
+            'vat_rate': delivery.vat_rate,
+            'value_percentage': delivery.value_percentage,
+            'currency': delivery.currency,
+            'exchange_rate': float(delivery.exchange_rate) if delivery.exchange_rate else None,
+            'delivery_date': delivery.delivery_date.strftime('%Y-%m-%d') if delivery.delivery_date else None,
+            'price_type': delivery.price_type,
+            'lots_count': delivery.lots_count,
+            'pallets_count': delivery.pallets_count,
+            'created_at': delivery.created_at.strftime('%Y-%m-%d %H:%M:%S') if delivery.created_at else None,
+            'updated_at': delivery.updated_at.strftime('%Y-%m-%d %H:%M:%S') if delivery.updated_at else None
         }
     
+    @staticmethod
+    def listing_query(query=None):
+        """
+        Przekształca zapytanie o dostawy w zapytanie zwracające krotki kolumn
+        dostawy wraz z nazwą dostawcy (supplier_name), bez tworzenia obiektów ORM.
+        
+        Args:
+            query: Zapytanie o DeliveryGeneral (domyślnie wszystkie dostawy)
+        """
+        query = query if query is not None else DeliveryGeneral.query
+        return query.outerjoin(
+            Supplier, Supplier.id_supplier == DeliveryGeneral.id_supplier
+        ).with_entities(
+            *DeliveryGeneral.__table__.columns,
+            Supplier.company_name.label('supplier_name')
+        )
+    
+    @staticmethod
+    def serialize_many(deliveries):
+        """
+        Serializuje wiele dostaw do słowników w formacie to_dict() bez zapytań N+1.
+        
+        Args:
+            deliveries: Zapytanie o DeliveryGeneral - wykonywane jako jeden SELECT
+                        z dołączoną nazwą dostawcy, słowniki budowane są wprost
+                        z krotek wierszy; albo lista obiektów DeliveryGeneral -
+                        nazwy dostawców pobierane są jednym zapytaniem
+                        
+        Returns:
+            list: Lista słowników
+        """
+        if isinstance(deliveries, Query):
+            return [
+                DeliveryGeneral._serialize(row, row.supplier_name)
+                for row in DeliveryGeneral.listing_query(deliveries).all()
+            ]
+        
+        supplier_ids = {delivery.id_supplier for delivery in deliveries}
+        supplier_names = dict(
+            db.session.query(Supplier.id_supplier, Supplier.company_name)
+            .filter(Supplier.id_supplier.in_(supplier_ids))
+            .all()
+        ) if supplier_ids else {}
+        return [
+            DeliveryGeneral._serialize(delivery, supplier_names.get(delivery.id_supplier))
+            for delivery in deliveries
+        ]
+    
     @staticmethod
     def get_all_by_supplier(supplier_id):
         """Pobiera wszystkie dostawy dla danego dostawcy."""
@@ -147,55 +205,6 @@ class DeliveryGeneral(db.Model):
         """Pobiera dostawy o podanym statusie."""
         return DeliveryGeneral.query.filter_by(status=status).order_by(DeliveryGeneral.created_at.desc()).all()
     
-    @staticmethod
-    def get_supplier_delivery_products(delivery_id, supplier_id):
-        """Pobiera produkty dla dostawy danego dostawcy."""
-        print(f"Szukam dostawy {delivery_id} dla dostawcy {supplier_id}")
-        
-        # Sprawdź, czy dostawa istnieje
-        delivery = DeliveryGeneral.query.filter_by(
-            id_delivery=delivery_id,
-            id_supplier=supplier_id
-        ).first()
-        
-        if not delivery:
-            print(f"Nie znaleziono dostawy {delivery_id} dla dostawcy {supplier_id}")
-            return None, "Nie znaleziono dostawy"
-        
-        # Sprawdź, czy istnieje tabela produktów
-        try:
-            from models.supplier.delivery_produkty_hybrid import DeliveryProduct
-            
-            # Sprawdź, czy tabela produktów istnieje
-            if not DeliveryProduct.check_table_exists():
-                print(f"Tabela produktów nie istnieje lub ma niepoprawną strukturę")
-                return None, "Błąd struktury bazy danych"
-            
-            print(f"Szukam produktów dla dostawy {delivery_id}")
-            
-            # Sprawdź, czy istnieją produkty dla tej dostawy
-            products_count = DeliveryProduct.query.filter_by(id_delivery=delivery_id).count()
-            print(f"Liczba znalezionych produktów: {products_count}")
-            
-            if products_count == 0:
-                print(f"Brak produktów dla dostawy {delivery_id}")
-                return [], None
-            
-            # Pobierz produkty
-            products = DeliveryProduct.query.filter_by(id_delivery=delivery_id).all()
-            print(f"Znaleziono {len(products)} produktów dla dostawy {delivery_id}")
-            
-            # Sprawdź, czy produkty mają wszystkie wymagane pola
-            for i, product in enumerate(products[:5]):  # Sprawdź tylko pierwsze 5 produktów
-                print(f"Produkt {i+1}: ID={product.id_product}, Nazwa={product.product_name}, EAN={product.ean_code}")
-            
-            return products, None
-        except Exception as e:
-            print(f"Błąd podczas pobierania produktów: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return None, f"Błąd podczas pobierania produktów: {str(e)}"
-
     @staticmethod
     def get_by_status_paginated(status, supplier_id, page=1, per_page=10):
         """Pobiera dostawy o podanym statusie z paginacją."""
@@ -208,4 +217,122 @@ class DeliveryGeneral(db.Model):
             page=page,
             per_page=per_page,
             error_out=False
-        ) 
\ No newline at end of file
+        ) 
+
+    @staticmethod
+    def get_by_status_keyset(status, supplier_id, cursor=None, per_page=10):
+        """
+        Pobiera stronę dostaw o podanym statusie z paginacją kluczową.
+        
+        Dostawy sortowane są malejąco po (delivery_date, id_delivery), a kolejne
+        strony wskazywane są kursorami zamiast numerów stron (bez OFFSET).
+        
+        Args:
+            status: Status dostaw
+            supplier_id: ID dostawcy
+            cursor: Token kursora z poprzedniej strony (None - pierwsza strona)
+            per_page: Liczba dostaw na stronę
+            
+        Returns:
+            KeysetPage: items (słowniki w formacie to_dict()), next_cursor,
+                        prev_cursor, total (przybliżona liczba dostaw)
+        """
+        query = DeliveryGeneral.listing_query(
+            DeliveryGeneral.query.filter_by(status=status, id_supplier=supplier_id)
+        )
+        page = keyset_paginate(
+            query,
+            [DeliveryGeneral.delivery_date, DeliveryGeneral.id_delivery],
+            cursor=cursor,
+            per_page=per_page,
+            total=DeliveryGeneral.count_by_status(status, supplier_id)
+        )
+        page.items = [DeliveryGeneral._serialize(row, row.supplier_name) for row in page.items]
+        return page
+
+    @staticmethod
+    def count_by_status(status, supplier_id):
+        """
+        Zwraca liczbę dostaw dostawcy o podanym statusie.
+        
+        Wynik przechowywany jest w pamięci podręcznej procesu przez
+        DELIVERY_COUNT_TTL sekund (domyślnie 60). Dodanie, usunięcie dostawy
+        lub zmiana jej statusu albo dostawcy przez ORM usuwa zapamiętane liczby
+        po zatwierdzeniu transakcji, ale tylko w procesie, który ją zatwierdził.
+        Inne procesy serwera oraz zmiany wykonane z pominięciem ORM (np.
+        query.update() / query.delete()) mogą pokazywać nieaktualną liczbę
+        najdłużej przez DELIVERY_COUNT_TTL sekund.
+        """
+        return delivery_count_cache.get_or_set(
+            (supplier_id, status),
+            lambda: DeliveryGeneral.query.filter_by(status=status, id_supplier=supplier_id).count(),
+            ttl=current_app.config.get('DELIVERY_COUNT_TTL', 60)
+        )
+
+    @staticmethod
+    def invalidate_count(supplier_id, status):
+        """Usuwa zapamiętaną liczbę dostaw (np. po zmianie statusu dostawy)."""
+        delivery_count_cache.delete((supplier_id, status))
+
+    @staticmethod
+    def get_version(delivery_id, supplier_id):
+        """
+        Zwraca wersję danych dostawy dostawcy (odczyt jednego wiersza po kluczu głównym).
+        
+        Returns:
+            int: Wersja lub None, jeśli dostawa nie istnieje lub należy do innego dostawcy
+        """
+        return db.session.query(DeliveryGeneral.data_version).filter_by(
+            id_delivery=delivery_id,
+            id_supplier=supplier_id
+        ).scalar()
+
+    @staticmethod
+    def bump_version(delivery_id, connection=None):
+        """
+        Zwiększa wersję danych dostawy w bieżącej transakcji - wywoływane po
+        zapisie produktów z pominięciem ORM (np. DeliveryProductBulkWriter).
+        """
+        statement = update(DeliveryGeneral.__table__).where(
+            DeliveryGeneral.__table__.c.id_delivery == delivery_id
+        ).values(data_version=DeliveryGeneral.__table__.c.data_version + 1)
+        if connection is not None:
+            connection.execute(statement)
+        else:
+            db.session.execute(statement)
+
+
+@event.listens_for(DeliveryGeneral, 'before_update')
+def _bump_delivery_version(mapper, connection, target):
+    """Każda zmiana dostawy przez ORM zwiększa jej wersję (wyrażeniem SQL - bez utraty równoległych zmian)."""
+    target.data_version = DeliveryGeneral.data_version + 1
+
+
+@event.listens_for(DeliveryGeneral, 'after_insert')
+@event.listens_for(DeliveryGeneral, 'after_update')
+@event.listens_for(DeliveryGeneral, 'after_delete')
+def _collect_changed_counts(mapper, connection, target):
+    """Zapamiętuje pary (dostawca, status), których liczby dostaw zmieni zatwierdzenie transakcji."""
+    db_session = object_session(target)
+    if db_session is None:
+        return
+    changed = db_session.info.setdefault('delivery_count_changed', set())
+    # Tylko wartości już wczytane - odczyt atrybutu w trakcie flush wykonałby zapytanie
+    state = inspect(target)
+    suppliers = {state.dict.get('id_supplier'), *state.attrs.id_supplier.history.deleted}
+    statuses = {state.dict.get('status'), *state.attrs.status.history.deleted}
+    if None in suppliers or None in statuses:
+        # Nieznany dostawca lub status (np. domyślny status bazy) - usuwamy wszystkie liczby
+        changed.add(None)
+        return
+    changed.update((supplier_id, status) for supplier_id in suppliers for status in statuses)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_counts(db_session):
+    changed = db_session.info.pop('delivery_count_changed', ())
+    if None in changed:
+        delivery_count_cache.clear()
+        return
+    for supplier_id, status in changed:
+        DeliveryGeneral.invalidate_count(supplier_id, status)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Wydajny zapis wsadowy produktów do tabeli delivery_produkty_hybrid.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from flask import current_app
+from sqlalchemy import insert, text
+from __init__ import db
+from models.supplier.delivery_general import DeliveryGeneral
+from models.supplier.delivery_produkty_hybrid import DeliveryProduct
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryProductBulkWriter:
+    """
+    Zapisuje produkty dostawy przez Core insert() (executemany) bez tworzenia
+    obiektów ORM.
+
+    Wszystkie wsady zapisywane są w jednej transakcji, każdy wsad w osobnym
+    punkcie zapisu (SAVEPOINT) - błąd wsadu wycofuje tylko ten wsad.
+    Wartości liczbowe (price, value, quantity) muszą być przekonwertowane
+    wcześniej, np. przez DeliveryIngest.map_products.
+
+    Opcjonalnie (BULK_INSERT_LOAD_DATA) na MySQL dane ładowane są przez
+    LOAD DATA LOCAL INFILE, co wymaga włączonego local_infile po stronie
+    serwera i sterownika.
+    """
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    COLUMNS = [
+        'id_product', 'id_delivery', 'product_name', 'ean_code', 'asin_code',
+        'quantity', 'unit', 'price', 'value', 'currency', 'lot_number',
+        'pallet_number', 'row_num', 'original_data', 'mapped_fields'
+    ]
+    JSON_COLUMNS = ('original_data', 'mapped_fields')
+
+    def __init__(self, delivery_id, batch_size=None, use_load_data=None):
+        self.delivery_id = delivery_id
+        self.batch_size = batch_size or current_app.config.get('BULK_INSERT_BATCH_SIZE', self.DEFAULT_BATCH_SIZE)
+        if use_load_data is None:
+            use_load_data = current_app.config.get('BULK_INSERT_LOAD_DATA', False)
+        self.use_load_data = use_load_data and db.engine.dialect.name == 'mysql'
+        self.rows_written = 0
+        self.failed_batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_written / self.elapsed if self.elapsed else 0.0
+
+    def _prepare(self, data):
+        """Przygotowuje wiersz do zapisu (tylko kolumny tabeli)."""
+        row = {column: data.get(column) for column in self.COLUMNS}
+        row['id_product'] = row['id_product'] or str(uuid.uuid4())
+        row['id_delivery'] = self.delivery_id
+        return row
+
+    def write(self, products_data):
+        """
+        Zapisuje produkty wsadami w bieżącej transakcji (bez zatwierdzania).
+
+        Args:
+            products_data: Lista słowników z danymi produktów
+
+        Returns:
+            int: Liczba zapisanych wierszy
+        """
+        started = time.perf_counter()
+        written = 0
+        for i in range(0, len(products_data), self.batch_size):
+            batch = [self._prepare(data) for data in products_data[i:i + self.batch_size]]
+            try:
+                with db.session.begin_nested():
+                    if self.use_load_data:
+                        self._load_data(batch)
+                    else:
+                        db.session.execute(insert(DeliveryProduct.__table__), batch)
+                written += len(batch)
+            except Exception as e:
+                # Kontynuuj z następnym wsadem zamiast przerywać cały proces
+                self.failed_batches += 1
+                logger.error(f"Błąd podczas zapisywania wsadu produktów dostawy {self.delivery_id}: {str(e)}")
+
+        if written:
+            # Zapis z pominięciem ORM - wersję dostawy (ETag API produktów) zwiększamy jawnie
+            DeliveryGeneral.bump_version(self.delivery_id)
+        self.rows_written += written
+        self.elapsed += time.perf_counter() - started
+        return written
+
+    def commit(self):
+        """Zatwierdza transakcję i loguje przepustowość zapisu."""
+        started = time.perf_counter()
+        db.session.commit()
+        self.elapsed += time.perf_counter() - started
+        logger.info(
+            f"Zapisano {self.rows_written} produktów dostawy {self.delivery_id} "
+            f"w {self.elapsed:.2f}s ({self.rows_per_second:.0f} wierszy/s, "
+            f"nieudane wsady: {self.failed_batches})"
+        )
+
+    def stats(self):
+        """Zwraca statystyki zapisu."""
+        return {
+            'rows_written': self.rows_written,
+            'failed_batches': self.failed_batches,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'mode': 'load_data' if self.use_load_data else 'executemany'
+        }
+
+    @staticmethod
+    def _escape(value):
+        """Formatuje wartość dla LOAD DATA (separator tabulacji, NULL jako \\N)."""
+        if value is None:
+            return '\\N'
+        return (str(value)
+                .replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+    def _load_data(self, batch):
+        """Ładuje wsad przez LOAD DATA LOCAL INFILE z pliku tymczasowego."""
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False) as tmp:
+            for row in batch:
+                values = [
+                    json.dumps(row[column], default=str) if column in self.JSON_COLUMNS and row[column] is not None
+                    else row[column]
+                    for column in self.COLUMNS
+                ]
+                tmp.write('\t'.join(self._escape(value) for value in values) + '\n')
+        try:
+            db.session.execute(
+                text(
+                    f"LOAD DATA LOCAL INFILE :path INTO TABLE {DeliveryProduct.__tablename__} "
+                    "CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(self.COLUMNS)})"
+                ),
+                {'path': tmp.name}
+            )
+        finally:
+            os.remove(tmp.name)
@@ -10,6 +10,7 @@ from datetime import datetime
 import uuid
 import json
 from decimal import Decimal, InvalidOperation
+from sqlalchemy import event
 from __init__ import db
 from models.supplier.delivery_general import DeliveryGeneral
 
@@ -19,6 +20,18 @@ class DeliveryProduct(db.Model):
     Tabela przechowuje zarówno podstawowe dane produktu jak i dodatkowe informacje w polach JSON.
     """
     __tablename__ = 'delivery_produkty_hybrid'
+    __table_args__ = (
+        db.Index('idx_produkty_dostawa_wiersz', 'id_delivery', 'row_num'),
+        db.Index('idx_produkty_dostawa_ean', 'id_delivery', 'ean_code'),
+        db.Index('idx_produkty_dostawa_asin', 'id_delivery', 'asin_code'),
+        db.Index('idx_produkty_dostawa_lot', 'id_delivery', 'lot_number'),
+        db.Index('idx_produkty_dostawa_paleta', 'id_delivery', 'pallet_number'),
+        # Sortowanie listy po pozostałych kolumnach SORT_COLUMNS (migracja 007)
+        db.Index('idx_produkty_dostawa_nazwa', 'id_delivery', 'product_name'),
+        db.Index('idx_produkty_dostawa_ilosc', 'id_delivery', 'quantity'),
+        db.Index('idx_produkty_dostawa_cena', 'id_delivery', 'price'),
+        db.Index('idx_produkty_dostawa_wartosc', 'id_delivery', 'value'),
+    )
     
     id_product = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     id_delivery = db.Column(db.String(20), db.ForeignKey('dostawy_general.id_delivery', ondelete='CASCADE'), nullable=False)
@@ -35,12 +48,35 @@ class DeliveryProduct(db.Model):
     row_num = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.TIMESTAMP, nullable=False, server_default=db.text('CURRENT_TIMESTAMP'))
     
-    # Pola JSON do przechowywania dodatkowych danych
-    original_data = db.Column(db.JSON, nullable=True)
-    mapped_fields = db.Column(db.JSON, nullable=True)
+    # Pola JSON do przechowywania dodatkowych danych (ładowane dopiero przy odwołaniu
+    # lub jawnie przez undefer_group('json'))
+    original_data = db.deferred(db.Column(db.JSON, nullable=True), group='json')
+    mapped_fields = db.deferred(db.Column(db.JSON, nullable=True), group='json')
    
     # Relacja z tabelą główną
     delivery = db.relationship('DeliveryGeneral', backref=db.backref('products', lazy=True))
+    
+    # Kolumny zwracane przez listę produktów dostawy (bez pól JSON)
+    LISTING_COLUMNS = (
+        'id_product', 'id_delivery', 'product_name', 'ean_code', 'asin_code',
+        'quantity', 'unit', 'price', 'value', 'currency', 'lot_number',
+        'pallet_number', 'row_num'
+    )
+    
+    # Kolumny, po których można sortować listę produktów
+    SORT_COLUMNS = (
+        'row_num', 'product_name', 'ean_code', 'asin_code', 'lot_number',
+        'pallet_number', 'quantity', 'price', 'value'
+    )
+    
+    # Filtry listy produktów: nazwa parametru -> (kolumna, rodzaj dopasowania)
+    FILTERS = {
+        'ean': ('ean_code', 'prefix'),
+        'asin': ('asin_code', 'prefix'),
+        'lot': ('lot_number', 'prefix'),
+        'pallet': ('pallet_number', 'prefix'),
+        'name': ('product_name', 'contains')
+    }
 
     def __repr__(self):
         return f"<DeliveryProduct {self.id_product}: {self.product_name}>"
@@ -74,103 +110,139 @@ class DeliveryProduct(db.Model):
         """Pobiera produkty dla danej dostawy z paginacją."""
         return DeliveryProduct.query.filter_by(id_delivery=delivery_id).paginate(page=page, per_page=per_page, error_out=False)
     
+    @staticmethod
+    def get_delivery_page(delivery_id, supplier_id, filters=None, sort='row_num', descending=False, cursor=None, per_page=200):
+        """
+        Pobiera stronę produktów dostawy dostawcy z filtrami i sortowaniem po stronie bazy.
+        
+        Strony wyznaczane są kursorem (paginacja kluczowa po kolumnie sortowania
+        i id_product), więc koszt zapytania nie zależy od pozycji w liście.
+        Każda kolumna SORT_COLUMNS ma indeks (id_delivery, kolumna) - InnoDB
+        dołącza do niego id_product, więc strona czytana jest w kolejności
+        indeksu, bez sortowania wszystkich produktów dostawy.
+        Sprawdzenie właściciela i waluta dostawy pochodzą z tego samego
+        zapytania. Pobierane są tylko kolumny LISTING_COLUMNS - bez pól JSON.
+        
+        Args:
+            delivery_id: ID dostawy
+            supplier_id: ID dostawcy (właściciela dostawy)
+            filters: Słownik {nazwa filtra z FILTERS: wartość}
+            sort: Nazwa kolumny z SORT_COLUMNS
+            descending: Sortowanie malejące
+            cursor: Token kursora z poprzedniej strony
+            per_page: Liczba produktów na stronę
+        
+        Returns:
+            tuple: (słownik z walutą i kursem dostawy, KeysetPage z wierszami produktów)
+                   lub (None, None), jeśli dostawa nie istnieje lub należy do innego dostawcy
+        """
+        from sqlalchemy import func
+        from utils.keyset_pagination import keyset_paginate
+        
+        table = DeliveryProduct.__table__
+        # Sortowanie po samej kolumnie (nie po wyrażeniu), aby MySQL użył indeksu;
+        # puste wartości (NULL) obsługuje warunek kursora w keyset_paginate
+        column = table.c[sort if sort in DeliveryProduct.SORT_COLUMNS else 'row_num']
+        
+        conditions = [DeliveryProduct.id_delivery == delivery_id]
+        for name, value in (filters or {}).items():
+            if name not in DeliveryProduct.FILTERS or not value:
+                continue
+            field, mode = DeliveryProduct.FILTERS[name]
+            if mode == 'prefix':
+                conditions.append(table.c[field].startswith(value, autoescape=True))
+            else:
+                conditions.append(table.c[field].contains(value, autoescape=True))
+        
+        query = db.session.query(
+            DeliveryGeneral.currency.label('delivery_currency'),
+            DeliveryGeneral.exchange_rate.label('delivery_exchange_rate'),
+            *[table.c[name] for name in DeliveryProduct.LISTING_COLUMNS]
+        ).join(
+            DeliveryGeneral, DeliveryProduct.id_delivery == DeliveryGeneral.id_delivery
+        ).filter(
+            DeliveryGeneral.id_supplier == supplier_id,
+            *conditions
+        )
+        
+        # Liczba wszystkich pasujących produktów tylko dla pierwszej strony
+        total = None
+        if not cursor:
+            total = db.session.query(func.count(DeliveryProduct.id_product)).join(
+                DeliveryGeneral, DeliveryProduct.id_delivery == DeliveryGeneral.id_delivery
+            ).filter(
+                DeliveryGeneral.id_supplier == supplier_id,
+                *conditions
+            ).scalar()
+        
+        page = keyset_paginate(
+            query,
+            [column, table.c.id_product],
+            cursor=cursor,
+            per_page=per_page,
+            total=total,
+            descending=descending
+        )
+        
+        if page.items:
+            first = page.items[0]
+            currency, exchange_rate = first.delivery_currency, first.delivery_exchange_rate
+        else:
+            # Pusta strona: dostawa bez pasujących produktów albo brak dostępu do dostawy
+            delivery = db.session.query(
+                DeliveryGeneral.currency, DeliveryGeneral.exchange_rate
+            ).filter(
+                DeliveryGeneral.id_delivery == delivery_id,
+                DeliveryGeneral.id_supplier == supplier_id
+            ).first()
+            if delivery is None:
+                return None, None
+            currency, exchange_rate = delivery
+        
+        delivery = {
+            'currency': currency,
+            'exchange_rate': float(exchange_rate) if exchange_rate else None
+        }
+        return delivery, page
+    
+    @staticmethod
+    def get_delivery_version(product_id):
+        """
+        Zwraca właściciela i wersję danych dostawy produktu bez ładowania produktu.
+        
+        Returns:
+            tuple: (id_supplier, data_version) lub None, jeśli produkt nie istnieje
+        """
+        return db.session.query(
+            DeliveryGeneral.id_supplier, DeliveryGeneral.data_version
+        ).join(
+            DeliveryProduct, DeliveryProduct.id_delivery == DeliveryGeneral.id_delivery
+        ).filter(
+            DeliveryProduct.id_product == product_id
+        ).first()
+    
     @staticmethod
     def get_by_id(product_id):
         """Pobiera produkt po ID."""
         return DeliveryProduct.query.get(product_id)
     
     @staticmethod
-    def bulk_create(products_data, delivery_id):
-        """Tworzy wiele produktów dla dostawy."""
-        total_products = 0
-        batch_size = 100  # Rozmiar wsadu - zapisujemy po 100 produktów na raz
-        
-        print(f"Rozpoczynam bulk_create dla {len(products_data)} produktów, delivery_id: {delivery_id}")
+    def bulk_create(products_data, delivery_id, batch_size=None):
+        """
+        Tworzy wiele produktów dla dostawy w jednej transakcji.
         
-        # Sprawdź, jakie pola są dostępne w pierwszym produkcie
-        if products_data:
-            print("Dostępne pola w pierwszym produkcie:")
-            for field, value in products_data[0].items():
-                if field not in ['original_data', 'mapped_fields', 'additional_data']:
-                    print(f"  {field}: {value}")
-            
-            # Sprawdź mapowanie pól
-            if 'mapped_fields' in products_data[0]:
-                print("Mapowanie pól dla pierwszego produktu:")
-                for db_field, excel_field in products_data[0]['mapped_fields'].items():
-                    print(f"  {db_field} <- {excel_field}")
+        Wartości price, value i quantity muszą być już przekonwertowane na liczby
+        (patrz DeliveryIngest.map_products).
         
-        for i in range(0, len(products_data), batch_size):
-            batch = products_data[i:i+batch_size]
-            products = []
-            
-            print(f"Przetwarzam wsad {i//batch_size + 1}/{(len(products_data) + batch_size - 1)//batch_size}, liczba produktów: {len(batch)}")
-            
-            for data in batch:
-                # Sprawdź, czy wymagane pola są obecne
-                if 'product_name' not in data or data['product_name'] is None:
-                    print(f"Uwaga: Brak nazwy produktu w danych. Dostępne pola: {list(data.keys())}")
-                    if 'mapped_fields' in data:
-                        print(f"Mapowanie pól dla tego produktu: {data['mapped_fields']}")
-                    if 'original_data' in data:
-                        print(f"Oryginalne dane: {list(data['original_data'].keys())}")
-                
-                # Konwersja wartości pieniężnych na Decimal
-                if 'price' in data:
-                    try:
-                        if data['price'] is not None:
-                            data['price'] = Decimal(str(data['price']))
-                        else:
-                            data['price'] = Decimal('0')
-                    except (ValueError, TypeError, InvalidOperation) as e:
-                        print(f"Błąd konwersji ceny '{data.get('price')}': {str(e)}")
-                        data['price'] = Decimal('0')
-                
-                if 'value' in data:
-                    try:
-                        if data['value'] is not None:
-                            data['value'] = Decimal(str(data['value']))
-                        else:
-                            data['value'] = Decimal('0')
-                    except (ValueError, TypeError, InvalidOperation) as e:
-                        print(f"Błąd konwersji wartości '{data.get('value')}': {str(e)}")
-                        data['value'] = Decimal('0')
-                
-                if 'quantity' in data:
-                    try:
-                        if data['quantity'] is not None:
-                            data['quantity'] = Decimal(str(data['quantity']))
-                        else:
-                            data['quantity'] = Decimal('1')
-                    except (ValueError, TypeError, InvalidOperation) as e:
-                        print(f"Błąd konwersji ilości '{data.get('quantity')}': {str(e)}")
-                        data['quantity'] = Decimal('1')
-                
-                # Upewnij się, że id_delivery jest ustawione
-                data['id_delivery'] = delivery_id
-                
-                # Utwórz produkt
-                try:
-                    product = DeliveryProduct(**data)
-                    products.append(product)
-                except Exception as e:
-                    print(f"Błąd podczas tworzenia produktu: {str(e)}")
-                    print(f"Dane produktu: {data}")
-            
-            try:
-                db.session.bulk_save_objects(products)
-                db.session.commit()
-                total_products += len(products)
-                print(f"Zapisano wsad {i//batch_size + 1}, łącznie zapisano {total_products} produktów")
-            except Exception as e:
-                db.session.rollback()
-                print(f"Błąd podczas zapisywania wsadu produktów: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                # Kontynuuj z następnym wsadem zamiast przerywać cały proces
+        Returns:
+            int: Liczba zapisanych produktów
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
         
-        print(f"Zakończono bulk_create, łącznie zapisano {total_products} produktów")
-        return total_products
+        writer = DeliveryProductBulkWriter(delivery_id, batch_size=batch_size)
+        writer.write(products_data)
+        writer.commit()
+        return writer.rows_written
     
     @staticmethod
     def create_from_row_data(row_data, delivery_id, mapping=None):
@@ -265,20 +337,6 @@ class DeliveryProduct(db.Model):
             db.session.rollback()
             raise ValueError(f"Błąd podczas tworzenia produktu: {str(e)}")
     
-    @staticmethod
-    def check_table_exists():
-        """Sprawdza, czy tabela produktów istnieje i ma poprawną strukturę."""
-        try:
-            # Sprawdź, czy tabela istnieje, wykonując prostą operację
-            count = DeliveryProduct.query.count()
-            print(f"Tabela delivery_produkty_hybrid istnieje. Liczba rekordów: {count}")
-            return True
-        except Exception as e:
-            print(f"Błąd podczas sprawdzania tabeli delivery_produkty_hybrid: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return False 
-    
     @staticmethod
     def print_product_details(product_id):
         """Wyświetla szczegóły produktu o podanym ID."""
@@ -318,4 +376,12 @@ class DeliveryProduct(db.Model):
             print(f"Błąd podczas wyświetlania szczegółów produktu: {str(e)}")
             import traceback
             print(traceback.format_exc())
-            return None 
\ No newline at end of file
+            return None
+
+
+@event.listens_for(DeliveryProduct, 'after_insert')
+@event.listens_for(DeliveryProduct, 'after_update')
+@event.listens_for(DeliveryProduct, 'after_delete')
+def _bump_delivery_version(mapper, connection, target):
+    """Zmiana produktu przez ORM zwiększa wersję danych jego dostawy."""
+    DeliveryGeneral.bump_version(target.id_delivery, connection)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Model tabeli liczników identyfikatorów i przydział ID dostaw.
+"""
+
+import logging
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from __init__ import db
+from utils.hilo_allocator import HiLoAllocator
+
+logger = logging.getLogger(__name__)
+
+
+class IdSequence(db.Model):
+    """
+    Model tabeli sekwencje_id - licznik następnego wolnego numeru dla każdej sekwencji.
+
+    Licznik przesuwany jest o cały blok naraz (HiLoAllocator), więc wiersz
+    blokowany jest tylko raz na blok numerów.
+    """
+    __tablename__ = 'sekwencje_id'
+    __table_args__ = {
+        'mysql_engine': 'InnoDB',
+        'mysql_charset': 'utf8mb4',
+        'mysql_collate': 'utf8mb4_unicode_ci'
+    }
+
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, comment='Następny niezarezerwowany numer')
+
+    @staticmethod
+    def reserve_block(name, block_size, seed):
+        """
+        Rezerwuje blok numerów w osobnej, natychmiast zatwierdzanej transakcji.
+
+        Wiersz licznika blokowany jest przez SELECT ... FOR UPDATE, więc
+        równoległe procesy dostają rozłączne bloki. Transakcja nie zależy od
+        db.session - wycofanie żądania nie zwalnia zarezerwowanych numerów.
+
+        Args:
+            name: Nazwa sekwencji
+            block_size: Liczba rezerwowanych numerów
+            seed: Funkcja seed(connection) zwracająca pierwszy numer, wywoływana,
+                  gdy sekwencja nie ma jeszcze wiersza
+
+        Returns:
+            tuple: (pierwszy numer, numer za ostatnim)
+        """
+        table = IdSequence.__table__
+        while True:
+            with db.engine.begin() as connection:
+                start = connection.execute(
+                    select(table.c.next_value).where(table.c.name == name).with_for_update()
+                ).scalar()
+
+                if start is None:
+                    start = seed(connection)
+                    try:
+                        with connection.begin_nested():
+                            connection.execute(table.insert().values(name=name, next_value=start + block_size))
+                    except IntegrityError:
+                        # Inny proces utworzył licznik w tym samym czasie - zarezerwuj blok od nowa
+                        continue
+                else:
+                    connection.execute(
+                        update(table).where(table.c.name == name).values(next_value=start + block_size)
+                    )
+
+            logger.debug(f"Zarezerwowano blok {start}-{start + block_size - 1} sekwencji {name}")
+            return start, start + block_size
+
+
+class DeliveryIdAllocator:
+    """
+    Przydział ID dostaw w formacie DELXXXXXX.
+
+    Numery pochodzą z sekwencji 'dostawy_general' w tabeli sekwencje_id,
+    rezerwowanej blokami po DELIVERY_ID_BLOCK_SIZE numerów.
+    """
+
+    SEQUENCE_NAME = 'dostawy_general'
+    PREFIX = 'DEL'
+    WIDTH = 6
+    DEFAULT_BLOCK_SIZE = 20
+
+    def __init__(self):
+        self._allocator = HiLoAllocator(self._reserve_block)
+
+    def next_id(self):
+        """Zwraca kolejny ID dostawy."""
+        return f"{self.PREFIX}{str(self._allocator.next_value()).zfill(self.WIDTH)}"
+
+    def reset(self):
+        self._allocator.reset()
+
+    def _reserve_block(self):
+        block_size = current_app.config.get('DELIVERY_ID_BLOCK_SIZE', self.DEFAULT_BLOCK_SIZE)
+        return IdSequence.reserve_block(self.SEQUENCE_NAME, block_size, self._legacy_next_number)
+
+    @staticmethod
+    def _legacy_next_number(connection):
+        """
+        Wyznacza pierwszy wolny numer na podstawie istniejących ID dostaw.
+
+        Wykonywane jednorazowo przy tworzeniu licznika (w produkcji licznik
+        tworzy migracja 003). Obsługuje historyczne ID w formacie DEL/XXXXXX.
+        """
+        from models.supplier.delivery_general import DeliveryGeneral
+
+        column = DeliveryGeneral.__table__.c.id_delivery
+        highest = 0
+        for (delivery_id,) in connection.execute(select(column).where(column.like('DEL%'))):
+            number = delivery_id.rsplit('/', 1)[-1] if '/' in delivery_id else delivery_id[len(DeliveryIdAllocator.PREFIX):]
+            if number.isdigit():
+                highest = max(highest, int(number))
+        return highest + 1
+
+
+delivery_id_allocator = DeliveryIdAllocator()
@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, session, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_principal import Identity, AnonymousIdentity, identity_changed
 from models.staff.staff import Staff
 from models.MAIN.user import User
 from __init__ import db, admin_permission, logger
+from utils.role_cache import role_cache
+from utils.login_guard import HashingBusyError, login_guard
 import logging
 
 admin_bp = Blueprint('admin', __name__)
@@ -35,7 +37,7 @@ def admin_login():
     # Sprawdź, czy użytkownik jest już zalogowany
     if current_user.is_authenticated:
         # Jeśli użytkownik jest administratorem, przekieruj do panelu administratora
-        if hasattr(current_user, 'id_staff') and User.query.filter_by(related_id=current_user.id_staff, role='admin').first():
+        if hasattr(current_user, 'id_staff') and role_cache.resolve(current_user.id_staff) == 'admin':
             return redirect(url_for('admin.admin_dashboard'))
         # Jeśli użytkownik jest zalogowany, ale nie jest administratorem, wyloguj go
         else:
@@ -54,6 +56,13 @@ def admin_login():
         
         logger.info(f"Próba logowania administratora: {email}")
         
+        # Limit prób sprawdzany przed zapytaniem o konto i haszowaniem hasła
+        retry_after = login_guard.check_rate(email, request.remote_addr)
+        if retry_after:
+            logger.warning(f"Odrzucone logowanie administratora - zbyt wiele prób: {email}, IP: {request.remote_addr}")
+            flash('Zbyt wiele prób logowania. Spróbuj ponownie później.', 'error')
+            return render_template('admin/login_admin.html'), 429, {'Retry-After': str(retry_after)}
+        
         auth_data = User.query.filter_by(email=email, role='admin').first()
         if not auth_data:
             logger.warning(f"Nieudane logowanie administratora - nieprawidłowy email: {email}")
@@ -66,13 +75,27 @@ def admin_login():
             flash('Błąd konfiguracji konta', 'error')
             return render_template('admin/login_admin.html')
             
-        if auth_data.verify_password(password):
-            auth_data.failed_login_attempts = 0
-            auth_data.last_login = db.func.now()
-            db.session.commit()
+        if login_guard.locked_for(auth_data):
+            logger.warning(f"Nieudane logowanie administratora - konto zablokowane: {email}")
+            # Ten sam komunikat co przy błędnym haśle - odpowiedź nie zdradza, czy konto istnieje
+            flash('Nieprawidłowy email lub hasło', 'error')
+            return render_template('admin/login_admin.html')
+            
+        try:
+            verified = login_guard.verify(auth_data, password)
+        except HashingBusyError:
+            logger.warning(f"Odrzucone logowanie administratora - brak wolnych miejsc weryfikacji hasła: {email}")
+            flash('Serwer jest chwilowo przeciążony. Spróbuj ponownie za chwilę.', 'error')
+            return render_template('admin/login_admin.html'), 503
+            
+        if verified:
+            # last_login i licznik prób zapisywane zbiorczo w tle
+            login_guard.login_succeeded(auth_data, email)
             
             # Logowanie użytkownika w Flask-Login
             login_user(staff, remember=remember)
+            # Rola zapamiętana w sesji - kolejne żądania nie odpytują login_auth_data
+            role_cache.remember(staff.id_staff, 'admin')
             logger.info(f"Administrator zalogowany pomyślnie: {email}, ID: {staff.id_staff}")
             
             # Ustawienie tożsamości w Flask-Principal
@@ -83,8 +106,7 @@ def admin_login():
             
             return redirect(url_for('admin.admin_dashboard'))
             
-        auth_data.failed_login_attempts += 1
-        db.session.commit()
+        login_guard.login_failed(auth_data)
         logger.warning(f"Nieudane logowanie administratora - nieprawidłowe hasło: {email}")
         flash('Nieprawidłowy email lub hasło', 'error')
     
@@ -95,4 +117,28 @@ def admin_login():
 @admin_permission.require(http_exception=403)
 def admin_dashboard():
     logger.info(f"Dostęp do panelu administratora: {current_user.id_staff if hasattr(current_user, 'id_staff') else 'Unknown'}")
-    return render_template('admin/admin_dashboard.html') 
\ No newline at end of file
+    return render_template('admin/admin_dashboard.html') 
+
+@admin_bp.route('/api/metrics/db-pool')
+@login_required
+@admin_permission.require(http_exception=403)
+def db_pool_metrics():
+    """Metryki puli połączeń bazy danych bieżącego procesu."""
+    from utils.pool_metrics import pool_metrics
+    return jsonify(pool_metrics.snapshot())
+
+@admin_bp.route('/api/metrics/user-cache')
+@login_required
+@admin_permission.require(http_exception=403)
+def user_cache_metrics():
+    """Liczniki trafień pamięci podręcznej użytkowników bieżącego procesu."""
+    from utils.user_cache import user_cache
+    return jsonify(user_cache.stats())
+
+@admin_bp.route('/api/metrics/fragment-cache')
+@login_required
+@admin_permission.require(http_exception=403)
+def fragment_cache_metrics():
+    """Liczniki trafień pamięci fragmentów szablonów bieżącego procesu."""
+    from utils.fragment_cache import fragment_cache
+    return jsonify(fragment_cache.stats())
@@ -3,7 +3,9 @@ from flask_login import login_user, logout_user, login_required, current_user
 from flask_principal import Identity, AnonymousIdentity, identity_changed
 from models.staff.staff import Staff
 from models.MAIN.user import User
-from __init__ import db, staff_permission, logger
+from __init__ import staff_permission, logger
+from utils.role_cache import role_cache
+from utils.login_guard import HashingBusyError, login_guard
 import logging
 
 staff_bp = Blueprint('staff', __name__)
@@ -54,6 +56,13 @@ def login_staff():
         
         logger.info(f"Próba logowania pracownika: {email}")
         
+        # Limit prób sprawdzany przed zapytaniem o konto i haszowaniem hasła
+        retry_after = login_guard.check_rate(email, request.remote_addr)
+        if retry_after:
+            logger.warning(f"Odrzucone logowanie pracownika - zbyt wiele prób: {email}, IP: {request.remote_addr}")
+            flash('Zbyt wiele prób logowania. Spróbuj ponownie później.', 'error')
+            return render_template('staff/login_staff.html'), 429, {'Retry-After': str(retry_after)}
+        
         auth_data = User.query.filter_by(email=email).filter(User.role.in_(['admin', 'staff'])).first()
         if not auth_data:
             logger.warning(f"Nieudane logowanie pracownika - nieprawidłowy email: {email}")
@@ -66,13 +75,27 @@ def login_staff():
             flash('Błąd konfiguracji konta', 'error')
             return render_template('staff/login_staff.html')
             
-        if auth_data.verify_password(password):
-            auth_data.failed_login_attempts = 0
-            auth_data.last_login = db.func.now()
-            db.session.commit()
+        if login_guard.locked_for(auth_data):
+            logger.warning(f"Nieudane logowanie pracownika - konto zablokowane: {email}")
+            # Ten sam komunikat co przy błędnym haśle - odpowiedź nie zdradza, czy konto istnieje
+            flash('Nieprawidłowy email lub hasło', 'error')
+            return render_template('staff/login_staff.html')
+            
+        try:
+            verified = login_guard.verify(auth_data, password)
+        except HashingBusyError:
+            logger.warning(f"Odrzucone logowanie pracownika - brak wolnych miejsc weryfikacji hasła: {email}")
+            flash('Serwer jest chwilowo przeciążony. Spróbuj ponownie za chwilę.', 'error')
+            return render_template('staff/login_staff.html'), 503
+            
+        if verified:
+            # last_login i licznik prób zapisywane zbiorczo w tle
+            login_guard.login_succeeded(auth_data, email)
             
             # Logowanie użytkownika w Flask-Login
             login_user(staff, remember=remember)
+            # Rola zapamiętana w sesji - kolejne żądania nie odpytują login_auth_data
+            role_cache.remember(staff.id_staff, auth_data.role)
             logger.info(f"Pracownik zalogowany pomyślnie: {email}, ID: {staff.id_staff}")
             
             # Ustawienie tożsamości w Flask-Principal
@@ -83,8 +106,7 @@ def login_staff():
             
             return redirect(url_for('staff.staff_dashboard'))
             
-        auth_data.failed_login_attempts += 1
-        db.session.commit()
+        login_guard.login_failed(auth_data)
         logger.warning(f"Nieudane logowanie pracownika - nieprawidłowe hasło: {email}")
         flash('Nieprawidłowy email lub hasło', 'error')
     
@@ -6,15 +6,24 @@ from models.MAIN.user import User
 from models.supplier.delivery_file_data import DeliveryFileData
 from models.supplier.delivery_general import DeliveryGeneral
 from __init__ import db, csrf, supplier_permission, logger
-import pandas as pd
 import io
 from datetime import datetime
 from utils.lot_analyzer import LotAnalyzer
-import boto3
+from utils.delivery_ingest import DeliveryIngest
+from utils.file_chunk_reader import FileChunkReader
+from utils.ingest_jobs import ingest_queue
+from utils.compact_table import CompactTable, CompactTableWriter
+from utils.s3_storage import S3Storage, s3_storage
+from utils.upload_cache import HashingReader, parse_cache, sha256_stream
+from utils.auth_activity import auth_activity
+from utils.formatters import round_number, round_numbers
+from utils.fragment_cache import fragment_cache
+from utils.conditional_get import add_validators, make_etag, not_modified
+from utils.login_guard import HashingBusyError, login_guard
 import os
-from botocore.exceptions import ClientError
+import shutil
+import tempfile
 from werkzeug.utils import secure_filename
-from config import Config
 from flask_wtf.csrf import CSRFError
 from utils.delivery_calculator import DeliveryCalculator
 
@@ -46,27 +55,7 @@ def handle_forbidden(e):
     # Przekieruj do strony głównej zamiast do logowania dostawcy
     return redirect(url_for('main.index'))
 
-def format_number(value, decimals=2):
-    """Formatuje liczbę do określonej liczby miejsc po przecinku"""
-    if value is None:
-        return 0.0
-    try:
-        # Konwertuj na float i zaokrąglij
-        num_value = float(str(value).replace(' ', '').replace(',', '.'))
-        return round(num_value, decimals)
-    except (ValueError, TypeError, AttributeError):
-        return 0.0
-
-# Konfiguracja S3
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-    region_name=Config.AWS_REGION
-)
-S3_BUCKET = Config.S3_BUCKET
-
-def upload_to_s3(file_obj, filename, content_type, delivery_id):
+def upload_to_s3(file_obj, filename, content_type, delivery_id, supplier_id=None):
     """
     Uploaduje plik do S3 i zwraca klucz S3.
     
@@ -75,40 +64,60 @@ def upload_to_s3(file_obj, filename, content_type, delivery_id):
         filename: Nazwa pliku
         content_type: Typ MIME pliku
         delivery_id: ID dostawy
+        supplier_id: ID dostawcy (domyślnie zalogowany dostawca)
         
     Returns:
         str: Klucz S3 gdzie plik został zapisany
     """
+    from botocore.exceptions import ClientError
+    
     try:
-        # Generuj unikalną ścieżkę w S3 z ID dostawcy
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        supplier_id = current_user.id_supplier if current_user else 'unknown'
-        
-        # Format nazwy pliku: DEL000001_20250312_140655_original_filename
-        formatted_filename = f"{delivery_id}_{timestamp}_{secure_filename(filename)}"
-        s3_key = f"supplier_files/{supplier_id}/{formatted_filename}"
-        
-        # Upload pliku
-        s3_client.upload_fileobj(
-            file_obj,
-            S3_BUCKET,
-            s3_key,
-            ExtraArgs={
-                'ContentType': content_type,
-                'Metadata': {
-                    'supplier_id': supplier_id,
-                    'delivery_id': delivery_id,
-                    'upload_date': timestamp,
-                    'original_filename': filename
-                }
-            }
-        )
+        if not supplier_id:
+            supplier_id = current_user.id_supplier if current_user else 'unknown'
+        
+        s3_key = S3Storage.build_key(supplier_id, delivery_id, filename)
+        s3_storage.upload_fileobj(file_obj, s3_key, content_type, {
+            'supplier_id': supplier_id,
+            'delivery_id': delivery_id,
+            'upload_date': datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'original_filename': filename
+        })
         
         return s3_key
     except ClientError as e:
         print(f"Błąd podczas uploadu do S3: {str(e)}")
         raise ValueError(f"Nie udało się zapisać pliku: {str(e)}")
 
+def create_temp_delivery(supplier_id):
+    """
+    Tworzy tymczasowy rekord dostawy dla przesyłanego pliku.
+    
+    Returns:
+        str: ID utworzonej dostawy
+    """
+    delivery = DeliveryGeneral(
+        id_supplier=supplier_id,
+        lot_number='TEMP',
+        pallet_number='TEMP',
+        delivery_category='TEMP',
+        total_value=0,
+        total_value_pln=0,
+        delivery_value=0,
+        product_class='TEMP',
+        items_count=0,
+        lots_count=0,
+        pallets_count=0,
+        vat_rate='23',
+        value_percentage=100,
+        currency='PLN',
+        delivery_date=datetime.now().date()
+    )
+    
+    # Używamy krótszej transakcji tylko do utworzenia dostawy
+    db.session.add(delivery)
+    db.session.commit()
+    return delivery.id_delivery
+
 @supplier_bp.route('/login', methods=['GET', 'POST'])
 def login_supplier():
     # Sprawdź, czy użytkownik jest już zalogowany
@@ -131,6 +140,13 @@ def login_supplier():
         
         logger.info(f"Próba logowania dostawcy: {email}")
         
+        # Limit prób sprawdzany przed zapytaniem o konto i haszowaniem hasła
+        retry_after = login_guard.check_rate(email, request.remote_addr)
+        if retry_after:
+            logger.warning(f"Odrzucone logowanie dostawcy - zbyt wiele prób: {email}, IP: {request.remote_addr}")
+            flash('Zbyt wiele prób logowania. Spróbuj ponownie później.', 'error')
+            return render_template('supplier/login_supplier.html'), 429, {'Retry-After': str(retry_after)}
+        
         auth_data = User.query.filter_by(email=email, role='supplier').first()
         if not auth_data:
             logger.warning(f"Nieudane logowanie dostawcy - nieprawidłowy email: {email}")
@@ -143,10 +159,22 @@ def login_supplier():
             flash('Błąd konfiguracji konta', 'error')
             return render_template('supplier/login_supplier.html')
             
-        if auth_data.verify_password(password):
-            auth_data.failed_login_attempts = 0
-            auth_data.last_login = db.func.now()
-            db.session.commit()
+        if login_guard.locked_for(auth_data):
+            logger.warning(f"Nieudane logowanie dostawcy - konto zablokowane: {email}")
+            # Ten sam komunikat co przy błędnym haśle - odpowiedź nie zdradza, czy konto istnieje
+            flash('Nieprawidłowy email lub hasło', 'error')
+            return render_template('supplier/login_supplier.html')
+            
+        try:
+            verified = login_guard.verify(auth_data, password)
+        except HashingBusyError:
+            logger.warning(f"Odrzucone logowanie dostawcy - brak wolnych miejsc weryfikacji hasła: {email}")
+            flash('Serwer jest chwilowo przeciążony. Spróbuj ponownie za chwilę.', 'error')
+            return render_template('supplier/login_supplier.html'), 503
+            
+        if verified:
+            # last_login i licznik prób zapisywane zbiorczo w tle
+            login_guard.login_succeeded(auth_data, email)
             
             # Logowanie użytkownika w Flask-Login
             login_user(supplier, remember=remember)
@@ -159,8 +187,7 @@ def login_supplier():
             
             return redirect(url_for('supplier.supplier_dashboard'))
             
-        auth_data.failed_login_attempts += 1
-        db.session.commit()
+        login_guard.login_failed(auth_data)
         logger.warning(f"Nieudane logowanie dostawcy - nieprawidłowe hasło: {email}")
         flash('Nieprawidłowy email lub hasło', 'error')
     
@@ -223,20 +250,30 @@ def supplier_nowa_dostawa():
 @supplier_permission.require(http_exception=403)
 def supplier_dostawy_weryfikacja():
     logger.info(f"Dostęp do dostaw w weryfikacji: {current_user.id_supplier if hasattr(current_user, 'id_supplier') else 'Unknown'}")
-    page = request.args.get('page', 1, type=int)
     per_page = 10  # liczba dostaw na stronę
+    cursor = request.args.get('cursor')
+    
+    def render_table():
+        pagination = DeliveryGeneral.get_by_status_keyset(
+            status='pending_verification',
+            supplier_id=current_user.id_supplier,
+            cursor=cursor,
+            per_page=per_page
+        )
+        return render_template(
+            'supplier/_delivery_table.html',
+            deliveries=pagination.items,
+            pagination=pagination
+        )
     
-    pagination = DeliveryGeneral.get_by_status_paginated(
-        status='pending_verification',
-        supplier_id=current_user.id_supplier,
-        page=page,
-        per_page=per_page
+    # Tabela renderowana ponownie dopiero po zmianie dostaw dostawcy (wersja w kluczu)
+    delivery_table = fragment_cache.render(
+        'dostawy_weryfikacja', current_user.id_supplier, cursor or '', render_table
     )
     
     return render_template(
         'supplier/supplier_dostawy_weryfikacja.html',
-        deliveries=pagination.items,
-        pagination=pagination
+        delivery_table=delivery_table
     )
 
 @supplier_bp.route('/negocjacje')
@@ -259,6 +296,7 @@ def supplier_rozliczenia():
 @csrf.exempt
 def process_excel():
     from flask_wtf.csrf import CSRFError
+    import pandas as pd
     
     try:
         print("Otrzymano żądanie process-excel")
@@ -278,35 +316,31 @@ def process_excel():
         if file.filename == '':
             print("Pusta nazwa pliku")
             return jsonify({'success': False, 'message': 'Nie wybrano pliku'}), 400
+        
+        # Ponowne przesłanie tego samego pliku - użyj zapisanych wyników zamiast przetwarzać plik od nowa
+        content_hash = sha256_stream(file.stream)
+        reused_data = reuse_processed_file(current_user.id_supplier, content_hash, request.form.get('delivery_id'))
+        if reused_data:
+            return jsonify({
+                'success': True,
+                'data': reused_data,
+                'message': 'Plik był już przetworzony - użyto zapisanych wyników'
+            })
     
         # Utwórz tymczasowy rekord dostawy jeśli nie podano id_delivery
         delivery_id = request.form.get('delivery_id')
         if not delivery_id or delivery_id == 'TEMP':
-            # Utwórz nową dostawę
-            delivery = DeliveryGeneral(
-                id_supplier=current_user.id_supplier,
-                lot_number='TEMP',
-                pallet_number='TEMP',
-                delivery_category='TEMP',
-                total_value=0,
-                total_value_pln=0,
-                delivery_value=0,
-                product_class='TEMP',
-                items_count=0,
-                lots_count=0,
-                pallets_count=0,
-                vat_rate='23',
-                value_percentage=100,
-                currency='PLN',
-                delivery_date=datetime.now().date()
-            )
-            
-            # Używamy krótszej transakcji tylko do utworzenia dostawy
-            db.session.add(delivery)
-            db.session.commit()
-            delivery_id = delivery.id_delivery
+            delivery_id = create_temp_delivery(current_user.id_supplier)
             print(f"Utworzono tymczasową dostawę z ID: {delivery_id}")
 
+        # Duże pliki (lub jawnie zażądany tryb 'stream') przetwarzamy porcjami bez wczytywania całości do pamięci
+        file.stream.seek(0, 2)
+        file_size = file.stream.tell()
+        file.stream.seek(0)
+        stream_threshold = current_app.config.get('INGEST_STREAM_THRESHOLD', 5 * 1024 * 1024)
+        if request.form.get('mode') == 'stream' or file_size >= stream_threshold:
+            return process_excel_stream(file, delivery_id, file_size, content_hash)
+
         # Wczytaj plik do pamięci
         file_content = file.read()
         file_obj = io.BytesIO(file_content)
@@ -349,20 +383,6 @@ def process_excel():
         # Zamień NaN na None w całym DataFrame
         df = df.where(pd.notnull(df), None)
 
-        # Mapowanie kolumn
-        column_mapping = {
-            'WARTOSC': 'Wartość',
-            'NR LOT': 'LOT',
-            'NR PALETY': 'Paleta',
-            'ITEM DESC': 'Nazwa produktu',
-            'EAN': 'EAN',
-            'ASIN': 'ASIN',
-            'ILOSC': 'Ilość',
-            'CENA': 'Cena',
-            'WALUTA': 'Waluta',
-            'JEDNOSTKA': 'Jednostka'
-        }
-
         # Przygotuj podsumowanie
         summary = {
             'total_rows': len(df),
@@ -371,7 +391,7 @@ def process_excel():
             'lots': sorted(list(set(df['NR LOT'].dropna().unique().tolist()))) if 'NR LOT' in df.columns else [],
             'pallets': sorted(list(set(df['NR PALETY'].dropna().unique().tolist()))) if 'NR PALETY' in df.columns else [],
             'mapped_columns': {
-                orig: mapped for orig, mapped in column_mapping.items() 
+                orig: mapped for orig, mapped in DeliveryIngest.SUMMARY_COLUMN_LABELS.items() 
                 if orig in df.columns
             }
         }
@@ -449,10 +469,7 @@ def process_excel():
             
             # Aktualizuj zawartość pliku - używamy osobnej transakcji
             try:
-                file_data.headers = processed_data['headers']
-                file_data.data = processed_data['rows']
-                file_data.file_content = processed_data
-                file_data.row_count = len(rows_data)
+                file_data.update_file_content(processed_data, CompactTable.encode(df))
                 db.session.commit()
             except Exception as e:
                 db.session.rollback()
@@ -464,25 +481,7 @@ def process_excel():
             
             # Aktualizuj dostawę z podsumowaniem - używamy osobnej transakcji
             try:
-                delivery = DeliveryGeneral.query.get(delivery_id)
-                if delivery:
-                    # Aktualizuj wartości
-                    delivery.total_value = summary['total_value']
-                    delivery.items_count = summary['items_count']
-                    delivery.lots_count = len(summary['lots']) if summary['lots'] else 0
-                    delivery.pallets_count = len(summary['pallets']) if summary['pallets'] else 0
-                    
-                    # Jeśli znaleziono LOT w nazwie pliku lub w danych
-                    if lot_analysis and lot_analysis[1]:
-                        delivery.lot_number = lot_analysis[1]
-                    elif summary['lots']:
-                        delivery.lot_number = ', '.join(summary['lots'])
-                    
-                    # Jeśli znaleziono numery palet
-                    if summary['pallets']:
-                        delivery.pallet_number = ', '.join(str(p) for p in summary['pallets'])
-                    
-                    db.session.commit()
+                if DeliveryIngest.apply_summary_to_delivery(delivery_id, summary, processed_data['lot_analysis']):
                     print(f"Zaktualizowano dostawę {delivery_id} z nowymi danymi")
             except Exception as e:
                 print(f"Błąd podczas aktualizacji dostawy: {str(e)}")
@@ -497,98 +496,8 @@ def process_excel():
                 print(f"Delivery ID: {delivery_id}")
                 print(f"Liczba produktów do zapisu: {len(df)}")
                 
-                # Mapowanie kolumn z pliku Excel na kolumny w bazie danych
-                column_mapping = {
-                    'lot_number': ['nr lot', 'nr_lot', 'nr-lot', 'lot', 'lot number', 'lot_number', 'lot-number', 'numer partii', 'numer_partii', 'partia'],
-                    'pallet_number': ['nr palety', 'nr_palety', 'nr-palety', 'paleta', 'pallet', 'pallet number', 'pallet_number', 'pallet-number', 'numer palety'],
-                    'product_name': ['item desc', 'item_desc', 'nazwa', 'nazwa produktu', 'produkt', 'product', 'product name', 'product_name', 'description', 'desc'],
-                    'ean_code': ['ean', 'kod ean', 'kod_ean', 'ean code', 'ean_code', 'kod', 'code', 'barcode', 'bar code', 'bar_code'],
-                    'asin_code': ['asin', 'kod asin', 'kod_asin', 'asin code', 'asin_code'],
-                    'quantity': ['ilość', 'ilosc', 'ilośc', 'ilosć', 'qty', 'quantity', 'amount', 'liczba sztuk', 'liczba_sztuk'],
-                    'unit': ['jednostka', 'jm', 'j.m.', 'unit', 'measure', 'unit of measure', 'uom'],
-                    'price': ['cena', 'price', 'unit price', 'unit_price', 'cena jednostkowa', 'cena_jednostkowa', 'koszt', 'cost', 'preis', 'prix', 'precio', 'prezzo', 'einzelpreis', 'unit cost', 'cost per unit', 'price per unit', 'price per item'],
-                    'value': ['wartość', 'wartosc', 'value', 'total', 'suma', 'total value', 'total_value', 'wert', 'valeur', 'valor', 'valore', 'gesamtwert', 'total cost', 'total price', 'sum', 'amount', 'line total', 'line value', 'line amount'],
-                    'currency': ['waluta', 'currency', 'curr', 'waluty', 'währung', 'monnaie', 'moneda', 'valuta'],
-                }
-                
-                # Normalizacja nazw kolumn (usunięcie spacji, zamiana na małe litery)
-                normalized_columns = {col.lower().replace(' ', ''): col for col in df.columns}
-                print(f"Znormalizowane nazwy kolumn: {normalized_columns}")
-                
                 # Przygotuj dane produktów
-                products_data = []
-                
-                # Wyświetl pierwsze wiersze danych dla debugowania
-                if not df.empty:
-                    print(f"Pierwszy wiersz danych: {df.iloc[0].to_dict()}")
-                
-                for index, row in df.iterrows():
-                    row_dict = row.to_dict()
-                    cleaned_row = {}
-                    
-                    # Zapisz oryginalne dane
-                    cleaned_row['original_data'] = row_dict
-                    cleaned_row['mapped_fields'] = {}
-                    
-                    # Mapuj pola na podstawie nazw kolumn
-                    for db_field, possible_names in column_mapping.items():
-                        found = False
-                        for col in df.columns:
-                            # Normalizuj nazwę kolumny (usuń spacje, zamień na małe litery)
-                            col_normalized = col.lower().replace(' ', '')
-                            
-                            # Sprawdź, czy znormalizowana nazwa kolumny pasuje do którejś z możliwych nazw
-                            if any(possible_name.lower().replace(' ', '') == col_normalized for possible_name in possible_names):
-                                cleaned_row[db_field] = row[col]
-                                cleaned_row['mapped_fields'][db_field] = col
-                                found = True
-                                break
-                        
-                        # Jeśli nie znaleziono dopasowania dla ceny lub wartości, spróbuj znaleźć kolumny, które mogą zawierać te dane
-                        if not found and db_field in ['price', 'value']:
-                            # Sprawdź, czy istnieją kolumny z liczbami, które mogą być ceną lub wartością
-                            for col in df.columns:
-                                if col not in cleaned_row['mapped_fields'].values():  # Sprawdź tylko niezmapowane kolumny
-                                    val = row[col]
-                                    # Sprawdź, czy wartość jest liczbą
-                                    if isinstance(val, (int, float)) or (isinstance(val, str) and val.replace('.', '', 1).replace(',', '', 1).isdigit()):
-                                        # Jeśli to cena, wartości są zwykle mniejsze
-                                        if db_field == 'price' and 'value' not in cleaned_row['mapped_fields']:
-                                            try:
-                                                num_val = float(str(val).replace(',', '.'))
-                                                if 0 < num_val < 10000:  # Typowy zakres cen
-                                                    cleaned_row[db_field] = val
-                                                    cleaned_row['mapped_fields'][db_field] = col
-                                                    print(f"Automatycznie zmapowano kolumnę '{col}' jako cenę, wartość: {val}")
-                                                    found = True
-                                                    break
-                                            except (ValueError, TypeError):
-                                                pass
-                                        # Jeśli to wartość, wartości są zwykle większe
-                                        elif db_field == 'value' and 'price' in cleaned_row['mapped_fields']:
-                                            try:
-                                                num_val = float(str(val).replace(',', '.'))
-                                                price_val = float(str(cleaned_row['price']).replace(',', '.'))
-                                                qty_val = float(str(cleaned_row.get('quantity', 1)).replace(',', '.'))
-                                                # Sprawdź, czy wartość jest bliska cena * ilość
-                                                if abs(num_val - (price_val * qty_val)) < 0.1 * num_val:
-                                                    cleaned_row[db_field] = val
-                                                    cleaned_row['mapped_fields'][db_field] = col
-                                                    print(f"Automatycznie zmapowano kolumnę '{col}' jako wartość, wartość: {val}")
-                                                    found = True
-                                                    break
-                                            except (ValueError, TypeError):
-                                                pass
-                        
-                        if not found:
-                            # Jeśli nie znaleziono dopasowania, ustaw wartość domyślną
-                            cleaned_row[db_field] = None
-                    
-                    # Dodaj numer wiersza i ID dostawy
-                    cleaned_row['row_num'] = index + 1
-                    cleaned_row['id_delivery'] = delivery_id
-                    
-                    products_data.append(cleaned_row)
+                products_data = DeliveryIngest.map_products(df, delivery_id)
                 
                 # Wyświetl pierwsze zmapowane dane dla debugowania
                 if products_data:
@@ -614,6 +523,13 @@ def process_excel():
                 try:
                     products_saved = DeliveryProduct.bulk_create(products_data, delivery_id)
                     print(f"Zapisano {products_saved} produktów do bazy danych")
+                    
+                    # Odcisk zapisujemy dopiero po pełnym przetworzeniu pliku - tylko taki rekord może być użyty ponownie
+                    if products_saved == len(products_data) and 'file_content_error' not in processed_data:
+                        file_data.content_hash = content_hash
+                        db.session.commit()
+                        processed_data['delivery_id'] = delivery_id
+                        cache_processed_file(file_data, processed_data)
                 except Exception as e:
                     print(f"Błąd podczas zapisywania produktów: {str(e)}")
                     print(f"Typ błędu: {type(e)}")
@@ -666,6 +582,255 @@ def process_excel():
             'message': f'Błąd podczas przetwarzania pliku: {str(e)}'
         }), 400
 
+def process_excel_stream(file, delivery_id, file_size, content_hash=None):
+    """
+    Strumieniowy tryb przetwarzania pliku dostawy.
+    
+    Plik jest przesyłany do S3 bezpośrednio ze strumienia żądania, a następnie
+    czytany porcjami (CSV w blokach, XLSX wiersz po wierszu). Każda porcja jest
+    mapowana i zapisywana do delivery_produkty_hybrid przed wczytaniem kolejnej,
+    więc zużycie pamięci ograniczone jest rozmiarem porcji.
+    """
+    try:
+        s3_key = upload_to_s3(file.stream, file.filename, file.content_type, delivery_id)
+        logger.info(f"Plik zapisany w S3 (tryb strumieniowy): {s3_key}")
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Błąd podczas zapisywania pliku: {str(e)}'
+        }), 500
+    
+    file.stream.seek(0)
+    chunk_size = current_app.config.get('INGEST_CHUNK_SIZE', FileChunkReader.DEFAULT_CHUNK_SIZE)
+    # W bazie zapisywany jest tylko podgląd wierszy - pełny plik pozostaje w S3
+    table_writer = CompactTableWriter(max_rows=DeliveryIngest.PREVIEW_ROWS)
+    try:
+        processed_data = DeliveryIngest.process_stream(file.stream, file.filename, delivery_id, chunk_size, table_writer=table_writer)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Błąd podczas strumieniowego przetwarzania pliku: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Błąd podczas wczytywania pliku. Upewnij się, że plik jest w prawidłowym formacie: {str(e)}'
+        }), 400
+    
+    processed_data['delivery_id'] = delivery_id
+    save_stream_results(processed_data, table_writer.getvalue(), delivery_id, file.filename, s3_key, file.content_type, file_size, content_hash)
+    
+    return jsonify({
+        'success': True,
+        'data': processed_data,
+        'message': 'Plik został przetworzony, ale mogły wystąpić błędy podczas zapisywania danych'
+    })
+
+def save_stream_results(processed_data, table_data, delivery_id, filename, s3_key, content_type, file_size, content_hash=None):
+    """
+    Zapisuje rekord pliku i aktualizuje dostawę po przetworzeniu strumieniowym.
+    
+    Błędy zapisu nie przerywają przetwarzania - są dopisywane do processed_data.
+    Odcisk pliku zapisywany jest tylko, gdy wszystkie produkty zostały zapisane.
+    """
+    try:
+        if processed_data.get('insert_stats', {}).get('failed_batches'):
+            content_hash = None
+        file_data = DeliveryFileData(
+            id_delivery=delivery_id,
+            file_name=secure_filename(filename),
+            s3_key=s3_key,
+            file_type=content_type,
+            file_size=file_size,
+            content_hash=content_hash
+        )
+        file_data.update_file_content(processed_data, table_data)
+        db.session.add(file_data)
+        db.session.commit()
+        cache_processed_file(file_data, processed_data)
+    except Exception as e:
+        db.session.rollback()
+        processed_data['file_data_error'] = str(e)
+    
+    try:
+        DeliveryIngest.apply_summary_to_delivery(delivery_id, processed_data['summary'], processed_data['lot_analysis'])
+    except Exception as e:
+        db.session.rollback()
+        processed_data['delivery_update_error'] = str(e)
+
+def ingest_file(job, file_obj, filename, content_type, file_size, s3_key, delivery_id, content_hash=None):
+    """
+    Przetwarza strumieniowo plik już zapisany w S3 i zapisuje wyniki.
+    
+    Args:
+        content_hash: Odcisk SHA-256 pliku lub None, jeśli file_obj to HashingReader
+                      (odcisk liczony jest wtedy w trakcie przetwarzania)
+    
+    Returns:
+        dict: Dane w formacie zwracanym przez /api/process-excel
+    """
+    chunk_size = current_app.config.get('INGEST_CHUNK_SIZE', FileChunkReader.DEFAULT_CHUNK_SIZE)
+    # W bazie zapisywany jest tylko podgląd wierszy - pełny plik pozostaje w S3
+    table_writer = CompactTableWriter(max_rows=DeliveryIngest.PREVIEW_ROWS)
+    processed_data = DeliveryIngest.process_stream(
+        file_obj, filename, delivery_id, chunk_size,
+        progress_callback=job.update_progress, table_writer=table_writer
+    )
+    if content_hash is None and isinstance(file_obj, HashingReader):
+        content_hash = file_obj.hexdigest()
+    
+    processed_data['delivery_id'] = delivery_id
+    save_stream_results(processed_data, table_writer.getvalue(), delivery_id, filename, s3_key, content_type, file_size, content_hash)
+    return processed_data
+
+def reuse_processed_file(supplier_id, content_hash, delivery_id=None):
+    """
+    Zwraca wynik przetwarzania wcześniej przesłanego pliku o tej samej zawartości.
+    
+    Wynik pochodzi z pamięci podręcznej lub jest odtwarzany z istniejącego
+    rekordu DeliveryFileData - plik nie jest ponownie wysyłany do S3,
+    parsowany ani zapisywany.
+    
+    Returns:
+        dict lub None, jeśli dostawca nie przesłał wcześniej takiego pliku
+    """
+    file_data = DeliveryFileData.find_reusable(supplier_id, content_hash, delivery_id)
+    if not file_data:
+        return None
+    
+    processed_data = parse_cache.get(content_hash, file_data.id_file_data)
+    if processed_data is None:
+        processed_data = file_data.to_processed_data(DeliveryIngest.PREVIEW_ROWS)
+        parse_cache.put(content_hash, file_data.id_file_data, processed_data)
+    
+    processed_data['delivery_id'] = file_data.id_delivery
+    processed_data['reused_file_id'] = file_data.id_file_data
+    logger.info(f"Użyto ponownie pliku {file_data.id_file_data} (dostawa {file_data.id_delivery}) dla dostawcy {supplier_id}")
+    return processed_data
+
+def cache_processed_file(file_data, processed_data):
+    """Zapamiętuje wynik przetwarzania pliku (z podglądem wierszy) pod jego odciskiem."""
+    if not file_data.content_hash:
+        return
+    
+    cached = {key: value for key, value in processed_data.items() if key not in ('rows', 'original_data')}
+    cached['rows'] = processed_data.get('rows', [])[:DeliveryIngest.PREVIEW_ROWS]
+    cached['preview_only'] = file_data.row_count > DeliveryIngest.PREVIEW_ROWS
+    parse_cache.put(file_data.content_hash, file_data.id_file_data, cached)
+
+def run_ingest_job(job, file_path, filename, content_type, supplier_id, delivery_id=None, content_hash=None):
+    """
+    Przetwarza plik dostawy w tle (wywoływane przez ingest_queue w kontekście aplikacji).
+    
+    Args:
+        job: Zadanie IngestJob, w którym aktualizowany jest postęp
+        file_path: Ścieżka do tymczasowej kopii przesłanego pliku (usuwana po zakończeniu)
+        filename: Oryginalna nazwa pliku
+        content_type: Typ MIME pliku
+        supplier_id: ID dostawcy
+        delivery_id: ID istniejącej dostawy lub None, aby utworzyć tymczasową
+        content_hash: Odcisk SHA-256 pliku policzony podczas jego przyjmowania
+        
+    Returns:
+        dict: Dane w formacie zwracanym przez /api/process-excel
+    """
+    try:
+        reused_data = reuse_processed_file(supplier_id, content_hash, delivery_id)
+        if reused_data:
+            return reused_data
+        
+        if not delivery_id or delivery_id == 'TEMP':
+            delivery_id = create_temp_delivery(supplier_id)
+        
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as file_obj:
+            s3_key = upload_to_s3(file_obj, filename, content_type, delivery_id, supplier_id)
+            file_obj.seek(0)
+            return ingest_file(job, file_obj, filename, content_type, file_size, s3_key, delivery_id, content_hash)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        os.remove(file_path)
+
+def run_object_ingest_job(job, s3_key, filename, content_type, file_size, delivery_id):
+    """
+    Przetwarza w tle plik przesłany przez przeglądarkę bezpośrednio do S3.
+    
+    CSV czytany jest porcjami wprost ze strumienia obiektu. XLSX/XLS wymagają
+    swobodnego dostępu do pliku, więc są najpierw kopiowane do pliku
+    tymczasowego (strumieniowo, bez wczytywania całości do pamięci).
+    
+    Przed przetwarzaniem liczony jest odcisk pliku (dla CSV osobnym
+    strumieniowym odczytem obiektu, dla XLSX/XLS podczas kopiowania) - jeśli
+    dostawca przesłał już plik o tej samej zawartości, zwracany jest wynik
+    tamtego pliku, tak jak w run_ingest_job.
+    
+    Dla delivery_id 'TEMP' tworzona jest nowa dostawa, usuwana ponownie,
+    jeśli przetwarzanie pliku się nie powiedzie.
+    """
+    created_delivery = None
+    try:
+        # Plik mógł zostać przetworzony przez zadanie zakończone tuż przed zakolejkowaniem tego
+        if DeliveryFileData.get_by_s3_key(s3_key):
+            raise ValueError('Plik został już przetworzony')
+        
+        if filename.lower().endswith('.csv'):
+            body = s3_storage.open(s3_key)
+            try:
+                content_hash = sha256_object(body)
+            finally:
+                body.close()
+            
+            reused_data = reuse_processed_file(job.supplier_id, content_hash, delivery_id)
+            if reused_data:
+                return reused_data
+            
+            if delivery_id == 'TEMP':
+                delivery_id = created_delivery = create_temp_delivery(job.supplier_id)
+            
+            body = s3_storage.open(s3_key)
+            try:
+                return ingest_file(job, body, filename, content_type, file_size, s3_key, delivery_id, content_hash)
+            finally:
+                body.close()
+        
+        with tempfile.TemporaryFile(prefix='ingest_') as tmp:
+            body = s3_storage.open(s3_key)
+            try:
+                reader = HashingReader(body)
+                shutil.copyfileobj(reader, tmp)
+            finally:
+                body.close()
+            tmp.seek(0)
+            
+            reused_data = reuse_processed_file(job.supplier_id, reader.hexdigest(), delivery_id)
+            if reused_data:
+                return reused_data
+            
+            if delivery_id == 'TEMP':
+                delivery_id = created_delivery = create_temp_delivery(job.supplier_id)
+            
+            return ingest_file(job, tmp, filename, content_type, file_size, s3_key, delivery_id, reader.hexdigest())
+    except Exception:
+        db.session.rollback()
+        if created_delivery:
+            delete_temp_delivery(created_delivery)
+        raise
+
+def sha256_object(body):
+    """Liczy SHA-256 strumienia obiektu S3 (bez przewijania i bez wczytywania całości do pamięci)."""
+    reader = HashingReader(body)
+    for _ in reader:
+        pass
+    return reader.hexdigest()
+
+def delete_temp_delivery(delivery_id):
+    """Usuwa dostawę utworzoną dla pliku, którego przetwarzanie się nie powiodło (razem z produktami)."""
+    try:
+        DeliveryGeneral.query.filter_by(id_delivery=delivery_id).delete()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Nie udało się usunąć tymczasowej dostawy {delivery_id}: {str(e)}")
+
 @supplier_bp.route('/api/save-delivery', methods=['POST'])
 @login_required
 @supplier_permission.require(http_exception=403)
@@ -793,11 +958,8 @@ def save_delivery():
 def refresh_session():
     logger.info(f"Odświeżanie sesji przez dostawcę: {current_user.id_supplier if hasattr(current_user, 'id_supplier') else 'Unknown'}")
     try:
-        # Aktualizacja last_login
-        auth_data = current_user.get_auth_data()
-        if auth_data:
-            auth_data.last_login = datetime.utcnow()
-            db.session.commit()
+        # Aktualizacja last_login (zapis zbiorczy w tle, bez transakcji na każde odświeżenie)
+        auth_activity.touch(current_user.id_supplier)
             
         return jsonify({
             'success': True,
@@ -815,9 +977,15 @@ def refresh_session():
 def get_delivery_products(delivery_id):
     logger.info(f"Pobieranie produktów dostawy {delivery_id} przez dostawcę: {current_user.id_supplier if hasattr(current_user, 'id_supplier') else 'Unknown'}")
     """
-    Pobiera produkty dla danej dostawy
+    Pobiera stronę produktów dla danej dostawy.
+    
+    Parametry zapytania: limit (domyślnie 200, maks. 1000), cursor, sort
+    (kolumna z DeliveryProduct.SORT_COLUMNS), order (asc/desc) oraz filtry
+    ean, asin, lot, pallet (prefiks) i name (fragment nazwy).
     """
     try:
+        from models.supplier.delivery_produkty_hybrid import DeliveryProduct
+        
         # Pobierz ID dostawcy z obiektu current_user
         supplier_id = current_user.id_supplier
         if not supplier_id:
@@ -825,72 +993,83 @@ def get_delivery_products(delivery_id):
                 'success': False,
                 'message': 'Nie jesteś zalogowany jako dostawca'
             }), 401
-            
-        print(f"Pobieranie produktów dla dostawy ID: {delivery_id}, Dostawca ID: {supplier_id}")
         
-        # Pobierz produkty dla dostawy - funkcja zwraca krotkę (products, error_message)
-        products, error_message = DeliveryGeneral.get_supplier_delivery_products(delivery_id, supplier_id)
+        # ETag z wersji danych dostawy (odczyt jednego wiersza) i parametrów strony -
+        # aktualna kopia w przeglądarce dostaje 304 bez zapytań o produkty. Wersja
+        # czytana jest przed produktami, więc odpowiedź nigdy nie jest starsza niż ETag.
+        version = DeliveryGeneral.get_version(delivery_id, supplier_id)
+        etag = make_etag('delivery-products', delivery_id, version, request.query_string) if version is not None else None
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
         
-        if error_message:
-            print(f"Błąd: {error_message}")
-            return jsonify({
-                'success': False,
-                'message': error_message
-            }), 404
-            
-        if not products or len(products) == 0:
-            print(f"Nie znaleziono produktów dla dostawy ID: {delivery_id}")
+        # Parametry strony: kursor, rozmiar, sortowanie i filtry (obsługiwane przez bazę)
+        limit = min(max(request.args.get('limit', 200, type=int), 1), 1000)
+        sort = request.args.get('sort', 'row_num')
+        if sort not in DeliveryProduct.SORT_COLUMNS:
+            sort = 'row_num'
+        descending = request.args.get('order', 'asc') == 'desc'
+        filters = {
+            name: request.args.get(name, '').strip()
+            for name in DeliveryProduct.FILTERS
+            if request.args.get(name, '').strip()
+        }
+        
+        # Jedno zapytanie o stronę: sprawdzenie właściciela, waluta dostawy i kolumny listy produktów
+        delivery, page = DeliveryProduct.get_delivery_page(
+            delivery_id, supplier_id,
+            filters=filters,
+            sort=sort,
+            descending=descending,
+            cursor=request.args.get('cursor'),
+            per_page=limit
+        )
+        
+        if delivery is None:
             return jsonify({
                 'success': False,
-                'message': f'Nie znaleziono produktów dla dostawy ID: {delivery_id}'
+                'message': 'Nie znaleziono dostawy'
             }), 404
-            
-        print(f"Znaleziono {len(products)} produktów dla dostawy ID: {delivery_id}")
         
-        # Sprawdź ceny i wartości pierwszych 5 produktów
-        if products and len(products) > 0:
-            print("Szczegóły pierwszych 5 produktów:")
-            for i, product in enumerate(products[:min(5, len(products))]):
-                print(f"Produkt {i+1} - ID: {product.id_product}, Nazwa: {product.product_name}")
-                print(f"  Cena: {product.price}, Wartość: {product.value}, Waluta: {product.currency}")
-                if hasattr(product, 'original_data') and product.original_data:
-                    print(f"  Mapowanie: {product.original_data}")
+        delivery_currency = delivery['currency']
         
-        # Pobierz informacje o dostawie
-        delivery = DeliveryGeneral.query.filter_by(id_delivery=delivery_id).first()
-        delivery_currency = delivery.currency if delivery else None
-        delivery_exchange_rate = float(delivery.exchange_rate) if delivery and delivery.exchange_rate else None
-        
-        # Przygotuj dane produktów do zwrócenia
-        products_data = []
-        for product in products:
-            product_data = {
+        # Przygotuj dane produktów do zwrócenia (wprost z wierszy zapytania,
+        # kolumny liczbowe zaokrąglane zbiorczo; zero zwracane jako brak wartości)
+        items = page.items
+        quantities = round_numbers([product.quantity or None for product in items])
+        prices = round_numbers([product.price or None for product in items])
+        values = round_numbers([product.value or None for product in items])
+        products_data = [
+            {
                 'id_product': product.id_product,
                 'id_delivery': product.id_delivery,
                 'product_name': product.product_name,
                 'ean_code': product.ean_code,
                 'asin_code': product.asin_code,
-                'quantity': format_number(product.quantity) if product.quantity else None,
+                'quantity': quantity,
                 'unit': product.unit,
-                'price': format_number(product.price) if product.price else None,
-                'value': format_number(product.value) if product.value else None,
+                'price': price,
+                'value': value,
                 'currency': product.currency or delivery_currency or 'EUR',
                 'lot_number': product.lot_number,
                 'pallet_number': product.pallet_number,
                 'row_num': product.row_num
             }
-            products_data.append(product_data)
+            for product, quantity, price, value in zip(items, quantities, prices, values)
+        ]
             
-        return jsonify({
+        return add_validators(jsonify({
             'success': True,
             'products': products_data,
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor,
+            'has_more': page.has_next,
+            'total': page.total,
             'delivery_currency': delivery_currency,
-            'delivery_exchange_rate': delivery_exchange_rate
-        })
+            'delivery_exchange_rate': delivery['exchange_rate']
+        }), etag)
     except Exception as e:
-        print(f"Błąd podczas pobierania produktów: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception(f"Błąd podczas pobierania produktów dostawy {delivery_id}")
         return jsonify({
             'success': False,
             'message': f'Wystąpił błąd: {str(e)}'
@@ -906,8 +1085,18 @@ def get_product_details(product_id):
     try:
         from models.supplier.delivery_produkty_hybrid import DeliveryProduct
         
-        # Pobierz produkt
-        product = DeliveryProduct.query.get(product_id)
+        # ETag z wersji danych dostawy produktu - 304 bez ładowania produktu i jego pól JSON.
+        # Brak produktu lub cudza dostawa obsługiwane są niżej (404 / 403).
+        etag = None
+        owner = DeliveryProduct.get_delivery_version(product_id)
+        if owner is not None and owner.id_supplier == current_user.id_supplier:
+            etag = make_etag('product-details', product_id, owner.data_version)
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+        
+        # Pobierz produkt razem z polami JSON (odroczonymi w listach produktów)
+        product = DeliveryProduct.query.options(db.undefer_group('json')).filter_by(id_product=product_id).first()
         if not product:
             return jsonify({
                 'success': False,
@@ -932,10 +1121,10 @@ def get_product_details(product_id):
             'product_name': product.product_name,
             'ean_code': product.ean_code,
             'asin_code': product.asin_code,
-            'quantity': format_number(product.quantity) if product.quantity else None,
+            'quantity': round_number(product.quantity) if product.quantity else None,
             'unit': product.unit,
-            'price': format_number(product.price) if product.price else None,
-            'value': format_number(product.value) if product.value else None,
+            'price': round_number(product.price) if product.price else None,
+            'value': round_number(product.value) if product.value else None,
             'currency': product.currency,
             'lot_number': product.lot_number,
             'pallet_number': product.pallet_number,
@@ -952,11 +1141,11 @@ def get_product_details(product_id):
         if hasattr(product, 'mapped_fields') and product.mapped_fields:
             product_data['mapped_fields'] = product.mapped_fields
             
-        return jsonify({
+        return add_validators(jsonify({
             'success': True,
             'product': product_data,
             'delivery_exchange_rate': delivery_exchange_rate
-        })
+        }), etag)
     except Exception as e:
         print(f"Błąd podczas pobierania szczegółów produktu: {str(e)}")
         import traceback
@@ -964,4 +1153,184 @@ def get_product_details(product_id):
         return jsonify({
             'success': False,
             'message': f"Błąd podczas pobierania szczegółów produktu: {str(e)}"
-        }), 500 
\ No newline at end of file
+        }), 500 
+
+@supplier_bp.route('/api/ingest-jobs', methods=['POST'])
+@login_required
+@supplier_permission.require(http_exception=403)
+def create_ingest_job():
+    """
+    Przyjmuje plik dostawy i kolejkuje jego przetworzenie w tle.
+    
+    Zwraca od razu ID zadania; stan i wynik dostępne są pod /api/ingest-jobs/<job_id>.
+    """
+    if 'file' not in request.files:
+        return jsonify({'success': False, 'message': 'Nie przesłano pliku'}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'success': False, 'message': 'Nie wybrano pliku'}), 400
+    
+    # Zapisz kopię pliku na dysku - strumień żądania nie jest dostępny po jego zakończeniu.
+    # Odcisk zawartości liczony jest w trakcie kopiowania.
+    suffix = os.path.splitext(secure_filename(file.filename))[1]
+    reader = HashingReader(file.stream)
+    with tempfile.NamedTemporaryFile(prefix='ingest_', suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(reader, tmp)
+    
+    job = ingest_queue.submit(
+        current_user.id_supplier,
+        file.filename,
+        run_ingest_job,
+        tmp.name,
+        file.filename,
+        file.content_type,
+        current_user.id_supplier,
+        request.form.get('delivery_id'),
+        reader.hexdigest()
+    )
+    logger.info(f"Zakolejkowano zadanie {job.id} dla pliku {file.filename} dostawcy {current_user.id_supplier}")
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': url_for('supplier.get_ingest_job', job_id=job.id)
+    }), 202
+
+@supplier_bp.route('/api/ingest-jobs')
+@login_required
+@supplier_permission.require(http_exception=403)
+def list_ingest_jobs():
+    """Zwraca zadania przetwarzania plików zalogowanego dostawcy."""
+    jobs = ingest_queue.list_for_supplier(current_user.id_supplier)
+    return jsonify({
+        'success': True,
+        'jobs': [job.to_dict() for job in jobs]
+    })
+
+@supplier_bp.route('/api/ingest-jobs/<job_id>')
+@login_required
+@supplier_permission.require(http_exception=403)
+def get_ingest_job(job_id):
+    """Zwraca stan, postęp i wynik zadania przetwarzania pliku."""
+    job = ingest_queue.get(job_id, supplier_id=current_user.id_supplier)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': f'Nie znaleziono zadania o ID: {job_id}'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+@supplier_bp.route('/api/upload-url', methods=['POST'])
+@login_required
+@supplier_permission.require(http_exception=403)
+def create_upload_url():
+    """
+    Wydaje podpisany formularz POST do bezpośredniego uploadu pliku dostawy do S3.
+    
+    Plik nie przechodzi przez serwer aplikacji - po zakończeniu uploadu
+    przeglądarka wywołuje /api/upload-complete. Nowa dostawa (delivery_id
+    pusty lub 'TEMP') tworzona jest dopiero przy przetwarzaniu przesłanego
+    pliku, więc porzucone uploady nie zostawiają pustych dostaw.
+    """
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename')
+    if not filename or not secure_filename(filename):
+        return jsonify({'success': False, 'message': 'Nie podano nazwy pliku'}), 400
+    
+    if not filename.lower().endswith(('.csv', '.xls', '.xlsx')):
+        return jsonify({'success': False, 'message': 'Nieobsługiwany format pliku'}), 400
+    
+    supplier_id = current_user.id_supplier
+    content_type = data.get('content_type') or 'application/octet-stream'
+    delivery_id = data.get('delivery_id')
+    
+    try:
+        if not delivery_id or delivery_id == 'TEMP':
+            delivery_id = 'TEMP'
+        elif not DeliveryGeneral.query.filter_by(id_delivery=delivery_id, id_supplier=supplier_id).first():
+            return jsonify({'success': False, 'message': 'Nie znaleziono dostawy'}), 404
+        
+        s3_key = S3Storage.build_key(supplier_id, delivery_id, filename)
+        upload = s3_storage.presigned_post(
+            s3_key,
+            content_type,
+            metadata={'supplier_id': supplier_id, 'delivery_id': delivery_id},
+            max_size=current_app.config.get('S3_MAX_UPLOAD_SIZE'),
+            expires=current_app.config.get('S3_UPLOAD_URL_EXPIRES')
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Błąd podczas generowania adresu uploadu: {str(e)}")
+        return jsonify({'success': False, 'message': f'Nie udało się przygotować uploadu: {str(e)}'}), 500
+    
+    return jsonify({
+        'success': True,
+        'delivery_id': None if delivery_id == 'TEMP' else delivery_id,
+        's3_key': s3_key,
+        'upload': upload
+    })
+
+@supplier_bp.route('/api/upload-complete', methods=['POST'])
+@login_required
+@supplier_permission.require(http_exception=403)
+def complete_upload():
+    """
+    Potwierdza zakończenie bezpośredniego uploadu i kolejkuje przetworzenie pliku.
+    
+    Klucz musi leżeć w katalogu zalogowanego dostawcy, a obiekt musi istnieć
+    w S3. Stan przetwarzania dostępny jest pod zwróconym status_url.
+    
+    Zadanie identyfikowane jest kluczem pliku: ponowione potwierdzenie zwraca
+    zadanie, które czeka lub jest wykonywane, a plik już przetworzony jest
+    odrzucany (409). ID nowej dostawy zwracane jest w wyniku zadania.
+    """
+    data = request.get_json(silent=True) or {}
+    s3_key = data.get('s3_key')
+    filename = data.get('filename')
+    supplier_id = current_user.id_supplier
+    
+    if not filename or not S3Storage.owns_key(supplier_id, s3_key):
+        return jsonify({'success': False, 'message': 'Nieprawidłowy klucz pliku'}), 400
+    
+    from botocore.exceptions import ClientError
+    
+    try:
+        obj = s3_storage.head(s3_key)
+    except ClientError:
+        return jsonify({'success': False, 'message': 'Plik nie został przesłany'}), 404
+    
+    # Dostawa zapisana w metadanych podpisanego formularza (nie ufamy danym z żądania)
+    delivery_id = obj['metadata'].get('delivery_id')
+    if obj['metadata'].get('supplier_id') != supplier_id or not delivery_id:
+        return jsonify({'success': False, 'message': 'Nieprawidłowy klucz pliku'}), 400
+    
+    if DeliveryFileData.get_by_s3_key(s3_key):
+        return jsonify({'success': False, 'message': 'Plik został już przetworzony'}), 409
+    
+    job, created = ingest_queue.submit_once(
+        s3_key,
+        supplier_id,
+        filename,
+        run_object_ingest_job,
+        s3_key,
+        filename,
+        obj['content_type'],
+        obj['size'],
+        delivery_id
+    )
+    if created:
+        logger.info(f"Zakolejkowano zadanie {job.id} dla pliku {s3_key} dostawcy {supplier_id}")
+    else:
+        logger.info(f"Ponowione potwierdzenie uploadu {s3_key} - zwrócono istniejące zadanie {job.id}")
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'delivery_id': None if delivery_id == 'TEMP' else delivery_id,
+        'status_url': url_for('supplier.get_ingest_job', job_id=job.id)
+    }), 202
@@ -0,0 +1,225 @@
+/**
+ * Tabela produktów dostawy z przewijaniem okienkowym.
+ *
+ * Produkty pobierane są stronami (kursor) z /supplier/api/delivery-products/<id>
+ * w miarę przewijania, z filtrami i sortowaniem po stronie serwera. W DOM
+ * renderowane są tylko wiersze widoczne w oknie przewijania (plus zapas),
+ * a wysokość pozostałych wierszy zastępują dwa wiersze-odstępy.
+ */
+class DeliveryProductsTable {
+    /**
+     * @param {Object} options
+     * @param {HTMLElement} options.scrollContainer - Element przewijany (z ograniczoną wysokością)
+     * @param {HTMLElement} options.tableBody - tbody tabeli produktów
+     * @param {number} options.columnsCount - Liczba kolumn tabeli
+     * @param {Function} options.renderRow - (product, response) => HTML komórek wiersza
+     * @param {Function} options.onRowClick - (product) => void
+     * @param {HTMLFormElement} [options.filtersForm] - Formularz z polami name, ean, asin, lot, pallet
+     * @param {NodeList} [options.sortHeaders] - Nagłówki z atrybutem data-sort
+     */
+    constructor(options) {
+        this.scrollContainer = options.scrollContainer;
+        this.tableBody = options.tableBody;
+        this.columnsCount = options.columnsCount;
+        this.renderRow = options.renderRow;
+        this.onRowClick = options.onRowClick;
+        this.filtersForm = options.filtersForm || null;
+        this.sortHeaders = options.sortHeaders || [];
+        this.pageSize = options.pageSize || 200;
+        this.rowHeight = options.rowHeight || 41;
+        this.overscan = options.overscan || 10;
+
+        this.sort = 'row_num';
+        this.order = 'asc';
+        this.reset();
+
+        this.scrollContainer.addEventListener('scroll', () => this.scheduleRender());
+        this.tableBody.addEventListener('click', (e) => {
+            const row = e.target.closest('tr[data-index]');
+            if (row) {
+                this.onRowClick(this.products[Number(row.dataset.index)]);
+            }
+        });
+
+        if (this.filtersForm) {
+            let debounce = null;
+            this.filtersForm.addEventListener('input', () => {
+                clearTimeout(debounce);
+                debounce = setTimeout(() => this.reload(), 300);
+            });
+            this.filtersForm.addEventListener('submit', (e) => {
+                e.preventDefault();
+                this.reload();
+            });
+        }
+
+        this.sortHeaders.forEach(header => {
+            header.classList.add('cursor-pointer', 'select-none');
+            header.addEventListener('click', () => {
+                const sort = header.dataset.sort;
+                this.order = this.sort === sort && this.order === 'asc' ? 'desc' : 'asc';
+                this.sort = sort;
+                this.updateSortIndicators();
+                this.reload();
+            });
+        });
+    }
+
+    reset() {
+        this.products = [];
+        this.response = null;
+        this.total = null;
+        this.nextCursor = null;
+        this.hasMore = true;
+        this.loading = false;
+        this.requestId = (this.requestId || 0) + 1;
+    }
+
+    open(deliveryId) {
+        this.deliveryId = deliveryId;
+        if (this.filtersForm) {
+            this.filtersForm.reset();
+        }
+        this.sort = 'row_num';
+        this.order = 'asc';
+        this.updateSortIndicators();
+        this.reload();
+    }
+
+    reload() {
+        this.reset();
+        this.scrollContainer.scrollTop = 0;
+        this.showMessage('Ładowanie produktów...');
+        this.loadNextPage();
+    }
+
+    buildUrl() {
+        const params = new URLSearchParams({ limit: this.pageSize, sort: this.sort, order: this.order });
+        if (this.nextCursor) {
+            params.set('cursor', this.nextCursor);
+        }
+        if (this.filtersForm) {
+            new FormData(this.filtersForm).forEach((value, name) => {
+                if (String(value).trim()) {
+                    params.set(name, String(value).trim());
+                }
+            });
+        }
+        // Kodujemy ID dostawy, aby uniknąć problemów ze znakiem '/'
+        return `/supplier/api/delivery-products/${encodeURIComponent(this.deliveryId)}?${params}`;
+    }
+
+    async loadNextPage() {
+        if (this.loading || !this.hasMore) {
+            return;
+        }
+        this.loading = true;
+        const requestId = this.requestId;
+
+        try {
+            const response = await fetch(this.buildUrl(), {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                credentials: 'same-origin'
+            });
+            const data = await response.json().catch(() => ({}));
+            if (!response.ok || !data.success) {
+                throw new Error(data.message || `Błąd API: ${response.status} ${response.statusText}`);
+            }
+            // Odpowiedź na nieaktualne zapytanie (zmiana filtrów lub dostawy w trakcie ładowania)
+            if (requestId !== this.requestId) {
+                return;
+            }
+
+            this.response = data;
+            this.products.push(...data.products);
+            if (data.total !== null && data.total !== undefined) {
+                this.total = data.total;
+            }
+            this.nextCursor = data.next_cursor;
+            this.hasMore = Boolean(data.has_more);
+        } catch (error) {
+            console.error('Błąd podczas pobierania produktów:', error);
+            if (requestId === this.requestId) {
+                this.hasMore = false;
+                this.showMessage(`Błąd: ${error.message}`, true);
+            }
+            return;
+        } finally {
+            if (requestId === this.requestId) {
+                this.loading = false;
+            }
+        }
+
+        if (this.products.length === 0) {
+            this.showMessage('Brak produktów dla tej dostawy');
+            return;
+        }
+        this.render();
+    }
+
+    scheduleRender() {
+        if (this.renderPending) {
+            return;
+        }
+        this.renderPending = true;
+        requestAnimationFrame(() => {
+            this.renderPending = false;
+            if (this.products.length) {
+                this.render();
+            }
+        });
+    }
+
+    render() {
+        const totalRows = Math.max(this.total ?? this.products.length, this.products.length);
+        const viewport = this.scrollContainer.clientHeight || 600;
+        const first = Math.max(0, Math.floor(this.scrollContainer.scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(this.products.length, first + Math.ceil(viewport / this.rowHeight) + 2 * this.overscan);
+
+        const rows = [];
+        for (let index = first; index < last; index++) {
+            rows.push(`<tr data-index="${index}" class="border-b dark:border-gray-600 hover:bg-gray-100 dark:hover:bg-gray-700 cursor-pointer transition-colors duration-200">${this.renderRow(this.products[index], this.response)}</tr>`);
+        }
+
+        this.tableBody.innerHTML =
+            this.spacer(first * this.rowHeight) +
+            rows.join('') +
+            this.spacer((totalRows - last) * this.rowHeight);
+
+        // Wysokość wiersza mierzona po pierwszym renderowaniu
+        const renderedRow = this.tableBody.querySelector('tr[data-index]');
+        if (renderedRow && renderedRow.offsetHeight && renderedRow.offsetHeight !== this.rowHeight) {
+            this.rowHeight = renderedRow.offsetHeight;
+        }
+
+        // Doładuj kolejną stronę, gdy okno zbliża się do końca pobranych wierszy
+        if (this.hasMore && last >= this.products.length - this.overscan) {
+            this.loadNextPage();
+        }
+    }
+
+    spacer(height) {
+        return height > 0 ? `<tr aria-hidden="true"><td colspan="${this.columnsCount}" style="height:${height}px;padding:0;border:0"></td></tr>` : '';
+    }
+
+    showMessage(message, isError = false) {
+        this.tableBody.innerHTML = `<tr><td colspan="${this.columnsCount}" class="px-4 py-2 text-center${isError ? ' text-red-500' : ''}">${DeliveryProductsTable.escape(message)}</td></tr>`;
+    }
+
+    updateSortIndicators() {
+        this.sortHeaders.forEach(header => {
+            const label = header.dataset.label || header.textContent.trim();
+            header.dataset.label = label;
+            header.textContent = header.dataset.sort === this.sort ? `${label} ${this.order === 'asc' ? '▲' : '▼'}` : label;
+        });
+    }
+
+    static escape(value) {
+        return String(value ?? '')
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;')
+            .replace(/'/g, '&#39;');
+    }
+}
@@ -28,6 +28,9 @@ const SupplierDelivery = {
         // Endpointy API
         apiEndpoints: {
             processExcel: '/supplier/api/process-excel',
+            ingestJobs: '/supplier/api/ingest-jobs',
+            uploadUrl: '/supplier/api/upload-url',
+            uploadComplete: '/supplier/api/upload-complete',
             saveDelivery: '/supplier/api/save-delivery',
             refreshSession: '/supplier/api/refresh-session'
         },
@@ -83,6 +86,12 @@ const SupplierDelivery = {
             }
         },
 
+        // Konfiguracja zadań przetwarzania plików w tle
+        ingestJobs: {
+            pollInterval: 1000, // 1 sekunda
+            directUpload: true // upload bezpośrednio do S3 (podpisany formularz POST)
+        },
+
         // Konfiguracja sesji
         session: {
             refreshInterval: 300000, // 5 minut
@@ -807,56 +816,18 @@ const SupplierDelivery = {
                     SupplierDelivery.ui.showLoading('Przetwarzanie pliku...');
 
                     try {
-                        console.log('Wysyłanie żądania do:', SupplierDelivery.config.apiEndpoints.processExcel);
-                        
-                        // Wyślij plik do API
-                        const response = await fetch(SupplierDelivery.config.apiEndpoints.processExcel, {
-                            method: 'POST',
-                            body: formData,
-                            headers: {
-                                'X-CSRFToken': csrfToken,
-                                'X-Requested-With': 'XMLHttpRequest'
-                            },
-                            credentials: 'same-origin'
-                        });
-
-                        // Sprawdź typ odpowiedzi
-                        const contentType = response.headers.get("content-type");
-                        
-                        // Próbuj pobrać dane JSON niezależnie od statusu odpowiedzi
-                        let responseData;
-                        try {
-                            if (contentType && contentType.includes("application/json")) {
-                                responseData = await response.json();
-                            }
-                        } catch (e) {
-                            console.error('Błąd parsowania JSON:', e);
-                            throw new Error('Błąd podczas przetwarzania odpowiedzi serwera');
-                        }
-
-                        if (!response.ok) {
-                            // Użyj komunikatu z odpowiedzi JSON jeśli jest dostępny
-                            const errorMessage = responseData?.message || `Błąd serwera: ${response.status} ${response.statusText}`;
-                            throw new Error(errorMessage);
-                        }
+                        // Prześlij plik i zakolejkuj przetwarzanie - serwer zwraca od razu ID zadania
+                        const jobResponse = await this.submitIngestJob(file, formData, csrfToken);
 
-                        if (!responseData) {
-                            throw new Error('Nieoczekiwany format odpowiedzi z serwera');
-                        }
-
-                        if (!responseData.success) {
-                            throw new Error(responseData.message || 'Wystąpił błąd podczas przetwarzania pliku');
-                        }
-
-                        // Zapisz przetworzone dane
-                        this.processedData = responseData.data;
+                        // Czekaj na zakończenie przetwarzania w tle i zapisz przetworzone dane
+                        this.processedData = await this.waitForIngestJob(jobResponse.status_url);
                         
                         // Wyświetl plik w tabeli
                         this.displayFileInTable(file);
                         
                         // Aktualizuj dane dostawy
-                        await this.handleLotAnalysis(responseData.data.lot_analysis);
-                        this.updateDeliveryData(responseData.data);
+                        await this.handleLotAnalysis(this.processedData.lot_analysis);
+                        this.updateDeliveryData(this.processedData);
                         
                         SupplierDelivery.ui.showNotification('Plik został pomyślnie przetworzony', 'success');
                         
@@ -890,6 +861,128 @@ const SupplierDelivery = {
             }
         },
 
+        async submitIngestJob(file, formData, csrfToken) {
+            if (SupplierDelivery.config.ingestJobs.directUpload) {
+                try {
+                    return await this.uploadDirect(file, csrfToken);
+                } catch (error) {
+                    // Np. brak konfiguracji CORS bucketu - wyślij plik przez serwer
+                    console.warn('Upload bezpośredni do S3 nie powiódł się, wysyłam plik przez serwer:', error);
+                }
+            }
+
+            console.log('Wysyłanie żądania do:', SupplierDelivery.config.apiEndpoints.ingestJobs);
+            const response = await fetch(SupplierDelivery.config.apiEndpoints.ingestJobs, {
+                method: 'POST',
+                body: formData,
+                headers: {
+                    'X-CSRFToken': csrfToken,
+                    'X-Requested-With': 'XMLHttpRequest'
+                },
+                credentials: 'same-origin'
+            });
+
+            const jobResponse = await this.parseJsonResponse(response);
+            if (!jobResponse.success) {
+                throw new Error(jobResponse.message || 'Wystąpił błąd podczas przetwarzania pliku');
+            }
+            return jobResponse;
+        },
+
+        async uploadDirect(file, csrfToken) {
+            const headers = {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken,
+                'X-Requested-With': 'XMLHttpRequest'
+            };
+
+            // 1. Pobierz podpisany formularz uploadu
+            const urlResponse = await this.parseJsonResponse(await fetch(SupplierDelivery.config.apiEndpoints.uploadUrl, {
+                method: 'POST',
+                headers,
+                credentials: 'same-origin',
+                body: JSON.stringify({
+                    filename: file.name,
+                    content_type: file.type || 'application/octet-stream',
+                    delivery_id: this.processedData ? this.processedData.delivery_id : null
+                })
+            }));
+            if (!urlResponse.success) {
+                throw new Error(urlResponse.message || 'Nie udało się przygotować uploadu');
+            }
+
+            // 2. Wyślij plik bezpośrednio do S3 (pola formularza muszą poprzedzać plik)
+            const uploadData = new FormData();
+            Object.entries(urlResponse.upload.fields).forEach(([name, value]) => uploadData.append(name, value));
+            uploadData.append('file', file);
+
+            const uploadResponse = await fetch(urlResponse.upload.url, { method: 'POST', body: uploadData });
+            if (!uploadResponse.ok) {
+                throw new Error(`Błąd uploadu do S3: ${uploadResponse.status}`);
+            }
+
+            // 3. Potwierdź upload - serwer kolejkuje przetwarzanie pliku z S3
+            const jobResponse = await this.parseJsonResponse(await fetch(SupplierDelivery.config.apiEndpoints.uploadComplete, {
+                method: 'POST',
+                headers,
+                credentials: 'same-origin',
+                body: JSON.stringify({ s3_key: urlResponse.s3_key, filename: file.name })
+            }));
+            if (!jobResponse.success) {
+                throw new Error(jobResponse.message || 'Wystąpił błąd podczas przetwarzania pliku');
+            }
+            return jobResponse;
+        },
+
+        async parseJsonResponse(response) {
+            // Próbuj pobrać dane JSON niezależnie od statusu odpowiedzi
+            const contentType = response.headers.get("content-type");
+            let responseData;
+            try {
+                if (contentType && contentType.includes("application/json")) {
+                    responseData = await response.json();
+                }
+            } catch (e) {
+                console.error('Błąd parsowania JSON:', e);
+                throw new Error('Błąd podczas przetwarzania odpowiedzi serwera');
+            }
+
+            if (!response.ok) {
+                // Użyj komunikatu z odpowiedzi JSON jeśli jest dostępny
+                const errorMessage = responseData?.message || `Błąd serwera: ${response.status} ${response.statusText}`;
+                throw new Error(errorMessage);
+            }
+
+            if (!responseData) {
+                throw new Error('Nieoczekiwany format odpowiedzi z serwera');
+            }
+
+            return responseData;
+        },
+
+        async waitForIngestJob(statusUrl) {
+            const pollInterval = SupplierDelivery.config.ingestJobs.pollInterval;
+
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, pollInterval));
+
+                const response = await fetch(statusUrl, {
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                    credentials: 'same-origin'
+                });
+                const { job } = await this.parseJsonResponse(response);
+
+                if (job.state === 'done') {
+                    return job.result;
+                }
+                if (job.state === 'failed') {
+                    throw new Error(job.error || 'Wystąpił błąd podczas przetwarzania pliku');
+                }
+
+                SupplierDelivery.ui.showLoading(`Przetwarzanie pliku... (wczytano wierszy: ${job.progress.rows_read})`);
+            }
+        },
+
         async handleLotAnalysis(lotAnalysis) {
             console.log('Otrzymano analizę LOT z backendu:', lotAnalysis);
             
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla odroczonego zapisu danych logowania
+"""
+
+import unittest
+from datetime import datetime
+from flask import Flask
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, event, select
+from utils.auth_activity import AuthActivityBuffer
+
+class TestAuthActivityBuffer(unittest.TestCase):
+    """
+    Testy łączenia zmian i zbiorczego zapisu
+    """
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        metadata = MetaData()
+        self.table = Table(
+            'login_auth_data', metadata,
+            Column('id_login', String(20), primary_key=True),
+            Column('related_id', String(20), unique=True, nullable=False),
+            Column('failed_login_attempts', Integer, default=0),
+            Column('last_login', DateTime, nullable=True),
+            Column('locked_until', DateTime, nullable=True)
+        )
+        metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            connection.execute(self.table.insert(), [
+                {'id_login': 'L1', 'related_id': 'SUP/1', 'failed_login_attempts': 2},
+                {'id_login': 'L2', 'related_id': 'SUP/2', 'failed_login_attempts': 0}
+            ])
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+        app = Flask(__name__)
+        app.config['AUTH_ACTIVITY_FLUSH_INTERVAL'] = 60
+        self.buffer = AuthActivityBuffer()
+        self.buffer.init_app(app, self.table, self.engine)
+        self.buffer._ensure_flusher = lambda: None
+
+    def row(self, related_id):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(self.table).where(self.table.c.related_id == related_id)
+            ).mappings().one()
+
+    def test_heartbeats_are_coalesced(self):
+        """
+        Test braku zapisu przed flush i jednego UPDATE dla wielu odświeżeń
+        """
+        for _ in range(10):
+            self.buffer.touch('SUP/1')
+        self.buffer.touch('SUP/2')
+
+        self.assertEqual(self.statements, [])
+        self.assertIsNone(self.row('SUP/1')['last_login'])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        updates = [statement for statement in self.statements if statement.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIsNotNone(self.row('SUP/1')['last_login'])
+        self.assertIsNotNone(self.row('SUP/2')['last_login'])
+        self.assertEqual(self.row('SUP/1')['failed_login_attempts'], 2)
+
+    def test_failures_are_incremented(self):
+        """
+        Test przyrostu failed_login_attempts o liczbę prób z bufora
+        """
+        self.buffer.record_failure('SUP/1')
+        self.buffer.record_failure('SUP/1')
+        self.buffer.flush()
+
+        self.assertEqual(self.row('SUP/1')['failed_login_attempts'], 4)
+        self.assertIsNone(self.row('SUP/1')['last_login'])
+
+    def test_login_resets_failures(self):
+        """
+        Test zerowania licznika przy udanym logowaniu (także po wcześniejszych próbach z bufora)
+        """
+        self.buffer.record_failure('SUP/1')
+        self.buffer.record_login('SUP/1')
+        self.buffer.record_failure('SUP/1')
+        self.buffer.flush()
+
+        self.assertEqual(self.row('SUP/1')['failed_login_attempts'], 1)
+        self.assertIsNotNone(self.row('SUP/1')['last_login'])
+
+    def test_lock_written_and_cleared_by_login(self):
+        """
+        Test zapisu blokady konta i jej zdjęcia po udanym logowaniu
+        """
+        lock_until = datetime(2030, 1, 1, 12, 0)
+        self.buffer.record_failure('SUP/1', lock_until=lock_until)
+        self.assertEqual(self.buffer.locked_until('SUP/1', None), lock_until)
+        self.buffer.flush()
+        self.assertEqual(self.row('SUP/1')['locked_until'], lock_until)
+
+        self.buffer.record_login('SUP/1')
+        self.assertIsNone(self.buffer.locked_until('SUP/1', lock_until))
+        self.buffer.flush()
+        self.assertIsNone(self.row('SUP/1')['locked_until'])
+        self.assertEqual(self.row('SUP/1')['failed_login_attempts'], 0)
+
+    def test_failed_flush_is_retried(self):
+        """
+        Test ponowienia zapisu po błędzie bazy
+        """
+        self.buffer.record_failure('SUP/1')
+        engine = self.buffer._engine
+        self.buffer._engine = create_engine('sqlite://')
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.pending_count(), 1)
+
+        self.buffer._engine = engine
+        self.buffer.record_failure('SUP/1')
+        self.buffer.flush()
+        self.assertEqual(self.row('SUP/1')['failed_login_attempts'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla kompaktowego formatu przechowywania tabel
+"""
+
+import unittest
+import pandas as pd
+from utils.compact_table import CompactTable, CompactTableWriter, CODEC_ZLIB
+
+class TestCompactTable(unittest.TestCase):
+    """
+    Testy dla kodowania i leniwego odczytu tabel w formacie kolumnowym
+    """
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'EAN': [str(5900000 + i) for i in range(25)],
+            'ILOSC': list(range(25)),
+            'NAZWA': [f'Produkt {i}' if i % 7 else None for i in range(25)],
+        })
+
+    def test_roundtrip_rows_across_groups(self):
+        """
+        Test odczytu zakresu wierszy obejmującego kilka grup
+        """
+        table = CompactTable(CompactTable.encode(self.df, group_size=10))
+
+        self.assertEqual(table.headers, ['EAN', 'ILOSC', 'NAZWA'])
+        self.assertEqual(table.row_count, 25)
+        rows = table.rows(8, 12)
+        self.assertEqual([row['ILOSC'] for row in rows], [8, 9, 10, 11])
+        self.assertEqual(rows[0]['NAZWA'], 'Produkt 8')
+        self.assertEqual(table.rows(20)[1], {'EAN': '5900021', 'ILOSC': 21, 'NAZWA': None})
+        self.assertEqual(len(table.rows(20)), 5)
+
+    def test_lazy_decoding_of_requested_blocks(self):
+        """
+        Test dekodowania wyłącznie bloków potrzebnych do odczytu
+        """
+        table = CompactTable(CompactTable.encode(self.df, group_size=10))
+
+        rows = table.rows(0, 3, columns=['EAN'])
+        self.assertEqual(rows, [{'EAN': '5900000'}, {'EAN': '5900001'}, {'EAN': '5900002'}])
+        self.assertEqual(set(table._cache), {(0, 'EAN')})
+
+        self.assertEqual(table.column('ILOSC'), list(range(25)))
+
+    def test_incremental_writer(self):
+        """
+        Test budowania tabeli porcjami (tryb strumieniowy)
+        """
+        writer = CompactTableWriter(codec=CODEC_ZLIB)
+        writer.append(self.df.iloc[:5])
+        writer.append(self.df.iloc[5:0])
+        writer.append(self.df.iloc[5:9])
+        table = CompactTable(writer.getvalue())
+
+        self.assertEqual(table.row_count, 9)
+        self.assertEqual(table.rows(4, 6, columns=['ILOSC']), [{'ILOSC': 4}, {'ILOSC': 5}])
+
+    def test_writer_row_limit(self):
+        """
+        Test pomijania wierszy ponad limit writera (podgląd pliku w trybie strumieniowym)
+        """
+        writer = CompactTableWriter(codec=CODEC_ZLIB, max_rows=12)
+        for start in range(0, 25, 10):
+            writer.append(self.df.iloc[start:start + 10])
+        table = CompactTable(writer.getvalue())
+
+        self.assertEqual(table.row_count, 12)
+        self.assertEqual(table.column('ILOSC'), list(range(12)))
+
+    def test_invalid_data(self):
+        """
+        Test odrzucenia danych w nieznanym formacie
+        """
+        with self.assertRaises(ValueError):
+            CompactTable(b'{"rows": []}')
+
+if __name__ == '__main__':
+    unittest.main()
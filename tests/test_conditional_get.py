@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla warunkowych żądań GET (ETag / If-None-Match)
+"""
+
+import unittest
+from flask import Flask, jsonify
+from utils.conditional_get import add_validators, make_etag, not_modified
+
+class TestConditionalGet(unittest.TestCase):
+    """
+    Testy ETag, odpowiedzi 304 i nagłówków Cache-Control
+    """
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.loads = 0
+
+        @self.app.route('/api/products/<delivery_id>')
+        def products(delivery_id):
+            etag = make_etag('products', delivery_id, self.app.config['VERSION'])
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+            self.loads += 1
+            return add_validators(jsonify({'products': [delivery_id]}), etag)
+
+        self.app.config['VERSION'] = 1
+        self.client = self.app.test_client()
+
+    def test_etag_depends_on_all_parts(self):
+        """
+        Test zmiany ETag po zmianie wersji lub parametrów żądania
+        """
+        etag = make_etag('products', 'DEL000001', 1, b'limit=200')
+        self.assertEqual(etag, make_etag('products', 'DEL000001', 1, b'limit=200'))
+        self.assertNotEqual(etag, make_etag('products', 'DEL000001', 2, b'limit=200'))
+        self.assertNotEqual(etag, make_etag('products', 'DEL000001', 1, b'limit=100'))
+        self.assertNotEqual(make_etag('ab', 'c'), make_etag('a', 'bc'))
+
+    def test_not_modified_until_version_changes(self):
+        """
+        Test odpowiedzi 304 bez ładowania danych i 200 po zmianie wersji
+        """
+        response = self.client.get('/api/products/DEL000001')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+
+        response = self.client.get('/api/products/DEL000001', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(self.loads, 1)
+
+        self.app.config['VERSION'] = 2
+        response = self.client.get('/api/products/DEL000001', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.loads, 2)
+
+    def test_without_etag(self):
+        """
+        Test braku walidatorów dla odpowiedzi bez ETag (np. błędów)
+        """
+        with self.app.test_request_context('/', headers={'If-None-Match': '*'}):
+            self.assertIsNone(not_modified(None))
+            response = add_validators(jsonify({'success': False}), None)
+        self.assertNotIn('ETag', response.headers)
+        self.assertNotIn('Cache-Control', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
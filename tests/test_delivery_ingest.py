@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla mapowania wierszy pliku na produkty dostawy
+"""
+
+import unittest
+import pandas as pd
+from utils.delivery_ingest import DeliveryIngest
+
+class TestDeliveryIngest(unittest.TestCase):
+    """
+    Testy dla planu mapowania kolumn i projekcji wierszy
+    """
+
+    def setUp(self):
+        self.df = DeliveryIngest.clean_frame(pd.DataFrame({
+            'Nr Lot': ['LOT1', 'LOT2'],
+            'Item Desc': ['Produkt A', 'Produkt B'],
+            'EAN': ['590001', None],
+            'Ilosc': [2, 3],
+            'Cena': [10.5, 20.0],
+            'Wartosc': [21.0, 60.0],
+        }))
+
+    def test_resolve_mapping_plan(self):
+        """
+        Test wyznaczania planu mapowania na podstawie nagłówków
+        """
+        plan = DeliveryIngest.resolve_mapping_plan(self.df.columns)
+
+        self.assertEqual(plan['lot_number'], 'NR LOT')
+        self.assertEqual(plan['product_name'], 'ITEM DESC')
+        self.assertEqual(plan['ean_code'], 'EAN')
+        self.assertEqual(plan['quantity'], 'ILOSC')
+        self.assertEqual(plan['price'], 'CENA')
+        self.assertEqual(plan['value'], 'WARTOSC')
+        self.assertNotIn('asin_code', plan)
+
+    def test_resolve_mapping_plan_column_shared_by_fields(self):
+        """
+        Test kolumny pasującej do kilku pól (np. 'amount' jako ilość i wartość)
+        """
+        plan = DeliveryIngest.resolve_mapping_plan(['AMOUNT'])
+
+        self.assertEqual(plan['quantity'], 'AMOUNT')
+        self.assertEqual(plan['value'], 'AMOUNT')
+
+    def test_map_products(self):
+        """
+        Test projekcji wierszy na dane produktów
+        """
+        products = DeliveryIngest.map_products(self.df, 'DEL000001')
+
+        self.assertEqual(len(products), 2)
+        self.assertEqual(products[1]['product_name'], 'Produkt B')
+        self.assertIsNone(products[1]['ean_code'])
+        self.assertIsNone(products[0]['asin_code'])
+        self.assertEqual(products[1]['row_num'], 2)
+        self.assertEqual(products[0]['id_delivery'], 'DEL000001')
+        self.assertEqual(products[0]['mapped_fields']['price'], 'CENA')
+        self.assertEqual(products[0]['original_data']['ITEM DESC'], 'Produkt A')
+
+    def test_infer_price_and_value_columns(self):
+        """
+        Test wnioskowania kolumn ceny i wartości z próbki danych
+        """
+        df = DeliveryIngest.clean_frame(pd.DataFrame({
+            'Item Desc': ['A', 'B', 'C', 'D'],
+            'Qty': [2, 1, 4, 3],
+            'Kol1': ['12,50', '3.10', '7', None],
+            'Kol2': [25.0, 3.1, 28.0, 10.0],
+        }))
+        plan = DeliveryIngest.resolve_mapping_plan(df.columns, df)
+
+        self.assertEqual(plan['price'], 'KOL1')
+        self.assertEqual(plan['price_confidence'], 1.0)
+        self.assertEqual(plan['value'], 'KOL2')
+        self.assertEqual(plan['value_confidence'], 1.0)
+
+        products = DeliveryIngest.map_products(df, 'DEL000001', plan)
+        self.assertEqual(products[0]['price'], 12.5)
+        self.assertEqual(products[3]['price'], 0.0)
+        self.assertEqual(products[0]['quantity'], 2.0)
+        self.assertEqual(products[0]['mapped_fields']['value'], 'KOL2')
+
+    def test_no_inference_for_non_numeric_columns(self):
+        """
+        Test braku mapowania, gdy żadna kolumna nie wygląda na cenę
+        """
+        df = DeliveryIngest.clean_frame(pd.DataFrame({
+            'Item Desc': ['A', 'B'],
+            'Opis': ['x', 'y'],
+        }))
+        plan = DeliveryIngest.resolve_mapping_plan(df.columns, df)
+
+        self.assertNotIn('price', plan)
+        self.assertNotIn('value', plan)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla wsadowego zapisu produktów dostawy
+
+Zapis sprawdzany jest na bazie SQLite w pamięci (tryb executemany z punktami
+zapisu). Testy wymagają modułu konfiguracji aplikacji (config.py) - bez niego
+modele nie mogą zostać zaimportowane i testy są pomijane.
+"""
+
+import importlib.util
+import unittest
+from datetime import date
+from flask import Flask
+
+HAS_CONFIG = importlib.util.find_spec('config') is not None
+
+@unittest.skipUnless(HAS_CONFIG, 'Brak modułu config - testy zapisu produktów pominięte')
+class TestDeliveryProductBulkWriter(unittest.TestCase):
+    """
+    Testy zapisu wsadami, izolacji błędnych wsadów i statystyk zapisu
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from __init__ import db
+        from models.supplier.delivery_general import DeliveryGeneral
+        from models.supplier.delivery_produkty_hybrid import DeliveryProduct
+
+        cls.db = db
+        cls.DeliveryGeneral = DeliveryGeneral
+        cls.DeliveryProduct = DeliveryProduct
+        cls.app = Flask(__name__)
+        cls.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            SQLALCHEMY_TRACK_MODIFICATIONS=False,
+            BULK_INSERT_BATCH_SIZE=2
+        )
+        db.init_app(cls.app)
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+        tables = [self.DeliveryGeneral.__table__, self.DeliveryProduct.__table__]
+        self.db.metadata.create_all(self.db.engine, tables=tables)
+        self.db.session.execute(self.DeliveryGeneral.__table__.insert().values(
+            id_delivery='DEL000001', id_supplier='SUP/1', lot_number='LOT1', pallet_number='PAL1',
+            delivery_category='Elektronika', total_value=0, total_value_pln=0, delivery_value=0,
+            product_class='A', items_count=0, lots_count=0, pallets_count=0, vat_rate='23',
+            value_percentage=100, currency='EUR', status='new', delivery_date=date(2025, 1, 1)
+        ))
+        self.db.session.commit()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.db.metadata.drop_all(
+            self.db.engine, tables=[self.DeliveryProduct.__table__, self.DeliveryGeneral.__table__]
+        )
+        self.context.pop()
+
+    def products(self, *ids):
+        return [
+            {
+                'id_product': product_id, 'product_name': f'Produkt {product_id}', 'ean_code': '5900000000000',
+                'quantity': 1.0, 'price': 2.5, 'value': 2.5, 'row_num': row_num,
+                'original_data': {'EAN': '5900000000000', 'OPIS': 'a\tb'}, 'mapped_fields': {'ean_code': 'EAN'}
+            }
+            for row_num, product_id in enumerate(ids, start=1)
+        ]
+
+    def stored_ids(self):
+        return sorted(self.db.session.scalars(
+            self.db.select(self.DeliveryProduct.id_product).filter_by(id_delivery='DEL000001')
+        ))
+
+    def test_batches_written_in_one_transaction(self):
+        """
+        Test zapisu wsadami, statystyk i zwiększenia wersji dostawy
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
+
+        writer = DeliveryProductBulkWriter('DEL000001')
+        self.assertEqual(writer.write(self.products('P1', 'P2', 'P3')), 3)
+        self.assertEqual(writer.write(self.products('P4')), 1)
+        writer.commit()
+
+        self.assertEqual(self.stored_ids(), ['P1', 'P2', 'P3', 'P4'])
+        stats = writer.stats()
+        self.assertEqual(stats['rows_written'], 4)
+        self.assertEqual(stats['failed_batches'], 0)
+        self.assertEqual(stats['mode'], 'executemany')
+
+        product = self.db.session.get(self.DeliveryProduct, 'P1')
+        self.assertEqual(product.original_data, {'EAN': '5900000000000', 'OPIS': 'a\tb'})
+        self.assertEqual(self.DeliveryGeneral.get_version('DEL000001', 'SUP/1'), 3)
+
+    def test_failed_batch_does_not_roll_back_others(self):
+        """
+        Test wycofania tylko wsadu z błędem (powtórzony klucz) - pozostałe wsady są zapisywane
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
+
+        writer = DeliveryProductBulkWriter('DEL000001')
+        # Wsady po 2 wiersze: [P1, P2], [P3, P1 - powtórzony klucz], [P5]
+        with self.assertLogs('models.supplier.delivery_product_writer', 'ERROR'):
+            written = writer.write(self.products('P1', 'P2', 'P3', 'P1', 'P5'))
+        writer.commit()
+
+        self.assertEqual(written, 3)
+        self.assertEqual(self.stored_ids(), ['P1', 'P2', 'P5'])
+        self.assertEqual(writer.stats()['rows_written'], 3)
+        self.assertEqual(writer.stats()['failed_batches'], 1)
+
+    def test_all_batches_failed(self):
+        """
+        Test braku zapisu i braku zmiany wersji dostawy, gdy wszystkie wsady są błędne
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
+
+        writer = DeliveryProductBulkWriter('DEL000001', batch_size=10)
+        with self.assertLogs('models.supplier.delivery_product_writer', 'ERROR'):
+            self.assertEqual(writer.write(self.products('P1', 'P1')), 0)
+        writer.commit()
+
+        self.assertEqual(self.stored_ids(), [])
+        self.assertEqual(writer.stats()['failed_batches'], 1)
+        self.assertEqual(self.DeliveryGeneral.get_version('DEL000001', 'SUP/1'), 1)
+
+    def test_load_data_escaping(self):
+        """
+        Test formatowania pól dla LOAD DATA (NULL, tabulacje, nowe linie, ukośniki)
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
+
+        escape = DeliveryProductBulkWriter._escape
+        self.assertEqual(escape(None), '\\N')
+        self.assertEqual(escape('a\tb\nc\rd'), 'a\\tb\\nc\\rd')
+        self.assertEqual(escape('C:\\dane\\N'), 'C:\\\\dane\\\\N')
+        self.assertEqual(escape(2.5), '2.5')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla strumieniowego czytnika plików dostaw
+"""
+
+import io
+import unittest
+from openpyxl import Workbook
+from utils.file_chunk_reader import FileChunkReader
+
+class TestFileChunkReader(unittest.TestCase):
+    """
+    Testy dla odczytu plików CSV/XLSX porcjami
+    """
+
+    def test_csv_chunks_have_continuous_index(self):
+        """
+        Test podziału pliku CSV na porcje z ciągłym indeksem
+        """
+        content = "EAN,NAZWA\n" + "".join(f"{i},Produkt {i}\n" for i in range(7))
+        chunks = list(FileChunkReader.iter_chunks(io.BytesIO(content.encode('utf-8')), 'plik.csv', chunk_size=3))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(chunks[1].index.tolist(), [3, 4, 5])
+        self.assertEqual(chunks[2].iloc[0]['NAZWA'], 'Produkt 6')
+
+    def test_xlsx_chunks_skip_empty_rows(self):
+        """
+        Test odczytu arkusza XLSX wiersz po wierszu z pominięciem pustych wierszy
+        """
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['EAN', 'Ilość', None])
+        sheet.append([1, 2, 'x'])
+        sheet.append([None, None, None])
+        sheet.append([3, 4])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        chunks = list(FileChunkReader.iter_chunks(buffer, 'plik.xlsx', chunk_size=1))
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].columns.tolist(), ['EAN', 'Ilość', 'Unnamed: 2'])
+        self.assertEqual(chunks[1].index.tolist(), [1])
+        self.assertIsNone(chunks[1].iloc[0]['Unnamed: 2'])
+
+    def test_normalize_columns(self):
+        """
+        Test normalizacji nazw kolumn
+        """
+        self.assertEqual(FileChunkReader.normalize_columns([' nr lot ', 'Ean', 5]), ['NR LOT', 'EAN', '5'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla formatowania liczb i kwot w formacie polskim
+"""
+
+import unittest
+from decimal import Decimal
+from utils.formatters import (
+    format_currency, format_exchange_rate, format_number, round_number, round_numbers, to_number
+)
+
+class TestFormatters(unittest.TestCase):
+    """
+    Testy formatowania pojedynczych wartości i kolumn
+    """
+
+    def test_polish_grouping(self):
+        """
+        Test separatorów tysięcy i przecinka dziesiętnego
+        """
+        self.assertEqual(format_number(1234567.891), '1 234 567,89')
+        self.assertEqual(format_number(Decimal('-1234.5')), '-1 234,50')
+        self.assertEqual(format_number(12), '12,00')
+        self.assertEqual(format_exchange_rate(Decimal('4.31')), '4,3100')
+
+    def test_decimal_rounds_half_up(self):
+        """
+        Test zaokrąglania kwot Decimal "połówki w górę"
+        """
+        self.assertEqual(format_number(Decimal('0.125')), '0,13')
+        self.assertEqual(format_number(Decimal('2.675')), '2,68')
+
+    def test_invalid_values(self):
+        """
+        Test wartości pustych, niepoprawnych i nieskończonych
+        """
+        for value in (None, 'abc', float('nan'), float('inf'), Decimal('NaN'), Decimal('sNaN'), True):
+            self.assertEqual(format_number(value), '0,00')
+            self.assertIsNone(round_number(value))
+        self.assertEqual(format_number(None, default='-'), '-')
+
+    def test_strings_are_parsed(self):
+        """
+        Test napisów ze spacjami i przecinkiem dziesiętnym
+        """
+        self.assertEqual(to_number('1 234,5'), 1234.5)
+        self.assertEqual(to_number('1\xa0234,5'), 1234.5)
+        self.assertEqual(format_number('1 234,5'), '1 234,50')
+
+    def test_currency(self):
+        """
+        Test symboli walut
+        """
+        self.assertEqual(format_currency(Decimal('1234.5')), '1 234,50 zł')
+        self.assertEqual(format_currency(10, 'EUR'), '10,00 €')
+        self.assertEqual(format_currency(None, 'USD'), '0,00 USD')
+
+    def test_columns_match_single_values(self):
+        """
+        Test zgodności zaokrąglania kolumn z zaokrąglaniem pojedynczych wartości
+        """
+        values = [Decimal('1000.10'), 2.5, None, '3,25', 7, float('nan')]
+        self.assertEqual(round_numbers(values), [round_number(value) for value in values])
+        self.assertEqual(round_numbers([Decimal('1.234'), None, '2,5']), [1.23, None, 2.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla pamięci fragmentów szablonów
+"""
+
+import unittest
+from flask import Flask
+from markupsafe import Markup
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from utils.fragment_cache import FragmentCache
+
+Base = declarative_base()
+
+class Delivery(Base):
+    __tablename__ = 'deliveries'
+    id = Column(Integer, primary_key=True)
+    id_supplier = Column(String(20), nullable=False)
+    status = Column(String(50), nullable=False)
+
+class TestFragmentCache(unittest.TestCase):
+    """
+    Testy trafień i unieważniania fragmentów po zatwierdzeniu zmian dostaw
+    """
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.session = scoped_session(sessionmaker(bind=engine))
+        self.session.add_all([
+            Delivery(id=1, id_supplier='SUP/1', status='pending_verification'),
+            Delivery(id=2, id_supplier='SUP/2', status='pending_verification')
+        ])
+        self.session.commit()
+
+        self.app = Flask(__name__)
+        self.cache = FragmentCache()
+        self.cache.init_app(self.app, self.session, Delivery, 'id_supplier')
+        self.renders = 0
+
+    def tearDown(self):
+        self.session.remove()
+
+    def render(self, supplier_id, cursor=''):
+        def render_table():
+            self.renders += 1
+            statuses = self.session.query(Delivery.status).filter_by(id_supplier=supplier_id).all()
+            return '<td>' + ','.join(status for status, in statuses) + '</td>'
+        return self.cache.render('dostawy', supplier_id, cursor, render_table)
+
+    def test_hit_until_commit(self):
+        """
+        Test trafienia bez renderowania i ponownego renderowania po zatwierdzeniu zmiany
+        """
+        first = self.render('SUP/1')
+        second = self.render('SUP/1')
+        self.assertIsInstance(second, Markup)
+        self.assertEqual(first, second)
+        self.assertEqual(self.renders, 1)
+
+        self.session.get(Delivery, 1).status = 'verified'
+        self.session.flush()
+        self.render('SUP/1')
+        self.assertEqual(self.renders, 1)
+
+        self.session.commit()
+        self.assertEqual(self.render('SUP/1'), '<td>verified</td>')
+        self.assertEqual(self.renders, 2)
+
+    def test_other_scopes_stay_cached(self):
+        """
+        Test zachowania fragmentów innych dostawców i innych stron
+        """
+        self.render('SUP/1')
+        self.render('SUP/2')
+        self.render('SUP/2', cursor='abc')
+        self.session.add(Delivery(id=3, id_supplier='SUP/1', status='pending_verification'))
+        self.session.commit()
+
+        self.render('SUP/2')
+        self.render('SUP/2', cursor='abc')
+        self.assertEqual(self.renders, 3)
+        self.render('SUP/1')
+        self.assertEqual(self.renders, 4)
+
+    def test_moved_delivery_invalidates_both_scopes(self):
+        """
+        Test unieważnienia poprzedniego i nowego dostawcy po przeniesieniu dostawy
+        """
+        self.render('SUP/1')
+        self.render('SUP/2')
+        self.session.get(Delivery, 1).id_supplier = 'SUP/2'
+        self.session.commit()
+
+        self.assertEqual(self.render('SUP/1'), '<td></td>')
+        self.render('SUP/2')
+        self.assertEqual(self.renders, 4)
+
+    def test_disabled(self):
+        """
+        Test renderowania przy każdym wywołaniu, gdy pamięć jest wyłączona
+        """
+        self.app.config['FRAGMENT_CACHE'] = False
+        cache = FragmentCache()
+        cache.init_app(self.app, self.session, Delivery, 'id_supplier')
+        for _ in range(2):
+            cache.render('dostawy', 'SUP/1', '', self.render_count)
+        self.assertEqual(self.renders, 2)
+
+    def render_count(self):
+        self.renders += 1
+        return '<td></td>'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla przydziału numerów metodą hi-lo
+"""
+
+import threading
+import unittest
+from utils.hilo_allocator import HiLoAllocator
+
+class TestHiLoAllocator(unittest.TestCase):
+    """
+    Testy dla wydawania numerów z zarezerwowanych bloków
+    """
+
+    def setUp(self):
+        self.reservations = []
+        self.next_block = 1
+        self.allocator = HiLoAllocator(self.reserve_block)
+
+    def reserve_block(self, block_size=5):
+        start = self.next_block
+        self.next_block += block_size
+        self.reservations.append(start)
+        return start, start + block_size
+
+    def test_values_from_memory_within_block(self):
+        """
+        Test wydawania kolejnych numerów z jednej rezerwacji bloku
+        """
+        values = [self.allocator.next_value() for _ in range(12)]
+
+        self.assertEqual(values, list(range(1, 13)))
+        self.assertEqual(self.reservations, [1, 6, 11])
+
+    def test_reset_starts_new_block(self):
+        """
+        Test porzucenia bieżącego bloku
+        """
+        self.allocator.next_value()
+        self.allocator.reset()
+
+        self.assertEqual(self.allocator.next_value(), 6)
+
+    def test_unique_values_across_threads(self):
+        """
+        Test unikalności numerów przy równoległym pobieraniu
+        """
+        values = []
+        lock = threading.Lock()
+
+        def work():
+            for _ in range(50):
+                value = self.allocator.next_value()
+                with lock:
+                    values.append(value)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(values), list(range(1, 201)))
+
+if __name__ == '__main__':
+    unittest.main()
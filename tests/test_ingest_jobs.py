@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla kolejki zadań przetwarzania plików
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from flask import Flask, current_app
+from utils.ingest_jobs import IngestJob, IngestJobQueue
+
+class TestIngestJobQueue(unittest.TestCase):
+    """
+    Testy dla lokalnej puli wątków przetwarzającej pliki
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config['INGEST_WORKERS'] = 1
+        self.app.config['INGEST_JOB_STORE_PATH'] = os.path.join(self.directory, 'jobs.sqlite3')
+        self.queue = IngestJobQueue(self.app)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def wait_for(self, job):
+        for _ in range(200):
+            stored = self.queue.get(job.id)
+            if stored.is_finished:
+                return stored
+            threading.Event().wait(0.01)
+        self.fail('Zadanie nie zakończyło się w oczekiwanym czasie')
+
+    def test_job_runs_in_app_context(self):
+        """
+        Test wykonania zadania w kontekście aplikacji z raportowaniem postępu
+        """
+        def work(job, rows):
+            job.update_progress(rows, rows)
+            return {'app': current_app.name, 'rows': rows}
+
+        job = self.wait_for(self.queue.submit('SUP/1', 'plik.csv', work, 10))
+
+        self.assertEqual(job.state, IngestJob.DONE)
+        self.assertEqual(job.result, {'app': self.app.name, 'rows': 10})
+        self.assertEqual(job.to_dict()['progress'], {'rows_read': 10, 'products_saved': 10})
+
+    def test_failed_job_reports_error(self):
+        """
+        Test zadania zakończonego błędem
+        """
+        def work(job):
+            raise ValueError('Nieprawidłowy plik')
+
+        job = self.wait_for(self.queue.submit('SUP/1', 'plik.csv', work))
+
+        self.assertEqual(job.state, IngestJob.FAILED)
+        self.assertEqual(job.error, 'Nieprawidłowy plik')
+
+    def test_jobs_are_visible_only_to_owner(self):
+        """
+        Test ograniczenia dostępu do zadania do dostawcy, który je utworzył
+        """
+        job = self.wait_for(self.queue.submit('SUP/1', 'plik.csv', lambda job: None))
+
+        self.assertEqual(self.queue.get(job.id, supplier_id='SUP/1').id, job.id)
+        self.assertIsNone(self.queue.get(job.id, supplier_id='SUP/2'))
+        self.assertEqual(self.queue.list_for_supplier('SUP/2'), [])
+
+    def test_status_shared_between_processes(self):
+        """
+        Test odczytu stanu i wyniku zadania przez kolejkę innego procesu (wspólny magazyn)
+        """
+        def work(job):
+            job.update_progress(5, 4)
+            return {'products_saved': 4}
+
+        job = self.wait_for(self.queue.submit('SUP/1', 'plik.csv', work))
+        other = IngestJobQueue(self.app)
+
+        stored = other.get(job.id, supplier_id='SUP/1')
+        self.assertEqual(stored.state, IngestJob.DONE)
+        self.assertEqual(stored.to_dict()['progress'], {'rows_read': 5, 'products_saved': 4})
+        self.assertEqual(stored.result, {'products_saved': 4})
+        self.assertEqual([item.id for item in other.list_for_supplier('SUP/1')], [job.id])
+
+    def test_submit_once_per_key(self):
+        """
+        Test zwrócenia niezakończonego zadania o tym samym kluczu zamiast tworzenia nowego
+        """
+        release = threading.Event()
+        runs = []
+
+        def work(job):
+            runs.append(job.id)
+            release.wait(2)
+
+        first, created = self.queue.submit_once('supplier_files/SUP/1/plik.csv', 'SUP/1', 'plik.csv', work)
+        self.assertTrue(created)
+        again, created = IngestJobQueue(self.app).submit_once('supplier_files/SUP/1/plik.csv', 'SUP/1', 'plik.csv', work)
+        self.assertFalse(created)
+        self.assertEqual(again.id, first.id)
+
+        other, created = self.queue.submit_once('supplier_files/SUP/1/inny.csv', 'SUP/1', 'inny.csv', lambda job: None)
+        self.assertTrue(created)
+
+        release.set()
+        self.wait_for(first)
+        self.wait_for(other)
+        after, created = self.queue.submit_once('supplier_files/SUP/1/plik.csv', 'SUP/1', 'plik.csv', work)
+        self.assertTrue(created)
+        self.assertNotEqual(after.id, first.id)
+        self.wait_for(after)
+        self.assertEqual(len(runs), 2)
+
+if __name__ == '__main__':
+    unittest.main()
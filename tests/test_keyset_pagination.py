@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla paginacji kluczowej z kursorami
+"""
+
+import unittest
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import Column, Date, Numeric, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+from utils.keyset_pagination import decode_cursor, encode_cursor, keyset_paginate
+
+Base = declarative_base()
+
+class Delivery(Base):
+    __tablename__ = 'deliveries'
+    id_delivery = Column(String(30), primary_key=True)
+    delivery_date = Column(Date, nullable=False)
+    value = Column(Numeric(12, 2), nullable=False)
+    lot_number = Column(String(20), nullable=True)
+
+class TestKeysetPagination(unittest.TestCase):
+    """
+    Testy dla przechodzenia po stronach w przód i w tył
+    """
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.session = Session(engine)
+        # Po trzy dostawy z tą samą datą - kolejność rozstrzyga id_delivery
+        self.session.add_all([
+            Delivery(id_delivery=f'DEL{i:06d}', delivery_date=date(2025, 1, 1 + i // 3), value=Decimal(i % 4) / 2,
+                     lot_number=None if i % 3 == 0 else f'LOT{i % 2}')
+            for i in range(10)
+        ])
+        self.session.commit()
+        self.columns = [Delivery.delivery_date, Delivery.id_delivery]
+
+    def tearDown(self):
+        self.session.close()
+
+    def page(self, cursor=None):
+        return keyset_paginate(self.session.query(Delivery), self.columns, cursor, per_page=4)
+
+    def ids(self, page):
+        return [item.id_delivery for item in page.items]
+
+    def test_walk_forward_and_back(self):
+        """
+        Test przejścia przez wszystkie strony i powrotu kursorem 'prev'
+        """
+        first = self.page()
+        self.assertEqual(self.ids(first), ['DEL000009', 'DEL000008', 'DEL000007', 'DEL000006'])
+        self.assertFalse(first.has_prev)
+
+        second = self.page(first.next_cursor)
+        self.assertEqual(self.ids(second), ['DEL000005', 'DEL000004', 'DEL000003', 'DEL000002'])
+
+        third = self.page(second.next_cursor)
+        self.assertEqual(self.ids(third), ['DEL000001', 'DEL000000'])
+        self.assertFalse(third.has_next)
+
+        back = self.page(third.prev_cursor)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back.has_next)
+
+        self.assertEqual(self.ids(self.page(back.prev_cursor)), self.ids(first))
+        self.assertFalse(self.page(back.prev_cursor).has_prev)
+
+    def test_ascending_by_decimal(self):
+        """
+        Test sortowania rosnącego po kolumnie Numeric (kursor z wartością Decimal)
+        """
+        columns = [Delivery.value, Delivery.id_delivery]
+        query = self.session.query(Delivery)
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(query, columns, cursor, per_page=3, descending=False)
+            seen.extend(self.ids(page))
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = [item.id_delivery for item in query.order_by(Delivery.value, Delivery.id_delivery)]
+        self.assertEqual(seen, expected)
+
+        back = keyset_paginate(query, columns, page.prev_cursor, per_page=3, descending=False)
+        self.assertEqual(self.ids(back), expected[6:9])
+
+        values, _ = decode_cursor(encode_cursor([Decimal('1.50'), 'DEL000003'], 'next'), columns)
+        self.assertEqual(values[0], Decimal('1.50'))
+
+    def test_nullable_column(self):
+        """
+        Test przejścia w obu kierunkach po kolumnie z wartościami NULL (bez COALESCE)
+        """
+        columns = [Delivery.lot_number, Delivery.id_delivery]
+        query = self.session.query(Delivery)
+        for descending in (False, True):
+            with self.subTest(descending=descending):
+                order = [column.desc() if descending else column.asc() for column in columns]
+                expected = [item.id_delivery for item in query.order_by(*order)]
+                seen = []
+                cursor = None
+                while True:
+                    page = keyset_paginate(query, columns, cursor, per_page=3, descending=descending)
+                    seen.extend(self.ids(page))
+                    if not page.has_next:
+                        break
+                    cursor = page.next_cursor
+                self.assertEqual(seen, expected)
+
+                back = keyset_paginate(query, columns, page.prev_cursor, per_page=3, descending=descending)
+                self.assertEqual(self.ids(back), expected[6:9])
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        """
+        Test nieprawidłowego kursora
+        """
+        self.assertIsNone(decode_cursor('nie-kursor', self.columns))
+        self.assertEqual(self.ids(self.page('nie-kursor')), self.ids(self.page()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla limitów prób logowania, blokady kont i ponownego haszowania
+"""
+
+import unittest
+from datetime import datetime, timedelta
+import bcrypt
+from flask import Flask
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+from werkzeug.security import check_password_hash, generate_password_hash
+from utils.auth_activity import auth_activity
+from utils.login_guard import HashingBusyError, LoginGuard, SlidingWindowThrottle
+
+Base = declarative_base()
+
+class Account(Base):
+    """Dane logowania z tymi samymi metodami co models.MAIN.user.User"""
+
+    __tablename__ = 'login_auth_data'
+    id_login = Column(String(20), primary_key=True)
+    related_id = Column(String(20), nullable=False)
+    password_hash = Column(String(255), nullable=False)
+    failed_login_attempts = Column(Integer, default=0)
+    locked_until = Column(DateTime, nullable=True)
+
+    def __init__(self, password_hash, failed_login_attempts=0, locked_until=None):
+        super().__init__(id_login='L1', related_id='SUP/1', password_hash=password_hash,
+                         failed_login_attempts=failed_login_attempts, locked_until=locked_until)
+
+    def verify_password(self, password):
+        if self.password_hash.startswith('$2'):
+            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return check_password_hash(self.password_hash, password)
+
+    def needs_rehash(self, method):
+        return self.password_hash.split('$', 1)[0] != method
+
+    def set_password(self, password, method=None):
+        self.password_hash = generate_password_hash(password, method=method)
+
+class TestSlidingWindowThrottle(unittest.TestCase):
+    """
+    Testy okna przesuwanego
+    """
+
+    def test_limit_within_window(self):
+        """
+        Test odrzucenia po przekroczeniu limitu i zwolnienia po upływie okna
+        """
+        throttle = SlidingWindowThrottle(limit=3, window=60)
+        for second in range(3):
+            self.assertEqual(throttle.hit('a@x.pl', now=100 + second), 0)
+
+        self.assertEqual(throttle.hit('a@x.pl', now=110), 50)
+        self.assertEqual(throttle.hit('b@x.pl', now=110), 0)
+        self.assertEqual(throttle.hit('a@x.pl', now=160), 0)
+
+    def test_sweep_bounds_keys(self):
+        """
+        Test ograniczenia liczby przechowywanych kluczy
+        """
+        throttle = SlidingWindowThrottle(limit=1, window=60, max_keys=10)
+        for number in range(50):
+            throttle.hit(f'ip-{number}', now=100)
+        self.assertLessEqual(len(throttle._hits), 10)
+
+class TestLoginGuard(unittest.TestCase):
+    """
+    Testy blokady kont i weryfikacji haseł
+    """
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['LOGIN_LOCKOUT_THRESHOLD'] = 3
+        self.guard = LoginGuard()
+        self.guard.init_app(app)
+        auth_activity._pending.clear()
+
+    def tearDown(self):
+        auth_activity._pending.clear()
+
+    def test_lockout_after_threshold(self):
+        """
+        Test blokady konta po LOGIN_LOCKOUT_THRESHOLD nieudanych próbach (także przed zapisem do bazy)
+        """
+        account = Account(generate_password_hash('secret'), failed_login_attempts=1)
+        self.guard.login_failed(account)
+        self.assertEqual(self.guard.locked_for(account), 0)
+
+        self.guard.login_failed(account)
+        self.assertGreater(self.guard.locked_for(account), 800)
+
+    def test_expired_lock_restarts_count(self):
+        """
+        Test liczenia prób od nowa po wygaśnięciu blokady
+        """
+        account = Account(generate_password_hash('secret'), failed_login_attempts=3,
+                          locked_until=datetime.now() - timedelta(seconds=1))
+        self.assertEqual(self.guard.locked_for(account), 0)
+
+        self.guard.login_failed(account)
+        self.assertEqual(auth_activity.failures(account.related_id, account.failed_login_attempts), 1)
+        self.assertEqual(self.guard.locked_for(account), 0)
+
+    def test_legacy_hash_is_rehashed(self):
+        """
+        Test ponownego haszowania hasła bcrypt docelową metodą po udanym logowaniu
+        """
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        db_session = Session(engine)
+        account = Account(bcrypt.hashpw(b'secret', bcrypt.gensalt(rounds=4)).decode('utf-8'))
+        db_session.add(account)
+        db_session.commit()
+
+        self.assertFalse(self.guard.verify(account, 'wrong'))
+        self.assertTrue(account.password_hash.startswith('$2'))
+
+        self.assertTrue(self.guard.verify(account, 'secret'))
+        self.assertFalse(db_session.dirty)
+        stored = db_session.execute(Account.__table__.select()).mappings().one()['password_hash']
+        self.assertTrue(stored.startswith('scrypt:32768:8:1$'))
+        self.assertTrue(self.guard.verify(account, 'secret'))
+        db_session.close()
+
+    def test_busy_hashing_raises(self):
+        """
+        Test odrzucenia weryfikacji, gdy wszystkie miejsca są zajęte
+        """
+        self.guard.hash_timeout = 0.01
+        while self.guard._hash_slots.acquire(blocking=False):
+            pass
+        with self.assertRaises(HashingBusyError):
+            self.guard.verify(Account(generate_password_hash('secret')), 'secret')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla metryk i ustawień puli połączeń
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from flask import Flask
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from utils.pool_metrics import Histogram, TimedQueuePool, configure_pool, pool_metrics
+
+class TestPoolMetrics(unittest.TestCase):
+    """
+    Testy zliczania zdarzeń puli
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory, 'pool.db')}",
+            poolclass=TimedQueuePool, pool_size=2, max_overflow=1, pool_timeout=0.05
+        )
+        pool_metrics.reset()
+        pool_metrics.attach(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_checkout_overflow_and_timeout(self):
+        """
+        Test połączeń w użyciu, przekroczenia puli i przekroczenia czasu oczekiwania
+        """
+        connections = [self.engine.connect() for _ in range(3)]
+        snapshot = pool_metrics.snapshot()
+        self.assertEqual(snapshot['pool']['checked_out'], 3)
+        self.assertEqual(snapshot['pool']['overflow'], 1)
+
+        with self.assertRaises(PoolTimeoutError):
+            self.engine.connect()
+
+        for connection in connections:
+            connection.close()
+        snapshot = pool_metrics.snapshot()
+        self.assertEqual(snapshot['counters']['checkouts'], 3)
+        self.assertEqual(snapshot['counters']['checkins'], 3)
+        self.assertEqual(snapshot['counters']['checkout_timeouts'], 1)
+        self.assertEqual(snapshot['pool']['peak_checked_out'], 3)
+        self.assertEqual(snapshot['checkout_wait_ms']['count'], 4)
+        self.assertGreaterEqual(snapshot['checkout_wait_ms']['max'], 50)
+
+    def test_invalidation(self):
+        """
+        Test licznika unieważnionych połączeń
+        """
+        with self.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            connection.invalidate()
+        self.assertEqual(pool_metrics.snapshot()['counters']['invalidations'], 1)
+
+class TestHistogram(unittest.TestCase):
+    """
+    Testy histogramu o stałych przedziałach
+    """
+
+    def test_cumulative_buckets(self):
+        """
+        Test skumulowanych liczności przedziałów
+        """
+        histogram = Histogram((1, 10))
+        for value in (0.5, 5, 50):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual([bucket['count'] for bucket in snapshot['buckets']], [1, 2, 3])
+        self.assertEqual(snapshot['max'], 50)
+
+class TestConfigurePool(unittest.TestCase):
+    """
+    Testy ustawień puli z konfiguracji i zmiennych środowiskowych
+    """
+
+    def test_environment_overrides_config(self):
+        """
+        Test pierwszeństwa zmiennych środowiskowych przed konfiguracją środowiska
+        """
+        app = Flask(__name__)
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI='mysql+pymysql://localhost/dostawy',
+            SQLALCHEMY_ENGINE_OPTIONS={'pool_recycle': 280},
+            DB_POOL_SIZE=5
+        )
+        with mock.patch.dict(os.environ, {'DB_POOL_SIZE': '12', 'DB_POOL_PRE_PING': 'true'}):
+            configure_pool(app)
+
+        options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        self.assertEqual(options['pool_size'], 12)
+        self.assertIs(options['pool_pre_ping'], True)
+        self.assertEqual(options['pool_recycle'], 280)
+        self.assertIs(options['poolclass'], TimedQueuePool)
+
+if __name__ == '__main__':
+    unittest.main()
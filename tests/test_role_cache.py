@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla ról pracowników przechowywanych w sesji
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from sqlalchemy import Column, String, create_engine
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from utils.role_cache import RoleCache
+
+Base = declarative_base()
+
+class AuthData(Base):
+    __tablename__ = 'auth_data'
+    id_login = Column(String(20), primary_key=True)
+    related_id = Column(String(20), nullable=False)
+    role = Column(String(10), nullable=False)
+
+class TestRoleCache(unittest.TestCase):
+    """
+    Testy odczytu roli z sesji i unieważniania po zmianie roli
+    """
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.db_session = scoped_session(sessionmaker(bind=engine))
+        self.db_session.add(AuthData(id_login='L1', related_id='STF/1', role='staff'))
+        self.db_session.commit()
+
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.secret_key = 'test'
+        self.app.config['ROLE_VERSION_STORE_PATH'] = os.path.join(self.directory, 'role_versions.sqlite3')
+        self.cache = RoleCache()
+        self.cache.init_app(self.app, self.db_session, AuthData, self.load_role)
+        self.queries = 0
+
+    def tearDown(self):
+        self.db_session.remove()
+        shutil.rmtree(self.directory)
+
+    def load_role(self, related_id):
+        self.queries += 1
+        return self.db_session.query(AuthData.role).filter_by(related_id=related_id).scalar()
+
+    def test_role_from_session_without_query(self):
+        """
+        Test roli zapamiętanej przy logowaniu
+        """
+        with self.app.test_request_context():
+            self.cache.remember('STF/1', 'staff')
+            self.assertEqual(self.cache.resolve('STF/1'), 'staff')
+            self.assertEqual(self.cache.resolve('STF/1'), 'staff')
+        self.assertEqual(self.queries, 0)
+
+    def test_role_change_invalidates_session_role(self):
+        """
+        Test ponownego odczytu roli po zatwierdzeniu zmiany login_auth_data.role
+        """
+        with self.app.test_request_context():
+            self.cache.remember('STF/1', 'staff')
+
+            auth_data = self.db_session.get(AuthData, 'L1')
+            auth_data.role = 'admin'
+            self.db_session.commit()
+
+            self.assertEqual(self.cache.resolve('STF/1'), 'admin')
+            self.assertEqual(self.cache.resolve('STF/1'), 'admin')
+        self.assertEqual(self.queries, 1)
+
+    def test_role_change_in_other_process(self):
+        """
+        Test unieważnienia roli zmienionej przez inny proces (wspólny magazyn wersji)
+        """
+        other_session = scoped_session(sessionmaker(bind=self.db_session.get_bind()))
+        other = RoleCache()
+        other.init_app(self.app, other_session, AuthData, self.load_role)
+        self.db_session.get(AuthData, 'L1').role = 'admin'
+        self.db_session.commit()
+
+        with self.app.test_request_context():
+            self.cache.remember('STF/1', 'admin')
+
+            other_session.get(AuthData, 'L1').role = 'staff'
+            other_session.commit()
+            other_session.remove()
+
+            self.assertEqual(self.cache.resolve('STF/1'), 'staff')
+        self.assertEqual(self.queries, 1)
+
+    def test_other_changes_keep_session_role(self):
+        """
+        Test zmian innych kolumn niż rola
+        """
+        with self.app.test_request_context():
+            self.cache.remember('STF/1', 'staff')
+            self.db_session.get(AuthData, 'L1').id_login = 'L1'
+            self.db_session.commit()
+            self.assertEqual(self.cache.resolve('STF/1'), 'staff')
+        self.assertEqual(self.queries, 0)
+
+    def test_expired_entry_is_reloaded(self):
+        """
+        Test ponownego sprawdzenia roli po ROLE_CACHE_TTL
+        """
+        self.cache.ttl = 0
+        with self.app.test_request_context():
+            self.cache.remember('STF/1', 'staff')
+            self.assertEqual(self.cache.resolve('STF/1'), 'staff')
+        self.assertEqual(self.queries, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla bezpośredniego uploadu plików dostaw do S3
+
+Testy korzystają z lokalnego odpowiednika S3 (moto) i wysyłają formularz
+uploadu przez requests - są pomijane, jeśli któryś z tych pakietów nie jest
+zainstalowany (pip install moto requests).
+"""
+
+import base64
+import json
+import unittest
+import boto3
+from flask import Flask
+from utils.s3_storage import LazyS3Storage, S3Storage
+
+try:
+    import requests
+    from moto import mock_aws
+except ImportError:  # pragma: no cover - zależności testowe opcjonalne
+    requests = mock_aws = None
+
+@unittest.skipIf(mock_aws is None, 'Wymaga pakietów moto i requests')
+class TestS3Storage(unittest.TestCase):
+    """
+    Testy dla podpisanego uploadu i odczytu pliku ze strumienia obiektu
+    """
+
+    def setUp(self):
+        self.mock = mock_aws()
+        self.mock.start()
+        client = boto3.client('s3', region_name='us-east-1',
+                              aws_access_key_id='test', aws_secret_access_key='test')
+        client.create_bucket(Bucket='dostawy')
+        self.storage = S3Storage(client, 'dostawy')
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def upload(self, upload, content, content_type='text/csv'):
+        return requests.post(
+            upload['url'],
+            data=upload['fields'],
+            files={'file': ('plik.csv', content, content_type)}
+        )
+
+    def test_presigned_post_upload_and_stream(self):
+        """
+        Test uploadu przez podpisany formularz i odczytu obiektu jako strumienia
+        """
+        s3_key = S3Storage.build_key('SUP/1', 'DEL000001', 'dostawa 1.csv')
+        upload = self.storage.presigned_post(s3_key, 'text/csv', metadata={'delivery_id': 'DEL000001'})
+
+        response = self.upload(upload, b'EAN;NAZWA\n590001;Produkt A\n')
+        self.assertLess(response.status_code, 300)
+
+        obj = self.storage.head(s3_key)
+        self.assertEqual(obj['size'], 27)
+        self.assertEqual(obj['metadata']['delivery_id'], 'DEL000001')
+        self.assertEqual(self.storage.open(s3_key).read(), b'EAN;NAZWA\n590001;Produkt A\n')
+
+    def test_presigned_post_policy(self):
+        """
+        Test warunków podpisu: dokładny klucz, typ MIME i limit rozmiaru pliku
+        """
+        s3_key = S3Storage.build_key('SUP/1', 'DEL000001', 'duzy.csv')
+        upload = self.storage.presigned_post(s3_key, 'text/csv', max_size=10)
+
+        policy = json.loads(base64.b64decode(upload['fields']['policy']))
+        self.assertIn({'key': s3_key}, policy['conditions'])
+        self.assertIn({'Content-Type': 'text/csv'}, policy['conditions'])
+        self.assertIn(['content-length-range', 1, 10], policy['conditions'])
+
+    def test_owns_key(self):
+        """
+        Test weryfikacji, że klucz należy do katalogu dostawcy
+        """
+        s3_key = S3Storage.build_key('SUP/1', 'DEL000001', 'plik.csv')
+
+        self.assertTrue(S3Storage.owns_key('SUP/1', s3_key))
+        self.assertFalse(S3Storage.owns_key('SUP/2', s3_key))
+        self.assertFalse(S3Storage.owns_key('SUP/1', 'supplier_files/SUP/1/../SUP/2/plik.csv'))
+        self.assertFalse(S3Storage.owns_key('SUP/1', None))
+
+class TestLazyS3Storage(unittest.TestCase):
+    """
+    Testy wspólnego klienta S3 tworzonego przy pierwszym użyciu
+    """
+
+    def test_client_created_on_first_use(self):
+        """
+        Test utworzenia klienta z app.config dopiero przy pierwszym użyciu i jego współdzielenia
+        """
+        app = Flask(__name__)
+        app.config.update(AWS_ACCESS_KEY_ID='test', AWS_SECRET_ACCESS_KEY='test',
+                          AWS_REGION='eu-central-1', S3_BUCKET='dostawy')
+        storage = LazyS3Storage()
+        storage.init_app(app)
+        self.assertIsNone(storage._storage)
+
+        self.assertEqual(storage.bucket, 'dostawy')
+        self.assertEqual(storage.client.meta.region_name, 'eu-central-1')
+        self.assertIs(storage.get(), storage.get())
+
+    def test_requires_init_app(self):
+        """
+        Test błędu przy użyciu przed init_app
+        """
+        with self.assertRaises(RuntimeError):
+            LazyS3Storage().head('supplier_files/SUP/1/plik.csv')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla sesji przechowywanych po stronie serwera
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from flask import Flask, session
+from utils.server_session import SQLiteSessionStore, server_sessions
+
+class CountingStore(SQLiteSessionStore):
+    """Magazyn SQLite zliczający odczyty"""
+
+    loads = 0
+
+    def load(self, sid):
+        self.loads += 1
+        return super().load(sid)
+
+class TestServerSession(unittest.TestCase):
+    """
+    Testy leniwego wczytywania, zapisu i wygasania sesji
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.secret_key = 'test'
+        self.app.config['SESSION_SQLITE_PATH'] = os.path.join(self.directory, 'sessions.sqlite3')
+        self.app.config['SESSION_CLEANUP_INTERVAL'] = 0
+        server_sessions.init_app(self.app)
+        self.store = CountingStore(self.app.config['SESSION_SQLITE_PATH'])
+        self.app.session_interface.store.store = self.store
+
+        @self.app.route('/set/<value>')
+        def set_value(value):
+            session['value'] = value
+            return 'ok'
+
+        @self.app.route('/get')
+        def get_value():
+            return session.get('value', '-')
+
+        @self.app.route('/login/<user_id>')
+        def login(user_id):
+            session['_user_id'] = user_id
+            return 'ok'
+
+        @self.app.route('/clear')
+        def clear():
+            session.clear()
+            return 'ok'
+
+        @self.app.route('/api')
+        def api():
+            return 'ok'
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def session_cookie(self):
+        cookie = self.client.get_cookie('session')
+        return cookie.value if cookie else None
+
+    def test_cookie_holds_only_session_id(self):
+        """
+        Test zapisu danych w magazynie i samego identyfikatora w ciasteczku
+        """
+        self.client.get('/set/abc')
+        sid = self.session_cookie()
+
+        self.assertEqual(len(sid), 43)
+        self.assertNotIn('abc', sid)
+        self.assertEqual(self.client.get('/get').get_data(as_text=True), 'abc')
+
+    def test_session_loaded_only_when_accessed(self):
+        """
+        Test żądań niekorzystających z sesji bez odczytu magazynu
+        """
+        self.client.get('/set/abc')
+        self.store.loads = 0
+
+        response = self.client.get('/api')
+        self.assertEqual(self.store.loads, 0)
+        self.assertNotIn('Set-Cookie', response.headers)
+
+        self.client.get('/get')
+        self.assertEqual(self.store.loads, 1)
+
+    def test_anonymous_request_sets_no_cookie(self):
+        """
+        Test braku ciasteczka dla pustej sesji
+        """
+        response = self.client.get('/get')
+        self.assertNotIn('Set-Cookie', response.headers)
+
+    def test_clear_deletes_stored_session(self):
+        """
+        Test usunięcia sesji z magazynu po wyczyszczeniu
+        """
+        self.client.get('/set/abc')
+        sid = self.session_cookie()
+        self.client.get('/clear')
+
+        self.assertIsNone(self.store.load(sid))
+        self.assertIsNone(self.session_cookie())
+
+    def test_login_rotates_session_id(self):
+        """
+        Test nowego identyfikatora sesji po zmianie zalogowanego użytkownika
+        """
+        self.client.get('/set/abc')
+        sid = self.session_cookie()
+        self.client.get('/login/SUP1')
+
+        self.assertNotEqual(self.session_cookie(), sid)
+        self.assertIsNone(self.store.load(sid))
+        self.assertEqual(self.client.get('/get').get_data(as_text=True), 'abc')
+
+    def test_purge_expired(self):
+        """
+        Test usuwania wygasłych sesji
+        """
+        self.store.save('a' * 43, '{}', time.time() - 1)
+        self.store.save('b' * 43, '{}', time.time() + 60)
+
+        self.assertEqual(self.store.purge_expired(), 1)
+        self.assertIsNone(self.store.load('a' * 43))
+        self.assertIsNotNone(self.store.load('b' * 43))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla pomiaru zapytań SQL w żądaniach
+"""
+
+import unittest
+from flask import Flask
+from sqlalchemy import create_engine, text
+from utils.sql_instrumentation import SqlInstrumentation, statement_shape
+
+class TestStatementShape(unittest.TestCase):
+    """
+    Testy wyznaczania kształtu zapytania
+    """
+
+    def test_literals_and_in_lists_are_ignored(self):
+        """
+        Test pomijania wartości literałów i długości list IN
+        """
+        self.assertEqual(
+            statement_shape("SELECT * FROM t WHERE id = 5 AND name = 'O''Brien'"),
+            statement_shape("SELECT *\n  FROM t WHERE id = 17 AND name = 'x'")
+        )
+        self.assertEqual(
+            statement_shape('SELECT * FROM t WHERE id IN (?, ?, ?)'),
+            statement_shape('SELECT * FROM t WHERE id IN (?)')
+        )
+        self.assertEqual(statement_shape('SELECT count_1 FROM t1'), 'SELECT count_1 FROM t1')
+
+class TestSqlInstrumentation(unittest.TestCase):
+    """
+    Testy liczenia zapytań żądania i wykrywania N+1
+    """
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.app = Flask(__name__)
+        self.app.config['SQL_N_PLUS_ONE_THRESHOLD'] = 3
+        SqlInstrumentation().init_app(self.app, self.engine)
+
+        @self.app.route('/n-plus-one')
+        def n_plus_one():
+            with self.engine.connect() as connection:
+                for product_id in range(4):
+                    connection.execute(text('SELECT :id'), {'id': product_id})
+            return 'ok'
+
+        @self.app.route('/single')
+        def single():
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            return 'ok'
+
+    def test_server_timing_and_n_plus_one(self):
+        """
+        Test nagłówka Server-Timing i logu dla powtarzanego zapytania
+        """
+        with self.assertLogs('utils.sql_instrumentation', level='WARNING') as logs:
+            response = self.app.test_client().get('/n-plus-one')
+
+        self.assertIn('desc="SQL (4)"', response.headers['Server-Timing'])
+        self.assertIn('n-plus-one;desc="1"', response.headers['Server-Timing'])
+        self.assertIn('"db_queries": 4', logs.output[0])
+        self.assertIn('"count": 4', logs.output[0])
+
+    def test_single_query_not_flagged(self):
+        """
+        Test żądania bez powtórzonych zapytań
+        """
+        response = self.app.test_client().get('/single')
+        self.assertIn('desc="SQL (1)"', response.headers['Server-Timing'])
+        self.assertNotIn('n-plus-one', response.headers['Server-Timing'])
+
+    def test_queries_outside_request_are_ignored(self):
+        """
+        Test zapytań wykonywanych poza żądaniem (np. w wątkach kolejki)
+        """
+        with self.app.app_context():
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        self.assertIn('desc="SQL (1)"', self.app.test_client().get('/single').headers['Server-Timing'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla pamięci podręcznej TTL + LRU
+"""
+
+import unittest
+from unittest import mock
+from utils.ttl_cache import TTLCache
+
+class TestTTLCache(unittest.TestCase):
+    """
+    Testy wygasania i usuwania najdawniej używanych wpisów
+    """
+
+    def test_entry_expires(self):
+        """
+        Test wygaśnięcia wpisu po czasie życia
+        """
+        cache = TTLCache(ttl=10)
+        with mock.patch('utils.ttl_cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with mock.patch('utils.ttl_cache.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('utils.ttl_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test usuwania najdawniej używanego wpisu po przekroczeniu limitu
+        """
+        cache = TTLCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+    def test_get_or_set_computes_once(self):
+        """
+        Test wyliczania wartości tylko przy braku wpisu
+        """
+        cache = TTLCache()
+        factory = mock.Mock(return_value=42)
+
+        self.assertEqual(cache.get_or_set('a', factory), 42)
+        self.assertEqual(cache.get_or_set('a', factory), 42)
+        factory.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla odcisku treści plików i pamięci podręcznej wyników przetwarzania
+"""
+
+import hashlib
+import io
+import shutil
+import unittest
+from utils.upload_cache import HashingReader, ParseResultCache, sha256_stream
+
+class TestContentHash(unittest.TestCase):
+    """
+    Testy liczenia SHA-256 podczas czytania strumienia
+    """
+
+    def test_hashing_reader_during_copy(self):
+        """
+        Test odcisku liczonego w trakcie kopiowania pliku
+        """
+        content = b'EAN;NAZWA\n590001;Produkt A\n' * 1000
+        reader = HashingReader(io.BytesIO(content))
+        target = io.BytesIO()
+        shutil.copyfileobj(reader, target)
+
+        self.assertEqual(reader.hexdigest(), hashlib.sha256(content).hexdigest())
+        self.assertEqual(reader.bytes_read, len(content))
+        self.assertEqual(target.getvalue(), content)
+
+    def test_sha256_stream_rewinds(self):
+        """
+        Test odcisku strumienia z przewinięciem na początek
+        """
+        stream = io.BytesIO(b'abc')
+        stream.read(1)
+
+        self.assertEqual(sha256_stream(stream), hashlib.sha256(b'abc').hexdigest())
+        self.assertEqual(stream.tell(), 0)
+
+class TestParseResultCache(unittest.TestCase):
+    """
+    Testy pamięci podręcznej LRU ograniczonej rozmiarem
+    """
+
+    def test_get_requires_matching_file_record(self):
+        """
+        Test odczytu wyniku tylko dla rekordu pliku, z którego pochodzi
+        """
+        cache = ParseResultCache()
+        cache.put('hash1', 'file-1', {'summary': {'total_rows': 2}})
+
+        self.assertEqual(cache.get('hash1', 'file-1'), {'summary': {'total_rows': 2}})
+        self.assertIsNone(cache.get('hash1', 'file-2'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test usuwania najdawniej używanych wpisów po przekroczeniu limitu rozmiaru
+        """
+        cache = ParseResultCache(max_bytes=100)
+        cache.put('a', 'file-a', {'x': 'a' * 30})
+        cache.put('b', 'file-b', {'x': 'b' * 30})
+        cache.get('a', 'file-a')
+        cache.put('c', 'file-c', {'x': 'c' * 30})
+
+        self.assertIsNotNone(cache.get('a', 'file-a'))
+        self.assertIsNone(cache.get('b', 'file-b'))
+        self.assertIsNotNone(cache.get('c', 'file-c'))
+        self.assertLessEqual(cache.size, 100)
+
+    def test_oversized_entry_is_not_cached(self):
+        """
+        Test pominięcia wpisu większego niż cały limit
+        """
+        cache = ParseResultCache(max_bytes=10)
+
+        self.assertFalse(cache.put('a', 'file-a', {'x': 'a' * 100}))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
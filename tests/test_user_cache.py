@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testy jednostkowe dla pamięci podręcznej użytkowników Flask-Login
+"""
+
+import unittest
+from flask import Flask
+from sqlalchemy import Column, String, create_engine, inspect
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from utils.user_cache import UserCache
+
+Base = declarative_base()
+
+class Supplier(Base):
+    __tablename__ = 'suppliers'
+    id_supplier = Column(String(20), primary_key=True)
+    company_name = Column(String(255), nullable=False)
+
+class TestUserCache(unittest.TestCase):
+    """
+    Testy odczytu, kopii odłączonych i unieważniania po zatwierdzeniu
+    """
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.session = scoped_session(sessionmaker(bind=engine))
+        self.session.add(Supplier(id_supplier='SUP/1', company_name='Firma A'))
+        self.session.commit()
+        self.session.remove()
+
+        self.cache = UserCache()
+        self.cache.init_app(Flask(__name__), self.session, (Supplier,))
+        self.queries = 0
+
+    def tearDown(self):
+        self.session.remove()
+
+    def query_user(self, user_id):
+        self.queries += 1
+        return self.session.get(Supplier, user_id)
+
+    def test_hit_returns_detached_copy(self):
+        """
+        Test trafienia bez zapytania i niezależnych, odłączonych kopii
+        """
+        first = self.cache.load('SUP/1', self.query_user)
+        second = self.cache.load('SUP/1', self.query_user)
+
+        self.assertEqual(self.queries, 1)
+        self.assertEqual(second.company_name, 'Firma A')
+        self.assertIsNot(first, second)
+        self.assertTrue(inspect(second).detached)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+        first.company_name = 'Zmieniona lokalnie'
+        self.assertEqual(self.cache.load('SUP/1', self.query_user).company_name, 'Firma A')
+
+    def test_commit_invalidates_entry(self):
+        """
+        Test unieważnienia wpisu po zatwierdzeniu zmiany wiersza (także przez kopię z pamięci)
+        """
+        user = self.cache.load('SUP/1', self.query_user)
+        user = self.session.merge(user)
+        user.company_name = 'Firma B'
+        self.session.commit()
+        self.session.remove()
+
+        self.assertEqual(self.cache.load('SUP/1', self.query_user).company_name, 'Firma B')
+        self.assertEqual(self.queries, 2)
+
+    def test_missing_user_not_cached(self):
+        """
+        Test braku użytkownika
+        """
+        self.assertIsNone(self.cache.load('SUP/404', self.query_user))
+        self.assertIsNone(self.cache.load('SUP/404', self.query_user))
+        self.assertEqual(self.queries, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Zapis odroczony (write-behind) danych ewidencyjnych logowania.
+
+Aktualizacje last_login i failed_login_attempts w login_auth_data nie są
+zatwierdzane w żądaniu - trafiają do bufora w pamięci, w którym kolejne
+zmiany tego samego konta są łączone, a następnie zapisywane zbiorczymi
+UPDATE (jedna transakcja) co AUTH_ACTIVITY_FLUSH_INTERVAL sekund
+(domyślnie 5) oraz przy zamykaniu procesu. Wartość 0 oznacza zapis
+natychmiastowy.
+
+Nieudane próby zapisywane są jako przyrost (failed_login_attempts + n),
+więc bufory wielu procesów nie nadpisują nawzajem swoich liczników.
+Udane logowanie zeruje licznik i zdejmuje blokadę (locked_until).
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, func
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingUpdate:
+    """Połączone zmiany jednego konta oczekujące na zapis."""
+
+    __slots__ = ('last_login', 'reset_failures', 'failures', 'locked_until')
+
+    # Wartość locked_until oznaczająca zdjęcie blokady (zapis NULL)
+    UNLOCK = object()
+
+    def __init__(self):
+        self.last_login = None
+        self.reset_failures = False
+        self.failures = 0
+        self.locked_until = None
+
+    def merge(self, other):
+        """Dołącza zmiany zarejestrowane później (other)."""
+        if other.last_login is not None:
+            self.last_login = other.last_login
+        if other.reset_failures:
+            self.reset_failures = True
+            self.failures = other.failures
+        else:
+            self.failures += other.failures
+        if other.locked_until is not None:
+            self.locked_until = other.locked_until
+
+
+class AuthActivityBuffer:
+    """Bufor aktualizacji login_auth_data zapisywany zbiorczo w tle."""
+
+    DEFAULT_FLUSH_INTERVAL = 5
+
+    def __init__(self):
+        self.flush_interval = self.DEFAULT_FLUSH_INTERVAL
+        self._engine = None
+        self._table = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._atexit_registered = False
+
+    def init_app(self, app, table, engine=None):
+        """
+        Args:
+            app: Aplikacja Flask
+            table: Tabela login_auth_data (kolumny related_id, last_login, failed_login_attempts, locked_until)
+            engine: Silnik SQLAlchemy (domyślnie silnik rozszerzenia Flask-SQLAlchemy)
+        """
+        self.flush_interval = app.config.get('AUTH_ACTIVITY_FLUSH_INTERVAL', self.DEFAULT_FLUSH_INTERVAL)
+        if engine is None:
+            with app.app_context():
+                engine = app.extensions['sqlalchemy'].engine
+        self._engine = engine
+        self._table = table
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def record_login(self, related_id):
+        """Udane logowanie - ustawia last_login i zeruje licznik nieudanych prób."""
+        update = _PendingUpdate()
+        update.last_login = datetime.now()
+        update.reset_failures = True
+        update.locked_until = _PendingUpdate.UNLOCK
+        self._record(related_id, update)
+
+    def record_failure(self, related_id, restart=False, lock_until=None):
+        """
+        Nieudana próba logowania - zwiększa failed_login_attempts.
+
+        Args:
+            related_id: Identyfikator konta
+            restart: Liczenie prób od nowa (np. po wygaśnięciu blokady)
+            lock_until: Czas, do którego konto zostaje zablokowane
+        """
+        update = _PendingUpdate()
+        update.failures = 1
+        update.reset_failures = restart
+        update.locked_until = lock_until
+        self._record(related_id, update)
+
+    def failures(self, related_id, stored):
+        """Zwraca liczbę nieudanych prób z uwzględnieniem niezapisanych zmian (stored - wartość z bazy)."""
+        with self._lock:
+            pending = self._pending.get(related_id)
+            if pending is None:
+                return stored or 0
+            return pending.failures if pending.reset_failures else (stored or 0) + pending.failures
+
+    def locked_until(self, related_id, stored):
+        """Zwraca czas blokady konta z uwzględnieniem niezapisanych zmian (stored - wartość z bazy)."""
+        with self._lock:
+            pending = self._pending.get(related_id)
+            if pending is None or pending.locked_until is None:
+                return stored
+            return None if pending.locked_until is _PendingUpdate.UNLOCK else pending.locked_until
+
+    def touch(self, related_id):
+        """Aktywność zalogowanego użytkownika - ustawia tylko last_login."""
+        update = _PendingUpdate()
+        update.last_login = datetime.now()
+        self._record(related_id, update)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _record(self, related_id, update):
+        with self._lock:
+            pending = self._pending.get(related_id)
+            if pending is None:
+                self._pending[related_id] = update
+            else:
+                pending.merge(update)
+        if not self.flush_interval:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self):
+        """Zapisuje oczekujące zmiany zbiorczymi UPDATE w jednej transakcji. Zwraca liczbę kont."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._engine is None:
+            return 0
+
+        table = self._table
+        last_login_rows = []
+        reset_rows = []
+        increment_rows = []
+        lock_rows = []
+        for related_id, update in pending.items():
+            if update.last_login is not None:
+                last_login_rows.append({'b_related_id': related_id, 'b_last_login': update.last_login})
+            if update.reset_failures:
+                reset_rows.append({'b_related_id': related_id, 'b_failures': update.failures})
+            elif update.failures:
+                increment_rows.append({'b_related_id': related_id, 'b_failures': update.failures})
+            if update.locked_until is not None:
+                locked_until = None if update.locked_until is _PendingUpdate.UNLOCK else update.locked_until
+                lock_rows.append({'b_related_id': related_id, 'b_locked_until': locked_until})
+
+        where = table.c.related_id == bindparam('b_related_id')
+        try:
+            with self._engine.begin() as connection:
+                if last_login_rows:
+                    connection.execute(
+                        table.update().where(where).values(last_login=bindparam('b_last_login')),
+                        last_login_rows
+                    )
+                if reset_rows:
+                    connection.execute(
+                        table.update().where(where).values(failed_login_attempts=bindparam('b_failures')),
+                        reset_rows
+                    )
+                if increment_rows:
+                    connection.execute(
+                        table.update().where(where).values(
+                            failed_login_attempts=func.coalesce(table.c.failed_login_attempts, 0) + bindparam('b_failures')
+                        ),
+                        increment_rows
+                    )
+                if lock_rows:
+                    connection.execute(
+                        table.update().where(where).values(locked_until=bindparam('b_locked_until')),
+                        lock_rows
+                    )
+        except Exception:
+            logger.exception(f"Błąd zapisu danych logowania ({len(pending)} kont) - ponowna próba przy następnym zapisie")
+            self._requeue(pending)
+            return 0
+
+        logger.debug(f"Zapisano dane logowania dla {len(pending)} kont")
+        return len(pending)
+
+    def _requeue(self, pending):
+        """Przywraca niezapisane zmiany przed zmianami zarejestrowanymi w międzyczasie."""
+        with self._lock:
+            for related_id, newer in self._pending.items():
+                older = pending.get(related_id)
+                if older is None:
+                    pending[related_id] = newer
+                else:
+                    older.merge(newer)
+            self._pending = pending
+
+    def _ensure_flusher(self):
+        """Uruchamia wątek zapisujący (raz na proces, także po fork)."""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_loop, name='auth-activity-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+auth_activity = AuthActivityBuffer()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Kompaktowy, kolumnowy format przechowywania danych tabelarycznych z plików dostaw.
+
+Tabela dzielona jest na grupy wierszy, a w każdej grupie każda kolumna
+zapisywana jest jako osobno skompresowana lista wartości JSON. Dzięki temu
+odczyt wybranych wierszy lub kolumn dekompresuje tylko potrzebne bloki.
+
+Układ danych:
+    MAGIC (4 bajty) | kodek (1 bajt) | długość nagłówka (4 bajty, big-endian)
+    | nagłówek JSON | bloki kolumn
+
+Kompresja: zstd (jeśli zainstalowano pakiet zstandard), w przeciwnym razie zlib.
+"""
+
+import json
+import struct
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zależność opcjonalna
+    zstandard = None
+
+MAGIC = b'DCT1'
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+
+def _compress(payload: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    return zlib.compress(payload, 6)
+
+
+def _decompress(payload: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError('Dane skompresowane zstd wymagają pakietu zstandard')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+class CompactTableWriter:
+    """
+    Buduje tabelę w formacie kompaktowym przyrostowo - po jednej grupie wierszy.
+
+    W pamięci przechowywane są wyłącznie skompresowane bloki. Przy zasilaniu
+    kolejnymi porcjami pliku w trybie strumieniowym należy podać max_rows -
+    wiersze ponad limit są pomijane, więc rozmiar wyniku nie rośnie
+    z rozmiarem pliku.
+    """
+
+    def __init__(self, columns=None, codec=None, max_rows=None):
+        self.columns = list(columns) if columns is not None else None
+        self.codec = codec or (CODEC_ZSTD if zstandard is not None else CODEC_ZLIB)
+        self.max_rows = max_rows
+        self.row_count = 0
+        self._groups = []
+        self._blocks = []
+        self._size = 0
+
+    def append(self, df):
+        """
+        Dopisuje grupę wierszy.
+
+        Args:
+            df: DataFrame z kolumnami zgodnymi z tabelą (przy pierwszym wywołaniu
+                kolumny są przejmowane z DataFrame, jeśli nie podano ich wcześniej)
+        """
+        if self.columns is None:
+            self.columns = [str(col) for col in df.columns]
+        if self.max_rows is not None:
+            df = df.iloc[:max(self.max_rows - self.row_count, 0)]
+        if len(df) == 0:
+            return
+
+        group = {'rows': len(df), 'blocks': []}
+        for position in range(len(self.columns)):
+            values = df.iloc[:, position].tolist()
+            block = _compress(json.dumps(values, default=str, ensure_ascii=False).encode('utf-8'), self.codec)
+            group['blocks'].append([self._size, len(block)])
+            self._blocks.append(block)
+            self._size += len(block)
+
+        self._groups.append(group)
+        self.row_count += len(df)
+
+    def getvalue(self) -> bytes:
+        """Zwraca zakodowaną tabelę."""
+        header = json.dumps({
+            'columns': self.columns or [],
+            'row_count': self.row_count,
+            'groups': self._groups
+        }).encode('utf-8')
+        return MAGIC + struct.pack('>BI', self.codec, len(header)) + header + b''.join(self._blocks)
+
+
+class CompactTable:
+    """
+    Leniwy odczyt tabeli w formacie kompaktowym.
+
+    Bloki dekompresowane są dopiero przy pierwszym odwołaniu do danej kolumny
+    w danej grupie wierszy i zapamiętywane na czas życia obiektu.
+    """
+
+    DEFAULT_GROUP_SIZE = 10000
+
+    def __init__(self, blob: bytes):
+        if not blob or blob[:4] != MAGIC:
+            raise ValueError('Nieprawidłowy format danych tabeli')
+        self._blob = blob
+        self._codec, header_length = struct.unpack('>BI', blob[4:9])
+        header = json.loads(blob[9:9 + header_length].decode('utf-8'))
+        self._data_offset = 9 + header_length
+        self.headers = header['columns']
+        self.row_count = header['row_count']
+        self._groups = header['groups']
+        self._positions = {name: position for position, name in enumerate(self.headers)}
+        self._cache = {}
+
+        # Indeks pierwszego wiersza każdej grupy
+        self._group_starts = []
+        start = 0
+        for group in self._groups:
+            self._group_starts.append(start)
+            start += group['rows']
+
+    @staticmethod
+    def encode(df, group_size: int = DEFAULT_GROUP_SIZE) -> bytes:
+        """Koduje cały DataFrame, dzieląc go na grupy po group_size wierszy."""
+        writer = CompactTableWriter(df.columns)
+        for start in range(0, len(df), group_size):
+            writer.append(df.iloc[start:start + group_size])
+        return writer.getvalue()
+
+    def _block(self, group_index: int, column: str) -> list:
+        key = (group_index, column)
+        if key not in self._cache:
+            offset, length = self._groups[group_index]['blocks'][self._positions[column]]
+            start = self._data_offset + offset
+            payload = _decompress(self._blob[start:start + length], self._codec)
+            self._cache[key] = json.loads(payload.decode('utf-8'))
+        return self._cache[key]
+
+    def column(self, name: str) -> list:
+        """Zwraca wszystkie wartości jednej kolumny."""
+        if name not in self._positions:
+            raise KeyError(name)
+        values = []
+        for group_index in range(len(self._groups)):
+            values.extend(self._block(group_index, name))
+        return values
+
+    def rows(self, start: int = 0, stop: int = None, columns=None) -> list:
+        """
+        Zwraca wiersze z zakresu [start, stop) jako listę słowników.
+
+        Args:
+            start: Indeks pierwszego wiersza
+            stop: Indeks za ostatnim wierszem (domyślnie koniec tabeli)
+            columns: Opcjonalna lista kolumn (domyślnie wszystkie)
+        """
+        stop = self.row_count if stop is None else min(stop, self.row_count)
+        columns = list(columns) if columns is not None else self.headers
+        for name in columns:
+            if name not in self._positions:
+                raise KeyError(name)
+
+        result = []
+        for group_index, group in enumerate(self._groups):
+            group_start = self._group_starts[group_index]
+            group_stop = group_start + group['rows']
+            if group_stop <= start or group_start >= stop:
+                continue
+
+            first = max(start, group_start) - group_start
+            last = min(stop, group_stop) - group_start
+            values = [self._block(group_index, name)[first:last] for name in columns]
+            result.extend(dict(zip(columns, row)) for row in zip(*values))
+        return result
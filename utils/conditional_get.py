@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Warunkowe żądania GET (ETag / If-None-Match) dla tras API zwracających JSON.
+
+ETag wyliczany jest z wersji danych (np. DeliveryGeneral.data_version) i
+parametrów żądania, zanim trasa pobierze właściwe dane. Jeśli przeglądarka
+przesłała pasujący nagłówek If-None-Match, trasa odpowiada 304 bez
+budowania odpowiedzi.
+
+Odpowiedzi dotyczą danych zalogowanego użytkownika, więc nagłówek
+Cache-Control domyślnie pozwala przechowywać je wyłącznie przeglądarce
+(private) i wymaga sprawdzenia aktualności przy każdym użyciu (no-cache).
+
+Konfiguracja:
+    API_CACHE_CONTROL: Nagłówek Cache-Control odpowiedzi z ETag (domyślnie 'private, no-cache')
+"""
+
+import hashlib
+from flask import current_app, request
+
+DEFAULT_CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    """
+    Buduje silny ETag z części klucza (nazwa zasobu, ID, wersja, parametry żądania).
+
+    Returns:
+        str: ETag bez cudzysłowów
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def not_modified(etag):
+    """
+    Zwraca odpowiedź 304, jeśli przeglądarka ma aktualną wersję (If-None-Match), inaczej None.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return add_validators(current_app.response_class(status=304), etag)
+
+
+def add_validators(response, etag):
+    """Dodaje do odpowiedzi ETag i Cache-Control (bez zmian, jeśli etag jest None)."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = current_app.config.get('API_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+    return response
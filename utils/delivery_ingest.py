@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Przetwarzanie plików dostaw i zapis produktów do tabeli delivery_produkty_hybrid.
+"""
+
+import logging
+from typing import TYPE_CHECKING
+from utils.lot_analyzer import LotAnalyzer
+from utils.file_chunk_reader import FileChunkReader
+
+if TYPE_CHECKING:
+    # pandas importowany przy pierwszym przetwarzaniu pliku - nie spowalnia startu aplikacji
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryIngest:
+    """
+    Mapowanie wierszy pliku na produkty dostawy oraz tryb strumieniowy,
+    w którym plik jest czytany i zapisywany porcjami.
+    """
+
+    # Liczba wierszy zwracanych do podglądu w przeglądarce w trybie strumieniowym
+    PREVIEW_ROWS = 100
+
+    # Liczba wierszy analizowanych przy wnioskowaniu kolumn ceny i wartości
+    INFERENCE_SAMPLE_ROWS = 500
+
+    # Minimalny odsetek pasujących wierszy próbki, aby przyjąć kolumnę jako cenę/wartość
+    INFERENCE_MIN_CONFIDENCE = 0.6
+
+    # Wartości domyślne pól liczbowych produktu
+    NUMERIC_DEFAULTS = {
+        'price': 0.0,
+        'value': 0.0,
+        'quantity': 1.0
+    }
+
+    # Kolumny pokazywane w podsumowaniu pliku
+    SUMMARY_COLUMN_LABELS = {
+        'WARTOSC': 'Wartość',
+        'NR LOT': 'LOT',
+        'NR PALETY': 'Paleta',
+        'ITEM DESC': 'Nazwa produktu',
+        'EAN': 'EAN',
+        'ASIN': 'ASIN',
+        'ILOSC': 'Ilość',
+        'CENA': 'Cena',
+        'WALUTA': 'Waluta',
+        'JEDNOSTKA': 'Jednostka'
+    }
+
+    # Mapowanie kolumn z pliku Excel na kolumny w bazie danych
+    PRODUCT_COLUMN_MAPPING = {
+        'lot_number': ['nr lot', 'nr_lot', 'nr-lot', 'lot', 'lot number', 'lot_number', 'lot-number', 'numer partii', 'numer_partii', 'partia'],
+        'pallet_number': ['nr palety', 'nr_palety', 'nr-palety', 'paleta', 'pallet', 'pallet number', 'pallet_number', 'pallet-number', 'numer palety'],
+        'product_name': ['item desc', 'item_desc', 'nazwa', 'nazwa produktu', 'produkt', 'product', 'product name', 'product_name', 'description', 'desc'],
+        'ean_code': ['ean', 'kod ean', 'kod_ean', 'ean code', 'ean_code', 'kod', 'code', 'barcode', 'bar code', 'bar_code'],
+        'asin_code': ['asin', 'kod asin', 'kod_asin', 'asin code', 'asin_code'],
+        'quantity': ['ilość', 'ilosc', 'ilośc', 'ilosć', 'qty', 'quantity', 'amount', 'liczba sztuk', 'liczba_sztuk'],
+        'unit': ['jednostka', 'jm', 'j.m.', 'unit', 'measure', 'unit of measure', 'uom'],
+        'price': ['cena', 'price', 'unit price', 'unit_price', 'cena jednostkowa', 'cena_jednostkowa', 'koszt', 'cost', 'preis', 'prix', 'precio', 'prezzo', 'einzelpreis', 'unit cost', 'cost per unit', 'price per unit', 'price per item'],
+        'value': ['wartość', 'wartosc', 'value', 'total', 'suma', 'total value', 'total_value', 'wert', 'valeur', 'valor', 'valore', 'gesamtwert', 'total cost', 'total price', 'sum', 'amount', 'line total', 'line value', 'line amount'],
+        'currency': ['waluta', 'currency', 'curr', 'waluty', 'währung', 'monnaie', 'moneda', 'valuta'],
+    }
+
+    @staticmethod
+    def clean_frame(df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Normalizuje nazwy kolumn i zamienia NaN na None."""
+        import pandas as pd
+
+        df = df.copy()
+        df.columns = FileChunkReader.normalize_columns(df.columns)
+        return df.astype(object).where(pd.notnull(df), None)
+
+    @staticmethod
+    def _normalize_name(name) -> str:
+        """Normalizuje nazwę kolumny do porównań (małe litery, bez spacji)."""
+        return str(name).lower().replace(' ', '')
+
+    @staticmethod
+    def resolve_mapping_plan(columns, sample: 'pd.DataFrame' = None) -> dict:
+        """
+        Wyznacza plan mapowania kolumn pliku na pola DeliveryProduct.
+
+        Plan liczony jest raz dla całego pliku na podstawie nagłówków. Dla każdego
+        pola wybierana jest pierwsza kolumna (w kolejności z pliku), której
+        znormalizowana nazwa odpowiada jednemu z aliasów pola. Jeśli podano
+        próbkę wierszy, brakujące kolumny ceny/wartości są wnioskowane z danych,
+        a ich pewność zapisywana jest w planie jako '<pole>_confidence'.
+
+        Args:
+            columns: Nazwy kolumn pliku
+            sample: Opcjonalna próbka wierszy do wnioskowania ceny/wartości
+
+        Returns:
+            dict: Słownik {pole_w_bazie: kolumna_w_pliku}
+        """
+        normalized = [(col, DeliveryIngest._normalize_name(col)) for col in columns]
+        plan = {}
+        for db_field, possible_names in DeliveryIngest.PRODUCT_COLUMN_MAPPING.items():
+            aliases = {DeliveryIngest._normalize_name(name) for name in possible_names}
+            for col, col_normalized in normalized:
+                if col_normalized in aliases:
+                    plan[db_field] = col
+                    break
+
+        if sample is not None:
+            for db_field, (col, confidence) in DeliveryIngest.infer_numeric_columns(sample, plan).items():
+                plan[db_field] = col
+                plan[f'{db_field}_confidence'] = confidence
+                logger.info(f"Automatycznie zmapowano kolumnę '{col}' jako {db_field} (pewność: {confidence})")
+        return plan
+
+    @staticmethod
+    def map_products(df: 'pd.DataFrame', delivery_id: str, plan: dict = None) -> list:
+        """
+        Mapuje wiersze DataFrame na słowniki danych produktów.
+
+        Kolumny wybierane są wektorowo na podstawie planu mapowania, bez
+        analizowania nazw kolumn dla każdego wiersza osobno.
+
+        Args:
+            df: Dane z pliku (ze znormalizowanymi nazwami kolumn)
+            delivery_id: ID dostawy
+            plan: Plan mapowania z resolve_mapping_plan (wyznaczany na podstawie
+                  próbki wierszy, jeśli nie podano)
+
+        Returns:
+            list: Lista słowników gotowych do DeliveryProduct.bulk_create
+                  (price, value i quantity jako liczby)
+        """
+        import pandas as pd
+
+        if plan is None:
+            plan = DeliveryIngest.resolve_mapping_plan(df.columns, df.head(DeliveryIngest.INFERENCE_SAMPLE_ROWS))
+
+        # Projekcja kolumn na pola produktu (jedna kolumna może zasilać kilka pól)
+        projected = pd.DataFrame(
+            {db_field: df[plan[db_field]] if db_field in plan else None
+             for db_field in DeliveryIngest.PRODUCT_COLUMN_MAPPING},
+            index=df.index
+        )
+        projected['row_num'] = df.index + 1
+        projected['id_delivery'] = delivery_id
+
+        # Wektorowa konwersja pól liczbowych (puste i niepoprawne wartości otrzymują wartości domyślne)
+        for db_field, default in DeliveryIngest.NUMERIC_DEFAULTS.items():
+            projected[db_field] = DeliveryIngest._to_numeric(projected[db_field]).fillna(default).round(2)
+
+        products_data = projected.to_dict('records')
+        original_rows = df.to_dict('records')
+
+        for product, original in zip(products_data, original_rows):
+            product['original_data'] = original
+            product['mapped_fields'] = plan
+
+        return products_data
+
+    @staticmethod
+    def _to_numeric(series: 'pd.Series') -> 'pd.Series':
+        """Wektorowa konwersja kolumny na liczby (akceptuje przecinek dziesiętny)."""
+        import pandas as pd
+
+        if series.dtype == object:
+            series = series.astype('string').str.replace(' ', '', regex=False).str.replace(',', '.', regex=False)
+        return pd.to_numeric(series, errors='coerce').astype('float64')
+
+    @staticmethod
+    def infer_numeric_columns(sample: 'pd.DataFrame', plan: dict) -> dict:
+        """
+        Wybiera kolumny ceny i wartości na podstawie próbki wierszy, gdy nie
+        udało się ich dopasować po nazwie.
+
+        Cena: niezmapowana kolumna, której niepuste wartości najczęściej są
+        liczbami z typowego zakresu cen (0, 10000).
+        Wartość: niezmapowana kolumna, której wartości najczęściej są bliskie
+        cena * ilość (odchylenie poniżej 10%).
+
+        Args:
+            sample: Próbka wierszy pliku (ze znormalizowanymi nazwami kolumn)
+            plan: Plan mapowania z dopasowania po nazwach
+
+        Returns:
+            dict: Słownik {pole: (kolumna, pewność)} dla wywnioskowanych pól
+        """
+        inferred = {}
+        if sample.empty:
+            return inferred
+
+        mapped_columns = {col for field, col in plan.items() if field in DeliveryIngest.PRODUCT_COLUMN_MAPPING}
+        numeric = {
+            col: DeliveryIngest._to_numeric(sample[col])
+            for col in sample.columns if col not in mapped_columns
+        }
+
+        def best(scores):
+            scores = {col: score for col, score in scores.items() if score >= DeliveryIngest.INFERENCE_MIN_CONFIDENCE}
+            if not scores:
+                return None
+            col = max(scores, key=scores.get)
+            return col, round(float(scores[col]), 3)
+
+        price_values = None
+        if 'price' in plan:
+            price_values = DeliveryIngest._to_numeric(sample[plan['price']])
+        else:
+            scores = {}
+            for col, values in numeric.items():
+                present = sample[col].notna()
+                if present.any():
+                    scores[col] = ((values > 0) & (values < 10000))[present].mean()
+            found = best(scores)
+            if found:
+                inferred['price'] = found
+                price_values = numeric.pop(found[0])
+
+        if 'value' not in plan and price_values is not None:
+            quantity = DeliveryIngest._to_numeric(sample[plan['quantity']]).fillna(1) if 'quantity' in plan else 1
+            expected = price_values * quantity
+            scores = {}
+            for col, values in numeric.items():
+                present = values.notna() & expected.notna()
+                if present.any():
+                    close = (values - expected).abs() < 0.1 * values
+                    scores[col] = close[present].mean()
+            found = best(scores)
+            if found:
+                inferred['value'] = found
+
+        return inferred
+
+    @staticmethod
+    def build_lot_analysis(filename: str, summary: dict, headers: list) -> dict:
+        """Łączy analizę nazwy pliku z numerami LOT znalezionymi w danych."""
+        lot_analysis = LotAnalyzer.analyze_filename(filename)
+        return {
+            'found_in_filename': lot_analysis[1] if lot_analysis else None,
+            'original_match': lot_analysis[0] if lot_analysis else None,
+            'has_lot_column': 'NR LOT' in headers,
+            'lots': summary['lots'],
+            'all_empty': len(summary['lots']) == 0
+        }
+
+    @staticmethod
+    def process_stream(file_obj, filename: str, delivery_id: str,
+                       chunk_size: int = FileChunkReader.DEFAULT_CHUNK_SIZE,
+                       progress_callback=None, table_writer=None) -> dict:
+        """
+        Przetwarza plik porcjami: każda porcja jest mapowana i zapisywana
+        do delivery_produkty_hybrid przed wczytaniem następnej. Porcje zapisywane
+        są w jednej transakcji zatwierdzanej po wczytaniu całego pliku.
+
+        Zużycie pamięci zależy od rozmiaru porcji, a nie od rozmiaru pliku.
+        Do przeglądarki zwracany jest jedynie podgląd pierwszych PREVIEW_ROWS wierszy.
+
+        Args:
+            file_obj: Obiekt pliku ustawiony na początku danych
+            filename: Nazwa pliku (określa format)
+            delivery_id: ID dostawy, do której zapisywane są produkty
+            chunk_size: Maksymalna liczba wierszy w porcji
+            progress_callback: Opcjonalna funkcja wywoływana jako callback(rows_read, products_saved)
+            table_writer: Opcjonalny CompactTableWriter, do którego dopisywana jest każda porcja
+                          (wiersze do zapisu w DeliveryFileData.table_data; w trybie
+                          strumieniowym writer ograniczony przez max_rows)
+
+        Returns:
+            dict: Dane w formacie zwracanym przez /api/process-excel
+        """
+        from models.supplier.delivery_product_writer import DeliveryProductBulkWriter
+
+        writer = DeliveryProductBulkWriter(delivery_id)
+        headers = None
+        plan = None
+        preview_rows = []
+        total_rows = 0
+        total_value = 0.0
+        lots = set()
+        pallets = set()
+
+        for chunk in FileChunkReader.iter_chunks(file_obj, filename, chunk_size):
+            df = DeliveryIngest.clean_frame(chunk)
+            if headers is None:
+                headers = df.columns.tolist()
+                plan = DeliveryIngest.resolve_mapping_plan(headers, df.head(DeliveryIngest.INFERENCE_SAMPLE_ROWS))
+
+            # Aktualizuj podsumowanie przyrostowo
+            total_rows += len(df)
+            if 'WARTOSC' in df.columns:
+                total_value += float(DeliveryIngest._to_numeric(df['WARTOSC']).sum())
+            if 'NR LOT' in df.columns:
+                lots.update(df['NR LOT'].dropna().unique().tolist())
+            if 'NR PALETY' in df.columns:
+                pallets.update(df['NR PALETY'].dropna().unique().tolist())
+
+            if table_writer is not None:
+                table_writer.append(df)
+
+            if len(preview_rows) < DeliveryIngest.PREVIEW_ROWS:
+                preview_rows.extend(df.head(DeliveryIngest.PREVIEW_ROWS - len(preview_rows)).to_dict('records'))
+
+            # Zmapuj i zapisz porcję przed wczytaniem kolejnej
+            products_data = DeliveryIngest.map_products(df, delivery_id, plan)
+            writer.write(products_data)
+            del products_data, df
+
+            if progress_callback:
+                progress_callback(total_rows, writer.rows_written)
+
+        # Wszystkie porcje zapisywane są w jednej transakcji
+        writer.commit()
+
+        headers = headers or []
+        summary = {
+            'total_rows': total_rows,
+            'items_count': total_rows,
+            'total_value': total_value,
+            'lots': sorted(lots),
+            'pallets': sorted(pallets),
+            'mapped_columns': {
+                orig: mapped for orig, mapped in DeliveryIngest.SUMMARY_COLUMN_LABELS.items()
+                if orig in headers
+            }
+        }
+
+        logger.info(f"Przetworzono strumieniowo {total_rows} wierszy, zapisano {writer.rows_written} produktów dla dostawy {delivery_id}")
+
+        return {
+            'headers': headers,
+            'rows': preview_rows,
+            'preview_only': total_rows > len(preview_rows),
+            'summary': summary,
+            'lot_analysis': DeliveryIngest.build_lot_analysis(filename, summary, headers),
+            'products_saved': writer.rows_written,
+            'insert_stats': writer.stats()
+        }
+
+    @staticmethod
+    def apply_summary_to_delivery(delivery_id: str, summary: dict, lot_analysis: dict) -> bool:
+        """
+        Aktualizuje dostawę na podstawie podsumowania pliku.
+
+        Returns:
+            bool: True jeśli dostawa została znaleziona i zaktualizowana
+        """
+        from __init__ import db
+        from models.supplier.delivery_general import DeliveryGeneral
+
+        delivery = DeliveryGeneral.query.get(delivery_id)
+        if not delivery:
+            return False
+
+        # Aktualizuj wartości
+        delivery.total_value = summary['total_value']
+        delivery.items_count = summary['items_count']
+        delivery.lots_count = len(summary['lots']) if summary['lots'] else 0
+        delivery.pallets_count = len(summary['pallets']) if summary['pallets'] else 0
+
+        # Jeśli znaleziono LOT w nazwie pliku lub w danych
+        if lot_analysis and lot_analysis.get('found_in_filename'):
+            delivery.lot_number = lot_analysis['found_in_filename']
+        elif summary['lots']:
+            delivery.lot_number = ', '.join(str(lot) for lot in summary['lots'])
+
+        # Jeśli znaleziono numery palet
+        if summary['pallets']:
+            delivery.pallet_number = ', '.join(str(p) for p in summary['pallets'])
+
+        db.session.commit()
+        return True
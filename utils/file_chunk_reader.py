@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Strumieniowy odczyt plików dostaw (CSV/XLSX) w porcjach o ograniczonym rozmiarze.
+"""
+
+from typing import TYPE_CHECKING, Iterator, List
+
+if TYPE_CHECKING:
+    # pandas importowany przy pierwszym odczycie pliku - nie spowalnia startu aplikacji
+    import pandas as pd
+
+
+class FileChunkReader:
+    """
+    Czyta plik dostawy porcjami, tak aby w pamięci znajdowała się
+    jednocześnie co najwyżej jedna porcja wierszy.
+    """
+
+    DEFAULT_CHUNK_SIZE = 5000
+
+    @staticmethod
+    def normalize_columns(columns) -> List[str]:
+        """Normalizuje nazwy kolumn (usuwa spacje z brzegów, zamienia na wielkie litery)."""
+        return [str(col).strip().upper() for col in columns]
+
+    @staticmethod
+    def iter_chunks(file_obj, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator['pd.DataFrame']:
+        """
+        Zwraca kolejne porcje pliku jako DataFrame.
+
+        Indeks każdej porcji jest ciągły względem całego pliku
+        (pierwszy wiersz danych ma indeks 0), dzięki czemu numery
+        wierszy są takie same jak przy wczytaniu pliku w całości.
+
+        Args:
+            file_obj: Obiekt pliku (musi wspierać seek dla XLSX)
+            filename: Nazwa pliku - na jej podstawie wybierany jest format
+            chunk_size: Maksymalna liczba wierszy w jednej porcji
+
+        Yields:
+            pd.DataFrame: Porcja danych z oryginalnymi nazwami kolumn
+        """
+        import pandas as pd
+
+        name = (filename or '').lower()
+        if name.endswith('xlsx'):
+            yield from FileChunkReader._iter_xlsx(file_obj, chunk_size)
+        elif name.endswith('xls'):
+            # Format xls nie wspiera odczytu strumieniowego - dzielimy wczytany arkusz
+            df = pd.read_excel(file_obj)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+        else:  # CSV
+            yield from pd.read_csv(file_obj, chunksize=chunk_size)
+
+    @staticmethod
+    def _iter_xlsx(file_obj, chunk_size: int) -> Iterator['pd.DataFrame']:
+        """Czyta arkusz XLSX wiersz po wierszu w trybie read_only."""
+        import pandas as pd
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_obj, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = next(rows, None)
+            if headers is None:
+                return
+
+            # Kolumny bez nagłówka otrzymują nazwy zgodne z pandas
+            headers = [
+                header if header is not None else f"Unnamed: {i}"
+                for i, header in enumerate(headers)
+            ]
+
+            offset = 0
+            buffer = []
+            for row in rows:
+                # Pomijaj całkowicie puste wiersze (tak jak pd.read_excel)
+                if all(cell is None for cell in row):
+                    continue
+                row = tuple(row[:len(headers)])
+                buffer.append(row + (None,) * (len(headers) - len(row)))
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=headers, index=range(offset, offset + len(buffer)))
+                    offset += len(buffer)
+                    buffer = []
+
+            if buffer:
+                yield pd.DataFrame(buffer, columns=headers, index=range(offset, offset + len(buffer)))
+        finally:
+            workbook.close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Formatowanie liczb i kwot w formacie polskim bez użycia locale.
+
+Separator tysięcy to spacja, separator dziesiętny to przecinek
+(1234567.891 -> '1 234 567,89'). Formatowanie nie zmienia ustawień locale
+procesu, więc jest bezpieczne dla wątków i nie zależy od locale
+zainstalowanych w systemie.
+
+Funkcje dla pojedynczych wartości służą filtrom Jinja2, a round_numbers
+zaokrągla całe kolumny (np. listy produktów) jednym wywołaniem.
+"""
+
+from math import isfinite
+from decimal import ROUND_HALF_UP, Context, Decimal
+
+# Specyfikacje formatu z grupowaniem tysięcy ('1,234.56') - separatory zamieniane na polskie
+_SPECS = {decimals: f',.{decimals}f' for decimals in range(11)}
+
+# Decimal formatowany bezpośrednio (bez konwersji na float), z zaokrągleniem "połówki w górę"
+_HALF_UP = Context(prec=60, rounding=ROUND_HALF_UP)
+_QUANTUMS = {decimals: Decimal(1).scaleb(-decimals) for decimals in range(11)}
+
+CURRENCY_SYMBOLS = {
+    'PLN': 'zł',
+    'EUR': '€'
+}
+
+
+def to_number(value):
+    """
+    Zamienia wartość na float. Napisy mogą zawierać spacje i przecinek
+    dziesiętny ('1 234,5'). Zwraca None dla wartości pustych, niepoprawnych
+    i nieskończonych / NaN.
+    """
+    cls = value.__class__
+    try:
+        if cls is float or cls is Decimal or cls is int:
+            value = float(value)
+        elif value is None or cls is bool:
+            return None
+        elif isinstance(value, (float, int, Decimal)):
+            value = float(value)
+        else:
+            value = float(str(value).replace(' ', '').replace('\xa0', '').replace(',', '.'))
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return value if isfinite(value) else None
+
+
+def format_number(value, decimals=2, default=None):
+    """
+    Formatuje liczbę w formacie polskim z podaną liczbą miejsc po przecinku.
+
+    Args:
+        value: Liczba lub napis z liczbą
+        decimals: Liczba miejsc po przecinku
+        default: Wynik dla wartości pustych / niepoprawnych (domyślnie zero w tym formacie)
+    """
+    cls = value.__class__
+    if cls is Decimal and value.is_finite() and decimals in _QUANTUMS:
+        value = value.quantize(_QUANTUMS[decimals], context=_HALF_UP)
+    elif cls is not float or not isfinite(value):
+        value = to_number(value)
+        if value is None:
+            return _zero(decimals) if default is None else default
+    return format(value, _SPECS.get(decimals) or f',.{decimals}f').replace(',', ' ').replace('.', ',')
+
+
+def format_exchange_rate(value):
+    """Formatuje kurs wymiany (cztery miejsca po przecinku)."""
+    return format_number(value, 4)
+
+
+def format_currency(value, currency='PLN', decimals=2):
+    """Formatuje kwotę z symbolem waluty ('1 234,56 zł', '10,00 €', '5,00 USD')."""
+    return f'{format_number(value, decimals)} {CURRENCY_SYMBOLS.get(currency, currency)}'
+
+
+def round_number(value, decimals=2, default=None):
+    """Zaokrągla liczbę do podanej liczby miejsc (float do serializacji JSON)."""
+    if value.__class__ is not float or not isfinite(value):
+        value = to_number(value)
+        if value is None:
+            return default
+    return round(float(value), decimals)
+
+
+def round_numbers(values, decimals=2, default=None):
+    """Zaokrągla kolumnę wartości - wynik jak round_number dla każdej wartości."""
+    return [round_number(value, decimals, default) for value in values]
+
+
+def _zero(decimals):
+    return '0,' + '0' * decimals if decimals > 0 else '0'
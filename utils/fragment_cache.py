@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pamięć podręczna wyrenderowanych fragmentów szablonów (np. tabeli dostaw z paginacją).
+
+Klucz fragmentu składa się z nazwy fragmentu, zakresu (ID dostawcy), wersji
+danych zakresu i wariantu (np. kursora strony). Zatwierdzenie zmiany (dodanie,
+modyfikacja, usunięcie) obiektu obserwowanego modelu zwiększa wersję jego
+dostawcy, więc kolejne żądania renderują fragment od nowa, a poprzednie wpisy
+wypadają z pamięci (LRU) lub wygasają.
+
+Fragmenty przechowywane są w pamięci procesu (LRU z czasem życia wpisów).
+Opcjonalnie - przy FRAGMENT_CACHE_REDIS_URL - wersje i fragmenty
+współdzielone są przez serwer zgodny z Redis, dzięki czemu zmiana zatwierdzona
+w jednym procesie unieważnia fragmenty we wszystkich. Bez wspólnego serwera
+zmiany z innych procesów widoczne są najpóźniej po FRAGMENT_CACHE_TTL sekundach.
+
+Konfiguracja:
+    FRAGMENT_CACHE: Włącza pamięć fragmentów (domyślnie True)
+    FRAGMENT_CACHE_TTL: Czas życia fragmentu w sekundach (domyślnie 60)
+    FRAGMENT_CACHE_MAX_ENTRIES: Maks. liczba fragmentów w pamięci procesu (domyślnie 512)
+    FRAGMENT_CACHE_REDIS_URL: Adres wspólnego serwera Redis (opcjonalnie)
+"""
+
+import logging
+import threading
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentCache:
+    """Wersjonowana pamięć fragmentów HTML z opcjonalnym wspólnym magazynem."""
+
+    DEFAULT_TTL = 60
+    DEFAULT_MAX_ENTRIES = 512
+    KEY_PREFIX = 'fragment:'
+
+    def __init__(self):
+        self.enabled = True
+        self.ttl = self.DEFAULT_TTL
+        self._local = TTLCache(ttl=self.DEFAULT_TTL, max_entries=self.DEFAULT_MAX_ENTRIES)
+        self._shared = None
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._model = None
+        self._scope_attr = None
+
+    def init_app(self, app, db_session, model, scope_attr):
+        """
+        Args:
+            app: Aplikacja Flask
+            db_session: Sesja (lub scoped_session), której zatwierdzenia zmieniają wersje
+            model: Model, którego zmiany unieważniają fragmenty
+            scope_attr: Atrybut modelu wyznaczający zakres (np. 'id_supplier')
+        """
+        self.enabled = app.config.get('FRAGMENT_CACHE', True)
+        self.ttl = app.config.get('FRAGMENT_CACHE_TTL', self.DEFAULT_TTL)
+        self._local = TTLCache(
+            ttl=self.ttl,
+            max_entries=app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', self.DEFAULT_MAX_ENTRIES)
+        )
+        redis_url = app.config.get('FRAGMENT_CACHE_REDIS_URL')
+        if redis_url:
+            import redis
+            self._shared = redis.Redis.from_url(redis_url)
+        self._model = model
+        self._scope_attr = scope_attr
+        event.listen(db_session, 'before_flush', self._before_flush)
+        event.listen(db_session, 'after_commit', self._after_commit)
+
+    def version(self, scope):
+        """Zwraca bieżącą wersję danych zakresu."""
+        if self._shared is not None:
+            shared = self._shared_call('get', f'{self.KEY_PREFIX}version:{scope}')
+            if shared is not None:
+                return f's{int(shared)}'
+        return self._versions.get(scope, 0)
+
+    def bump(self, scope):
+        """Unieważnia fragmenty zakresu (zwiększa jego wersję)."""
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+        if self._shared is not None:
+            self._shared_call('incr', f'{self.KEY_PREFIX}version:{scope}')
+
+    def render(self, name, scope, variant, render):
+        """
+        Zwraca fragment z pamięci lub renderuje go przez render() i zapamiętuje.
+
+        Args:
+            name: Nazwa fragmentu
+            scope: Zakres danych fragmentu (ID dostawcy)
+            variant: Pozostała część klucza (np. kursor strony)
+            render: Funkcja zwracająca HTML fragmentu
+
+        Returns:
+            Markup: HTML fragmentu
+        """
+        if not self.enabled:
+            return Markup(render())
+
+        key = f'{name}:{scope}:{self.version(scope)}:{variant}'
+        html = self._local.get(key)
+        if html is None and self._shared is not None:
+            shared = self._shared_call('get', self.KEY_PREFIX + key)
+            if shared is not None:
+                html = shared.decode('utf-8')
+                self._local.set(key, html)
+        if html is None:
+            html = str(render())
+            self._local.set(key, html)
+            if self._shared is not None:
+                self._shared_call('set', self.KEY_PREFIX + key, html, ex=self.ttl)
+        return Markup(html)
+
+    def stats(self):
+        stats = self._local.stats()
+        stats['shared'] = self._shared is not None
+        return stats
+
+    def _shared_call(self, method, *args, **kwargs):
+        """Wywołanie wspólnego magazynu - błąd połączenia nie przerywa renderowania strony."""
+        try:
+            return getattr(self._shared, method)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Wspólna pamięć fragmentów niedostępna ({method}): {e}")
+            return None
+
+    def _before_flush(self, db_session, flush_context, instances):
+        changed = db_session.info.setdefault('fragment_cache_changed', set())
+        for collection in (db_session.new, db_session.dirty, db_session.deleted):
+            for instance in collection:
+                if isinstance(instance, self._model):
+                    changed.add(getattr(instance, self._scope_attr))
+                    # Przeniesienie do innego zakresu unieważnia także poprzedni
+                    changed.update(inspect(instance).attrs[self._scope_attr].history.deleted)
+
+    def _after_commit(self, db_session):
+        for scope in db_session.info.pop('fragment_cache_changed', ()):
+            self.bump(scope)
+
+
+fragment_cache = FragmentCache()
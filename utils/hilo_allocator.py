@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Przydział kolejnych numerów metodą hi-lo.
+
+Proces rezerwuje w bazie cały blok numerów naraz (część "hi"), a kolejne
+numery z bloku (część "lo") wydaje z pamięci. Baza danych odpytywana jest
+tylko raz na blok. Numery z bloku niewykorzystanego do końca (np. po
+restarcie procesu) przepadają - identyfikatory są unikalne i rosnące
+w obrębie procesu, ale nie muszą być ciągłe.
+"""
+
+import threading
+
+
+class HiLoAllocator:
+    """
+    Bezpieczny wątkowo przydział numerów z zarezerwowanych bloków.
+
+    Args:
+        reserve_block: Funkcja bez argumentów rezerwująca nowy blok i zwracająca
+                       krotkę (pierwszy numer, numer za ostatnim)
+    """
+
+    def __init__(self, reserve_block):
+        self._reserve_block = reserve_block
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+
+    def next_value(self):
+        """Zwraca kolejny numer, rezerwując nowy blok po wyczerpaniu bieżącego."""
+        with self._lock:
+            if self._next >= self._limit:
+                self._next, self._limit = self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    def reset(self):
+        """Porzuca bieżący blok - kolejny numer pochodzić będzie z nowej rezerwacji."""
+        with self._lock:
+            self._next = self._limit = 0
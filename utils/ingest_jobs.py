@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Kolejka zadań przetwarzania plików dostaw wykonywanych w tle.
+
+Zadania wykonywane są przez lokalną pulę wątków (bez zewnętrznego brokera)
+procesu, który przyjął plik. Stan, postęp i wynik zadań zapisywane są
+w pliku SQLite współdzielonym przez procesy serwera (np. workery gunicorn),
+więc zapytanie o status może trafić do dowolnego procesu na tym samym hoście.
+
+Konfiguracja:
+    INGEST_WORKERS: Liczba wątków wykonujących zadania w procesie (domyślnie 2)
+    INGEST_JOB_RETENTION: Czas przechowywania zakończonych zadań w sekundach (domyślnie 3600)
+    INGEST_JOB_STORE_PATH: Plik bazy stanu zadań (domyślnie instance/ingest_jobs.sqlite3)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class IngestJob:
+    """Stan pojedynczego zadania przetwarzania pliku."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, supplier_id, filename, store=None, key=None):
+        self.id = str(uuid.uuid4())
+        self.supplier_id = supplier_id
+        self.filename = filename
+        self.key = key
+        self.state = IngestJob.QUEUED
+        self.rows_read = 0
+        self.products_saved = 0
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._store = store
+
+    @property
+    def is_finished(self):
+        return self.state in (IngestJob.DONE, IngestJob.FAILED)
+
+    def update_progress(self, rows_read, products_saved):
+        """Aktualizuje liczniki postępu (wywoływane przez wątek roboczy)."""
+        self.rows_read = rows_read
+        self.products_saved = products_saved
+        if self._store is not None:
+            self._store.save(self)
+
+    def to_dict(self):
+        """Konwertuje zadanie na słownik."""
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'state': self.state,
+            'progress': {
+                'rows_read': self.rows_read,
+                'products_saved': self.products_saved
+            },
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+def _timestamp(value):
+    return value.timestamp() if value else None
+
+
+def _datetime(value):
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+class SQLiteJobStore:
+    """Stan zadań w pliku SQLite współdzielonym przez procesy (jedno połączenie na wątek)."""
+
+    COLUMNS = (
+        'id', 'supplier_id', 'filename', 'job_key', 'state', 'rows_read', 'products_saved',
+        'result', 'error', 'created_at', 'started_at', 'finished_at'
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS ingest_jobs ('
+                'id TEXT PRIMARY KEY, supplier_id TEXT NOT NULL, filename TEXT NOT NULL, job_key TEXT, '
+                'state TEXT NOT NULL, rows_read INTEGER NOT NULL, products_saved INTEGER NOT NULL, '
+                'result TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_ingest_jobs_supplier ON ingest_jobs (supplier_id, created_at)')
+            # Co najwyżej jedno niezakończone zadanie o danym kluczu (np. kluczu pliku w S3)
+            connection.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_ingest_jobs_active_key '
+                'ON ingest_jobs (job_key) WHERE finished_at IS NULL'
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _values(job):
+        return (
+            job.id, job.supplier_id, job.filename, job.key, job.state, job.rows_read, job.products_saved,
+            json.dumps(job.result, default=str, ensure_ascii=False) if job.result is not None else None,
+            job.error, _timestamp(job.created_at), _timestamp(job.started_at), _timestamp(job.finished_at)
+        )
+
+    def insert(self, job):
+        """
+        Zapisuje nowe zadanie.
+
+        Returns:
+            bool: False, jeśli niezakończone zadanie o tym samym kluczu już istnieje
+        """
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    f"INSERT INTO ingest_jobs ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+                    self._values(job)
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def save(self, job):
+        """Zapisuje bieżący stan zadania (wynik jako JSON)."""
+        with self._connection() as connection:
+            connection.execute(
+                f"UPDATE ingest_jobs SET {', '.join(f'{column} = ?' for column in self.COLUMNS[1:])} WHERE id = ?",
+                self._values(job)[1:] + (job.id,)
+            )
+
+    def load(self, job_id):
+        row = self._connection().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM ingest_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._to_job(row) if row else None
+
+    def load_active(self, key):
+        """Zwraca niezakończone zadanie o podanym kluczu lub None."""
+        row = self._connection().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM ingest_jobs WHERE job_key = ? AND finished_at IS NULL", (key,)
+        ).fetchone()
+        return self._to_job(row) if row else None
+
+    def list_for_supplier(self, supplier_id):
+        rows = self._connection().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM ingest_jobs WHERE supplier_id = ? ORDER BY created_at DESC",
+            (supplier_id,)
+        ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def purge(self, before):
+        """
+        Usuwa zakończone zadania starsze niż podany czas, a niezakończone
+        (np. przerwane razem z procesem) oznacza jako nieudane.
+        """
+        with self._connection() as connection:
+            connection.execute(
+                'UPDATE ingest_jobs SET state = ?, error = ?, finished_at = ? '
+                'WHERE finished_at IS NULL AND created_at < ?',
+                (IngestJob.FAILED, 'Zadanie zostało przerwane', time.time(), before)
+            )
+            return connection.execute('DELETE FROM ingest_jobs WHERE finished_at < ?', (before,)).rowcount
+
+    @staticmethod
+    def _to_job(row):
+        record = dict(zip(SQLiteJobStore.COLUMNS, row))
+        job = IngestJob(record['supplier_id'], record['filename'], key=record['job_key'])
+        job.id = record['id']
+        job.state = record['state']
+        job.rows_read = record['rows_read']
+        job.products_saved = record['products_saved']
+        job.result = json.loads(record['result']) if record['result'] is not None else None
+        job.error = record['error']
+        job.created_at = _datetime(record['created_at'])
+        job.started_at = _datetime(record['started_at'])
+        job.finished_at = _datetime(record['finished_at'])
+        return job
+
+
+class IngestJobQueue:
+    """
+    Lokalna pula wątków wykonująca zadania przetwarzania plików.
+
+    Każde zadanie uruchamiane jest w kontekście aplikacji Flask, więc może
+    korzystać z db.session tak jak kod obsługujący żądania. Odczyt stanu
+    (get, list_for_supplier) zwraca kopię zadania z magazynu.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._store = None
+        self._retention = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('INGEST_WORKERS', 2),
+            thread_name_prefix='ingest'
+        )
+        self._store = SQLiteJobStore(
+            app.config.get('INGEST_JOB_STORE_PATH') or os.path.join(app.instance_path, 'ingest_jobs.sqlite3')
+        )
+        self._retention = app.config.get('INGEST_JOB_RETENTION', 3600)
+
+    def submit(self, supplier_id, filename, func, *args, **kwargs):
+        """
+        Dodaje zadanie do kolejki.
+
+        Args:
+            supplier_id: ID dostawcy - właściciela zadania
+            filename: Nazwa przetwarzanego pliku
+            func: Funkcja wykonywana jako func(job, *args, **kwargs); zwracana wartość
+                  trafia do job.result
+
+        Returns:
+            IngestJob: Utworzone zadanie
+        """
+        job = IngestJob(supplier_id, filename, self._store)
+        self._store.purge(time.time() - self._retention)
+        self._store.insert(job)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def submit_once(self, key, supplier_id, filename, func, *args, **kwargs):
+        """
+        Dodaje zadanie, chyba że zadanie o tym samym kluczu czeka w kolejce lub
+        jest wykonywane (także w innym procesie) - wtedy zwraca istniejące zadanie.
+
+        Args:
+            key: Klucz zadania, np. klucz pliku w S3
+            (pozostałe argumenty jak w submit)
+
+        Returns:
+            tuple: (IngestJob, True jeśli utworzono nowe zadanie)
+        """
+        job = IngestJob(supplier_id, filename, self._store, key)
+        self._store.purge(time.time() - self._retention)
+        while not self._store.insert(job):
+            existing = self._store.load_active(key)
+            if existing is not None:
+                return existing, False
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job, True
+
+    def get(self, job_id, supplier_id=None):
+        """Zwraca zadanie o podanym ID (opcjonalnie tylko jeśli należy do dostawcy)."""
+        job = self._store.load(job_id)
+        if job is None or (supplier_id is not None and job.supplier_id != supplier_id):
+            return None
+        return job
+
+    def list_for_supplier(self, supplier_id):
+        """Zwraca zadania dostawcy od najnowszego."""
+        return self._store.list_for_supplier(supplier_id)
+
+    def _run(self, job, func, args, kwargs):
+        job.state = IngestJob.RUNNING
+        job.started_at = datetime.now()
+        self._save(job)
+        try:
+            with self.app.app_context():
+                job.result = func(job, *args, **kwargs)
+            job.state = IngestJob.DONE
+        except Exception as e:
+            logger.exception(f"Błąd podczas wykonywania zadania {job.id}")
+            job.error = str(e)
+            job.state = IngestJob.FAILED
+        finally:
+            job.finished_at = datetime.now()
+            self._save(job)
+
+    def _save(self, job):
+        try:
+            self._store.save(job)
+        except Exception:
+            logger.exception(f"Błąd podczas zapisywania stanu zadania {job.id}")
+
+
+ingest_queue = IngestJobQueue()
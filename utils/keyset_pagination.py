@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paginacja kluczowa (keyset / seek) z nieprzezroczystymi kursorami.
+
+Zamiast OFFSET kolejna strona wybierana jest warunkiem "wiersze za ostatnim
+wierszem bieżącej strony" na kolumnach sortowania, więc koszt zapytania nie
+zależy od numeru strony. Kolumny sortowania muszą jednoznacznie wyznaczać
+kolejność (ostatnia kolumna powinna być unikalna, np. klucz główny).
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import and_, or_
+
+
+def _dump_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, direction):
+    """Koduje pozycję (wartości kolumn sortowania) i kierunek jako nieprzezroczysty token."""
+    payload = {
+        'v': [_dump_value(value) for value in values],
+        'd': direction
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """
+    Dekoduje token kursora.
+
+    Returns:
+        tuple: (wartości kolumn, kierunek) lub None dla pustego lub nieprawidłowego tokenu
+    """
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        values, direction = payload['v'], payload['d']
+        if direction not in ('next', 'prev') or len(values) != len(columns):
+            return None
+        return [_parse_value(column, value) for column, value in zip(columns, values)], direction
+    except (ValueError, KeyError, TypeError, binascii.Error, InvalidOperation):
+        return None
+
+
+def _parse_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+
+def _is_nullable(column):
+    return getattr(getattr(column, 'expression', column), 'nullable', True)
+
+
+def _seek_condition(columns, values, after):
+    """
+    Warunek (c1, c2, ...) < (v1, v2, ...) dla after=False lub > dla after=True,
+    rozpisany na OR/AND, aby MySQL mógł użyć indeksu złożonego.
+
+    Kolumny porównywane są bezpośrednio (bez funkcji typu COALESCE), więc
+    kolejność i zakres wyznacza indeks. Dla kolumn dopuszczających NULL
+    porównania uzupełniane są o IS NULL / IS NOT NULL zgodnie z kolejnością
+    MySQL i SQLite, w której NULL jest mniejszy od każdej wartości.
+    """
+    conditions = []
+    for position, column in enumerate(columns):
+        equal = [_equal(columns[i], values[i]) for i in range(position)]
+        compare = _after(column, values[position]) if after else _before(column, values[position])
+        if compare is not None:
+            conditions.append(and_(*equal, compare))
+    return or_(*conditions)
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value):
+    """Wiersze za wartością w kolejności rosnącej."""
+    if value is None:
+        return column.isnot(None) if _is_nullable(column) else None
+    return column > value
+
+
+def _before(column, value):
+    """Wiersze przed wartością w kolejności rosnącej."""
+    if value is None:
+        return None
+    if _is_nullable(column):
+        return or_(column < value, column.is_(None))
+    return column < value
+
+
+class KeysetPage:
+    """Strona wyników z kursorami do sąsiednich stron."""
+
+    def __init__(self, items, next_cursor, prev_cursor, per_page, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=10, key=None, total=None, descending=True):
+    """
+    Zwraca stronę wyników zapytania posortowanego po kolumnach columns.
+
+    Args:
+        query: Zapytanie SQLAlchemy (bez ORDER BY / LIMIT)
+        columns: Kolumny sortowania (ostatnia unikalna)
+        cursor: Token kursora z poprzedniej strony (None - pierwsza strona)
+        per_page: Liczba wyników na stronę
+        key: Funkcja zwracająca wartości kolumn sortowania dla elementu
+             (domyślnie atrybuty o nazwach kolumn)
+        total: Opcjonalna (np. przybliżona) liczba wszystkich wyników
+        descending: Kierunek sortowania (wspólny dla wszystkich kolumn)
+
+    Returns:
+        KeysetPage
+    """
+    key = key or (lambda item: [getattr(item, column.key) for column in columns])
+    position = decode_cursor(cursor, columns)
+    direction = position[1] if position else 'next'
+
+    # Strona poprzednia to strona "następna" w odwróconym kierunku sortowania
+    backwards = direction == 'prev'
+    ascending = descending == backwards
+    if position:
+        query = query.filter(_seek_condition(columns, position[0], after=ascending))
+    query = query.order_by(*[column.asc() if ascending else column.desc() for column in columns])
+
+    # Jeden dodatkowy wiersz mówi, czy istnieje kolejna strona w kierunku przeglądania
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if direction == 'prev':
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, position is not None
+
+    next_cursor = encode_cursor(key(items[-1]), 'next') if has_next and items else None
+    prev_cursor = encode_cursor(key(items[0]), 'prev') if has_prev and items else None
+    return KeysetPage(items, next_cursor, prev_cursor, per_page, total)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ochrona logowania przed zgadywaniem haseł.
+
+1. Limit prób w przesuwanym oknie czasowym, osobno dla adresu email i adresu
+   IP - sprawdzany przed zapytaniem o konto i przed haszowaniem hasła.
+2. Blokada konta (locked_until) po LOGIN_LOCKOUT_THRESHOLD kolejnych
+   nieudanych próbach (failed_login_attempts).
+3. Ograniczona liczba jednoczesnych weryfikacji haseł, aby seria prób nie
+   zajęła wszystkich wątków serwera obliczaniem skrótów.
+4. Po udanym logowaniu hasła zapisane starszą metodą (bcrypt, inne parametry
+   scrypt/pbkdf2) są haszowane ponownie metodą LOGIN_PASSWORD_HASH_METHOD.
+
+Liczniki okien przechowywane są w pamięci procesu - każdy proces serwera
+liczy próby osobno. Blokada kont zapisywana jest w bazie (przez auth_activity).
+Limit dla adresu IP korzysta z request.remote_addr - za odwrotnym proxy należy
+ustawić TRUSTED_PROXY_COUNT (create_app), inaczej wszystkie próby liczone są
+dla adresu proxy.
+
+Konfiguracja:
+    LOGIN_THROTTLE_EMAIL: Maks. liczba prób na adres email w oknie (domyślnie 10)
+    LOGIN_THROTTLE_IP: Maks. liczba prób na adres IP w oknie (domyślnie 30)
+    LOGIN_THROTTLE_WINDOW: Długość okna w sekundach (domyślnie 300)
+    LOGIN_LOCKOUT_THRESHOLD: Liczba nieudanych prób do blokady konta (domyślnie 5)
+    LOGIN_LOCKOUT_DURATION: Czas blokady konta w sekundach (domyślnie 900)
+    LOGIN_HASH_CONCURRENCY: Maks. liczba jednoczesnych weryfikacji hasła (domyślnie liczba CPU)
+    LOGIN_HASH_TIMEOUT: Maks. czas oczekiwania na weryfikację w sekundach (domyślnie 5)
+    LOGIN_PASSWORD_HASH_METHOD: Docelowa metoda haszowania (domyślnie 'scrypt:32768:8:1')
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy.orm import object_session
+from utils.auth_activity import auth_activity
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusyError(Exception):
+    """Wszystkie miejsca weryfikacji haseł są zajęte dłużej niż LOGIN_HASH_TIMEOUT."""
+
+
+class SlidingWindowThrottle:
+    """Limit zdarzeń na klucz w przesuwanym oknie czasowym."""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, limit, window, max_keys=100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key, now=None):
+        """
+        Rejestruje zdarzenie. Zwraca 0, jeśli mieści się w limicie, w przeciwnym
+        razie liczbę sekund do zwolnienia miejsca w oknie (zdarzenie nie jest liczone).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.SWEEP_EVERY == 0 or len(self._hits) >= self.max_keys:
+                self._sweep(now)
+
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return max(math.ceil(hits[0] + self.window - now), 1)
+            hits.append(now)
+            return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _sweep(self, now):
+        """Usuwa klucze bez zdarzeń w oknie, a przy przepełnieniu - najstarsze klucze."""
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - self.window]:
+            del self._hits[key]
+        for key in list(self._hits)[:max(len(self._hits) - self.max_keys + 1, 0)]:
+            del self._hits[key]
+
+
+class LoginGuard:
+    """Limity prób, blokada kont i weryfikacja haseł dla tras logowania."""
+
+    def __init__(self):
+        self.email_throttle = SlidingWindowThrottle(10, 300)
+        self.ip_throttle = SlidingWindowThrottle(30, 300)
+        self.lockout_threshold = 5
+        self.lockout_duration = timedelta(seconds=900)
+        self.hash_timeout = 5
+        self.hash_method = 'scrypt:32768:8:1'
+        self._hash_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+    def init_app(self, app):
+        window = app.config.get('LOGIN_THROTTLE_WINDOW', 300)
+        self.email_throttle = SlidingWindowThrottle(app.config.get('LOGIN_THROTTLE_EMAIL', 10), window)
+        self.ip_throttle = SlidingWindowThrottle(app.config.get('LOGIN_THROTTLE_IP', 30), window)
+        self.lockout_threshold = app.config.get('LOGIN_LOCKOUT_THRESHOLD', 5)
+        self.lockout_duration = timedelta(seconds=app.config.get('LOGIN_LOCKOUT_DURATION', 900))
+        self.hash_timeout = app.config.get('LOGIN_HASH_TIMEOUT', 5)
+        self.hash_method = app.config.get('LOGIN_PASSWORD_HASH_METHOD', self.hash_method)
+        self._hash_slots = threading.BoundedSemaphore(app.config.get('LOGIN_HASH_CONCURRENCY') or os.cpu_count() or 1)
+
+    def check_rate(self, email, ip):
+        """Rejestruje próbę logowania. Zwraca 0 lub liczbę sekund, po której można spróbować ponownie."""
+        retry_after = self.ip_throttle.hit(ip or '-')
+        if retry_after:
+            return retry_after
+        return self.email_throttle.hit(self._email_key(email))
+
+    @staticmethod
+    def locked_for(auth_data):
+        """Zwraca liczbę sekund pozostałej blokady konta (0 - konto niezablokowane)."""
+        locked_until = auth_activity.locked_until(auth_data.related_id, auth_data.locked_until)
+        if locked_until is None:
+            return 0
+        remaining = (locked_until - datetime.now()).total_seconds()
+        return max(math.ceil(remaining), 0)
+
+    def verify(self, auth_data, password):
+        """
+        Weryfikuje hasło (w ograniczonej liczbie jednocześnie) i po udanej
+        weryfikacji ustawia skrót docelową metodą, jeśli zapisano go inną.
+
+        Raises:
+            HashingBusyError: Brak wolnego miejsca weryfikacji w LOGIN_HASH_TIMEOUT sekund
+        """
+        if not self._hash_slots.acquire(timeout=self.hash_timeout):
+            raise HashingBusyError()
+        try:
+            if not auth_data.verify_password(password):
+                return False
+            rehashed = auth_data.needs_rehash(self.hash_method)
+            if rehashed:
+                auth_data.set_password(password, method=self.hash_method)
+        finally:
+            self._hash_slots.release()
+
+        if rehashed:
+            db_session = object_session(auth_data)
+            if db_session is not None:
+                db_session.commit()
+            logger.info(f"Zaktualizowano metodę haszowania hasła konta {auth_data.related_id}")
+        return True
+
+    def login_succeeded(self, auth_data, email):
+        """Zeruje licznik prób (w bazie i w oknie adresu email)."""
+        self.email_throttle.reset(self._email_key(email))
+        auth_activity.record_login(auth_data.related_id)
+
+    def login_failed(self, auth_data):
+        """Zwiększa licznik nieudanych prób i blokuje konto po przekroczeniu progu."""
+        # Po wygaśnięciu blokady próby liczone są od nowa
+        restart = (
+            auth_activity.locked_until(auth_data.related_id, auth_data.locked_until) is not None
+            and self.locked_for(auth_data) == 0
+        )
+        failures = 1 if restart else auth_activity.failures(auth_data.related_id, auth_data.failed_login_attempts) + 1
+        lock_until = None
+        if self.lockout_threshold and failures >= self.lockout_threshold:
+            lock_until = datetime.now() + self.lockout_duration
+            logger.warning(f"Konto {auth_data.related_id} zablokowane do {lock_until:%Y-%m-%d %H:%M:%S} po {failures} nieudanych próbach")
+        auth_activity.record_failure(auth_data.related_id, restart=restart, lock_until=lock_until)
+
+    @staticmethod
+    def _email_key(email):
+        return (email or '').strip().lower()
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ustawienia i metryki puli połączeń bazy danych.
+
+Metryki (czas oczekiwania na połączenie, połączenia w użyciu i ponad limit
+puli, wiek połączeń, liczba unieważnień) zbierane są w pamięci procesu -
+przy kilku procesach gunicorn każdy z nich raportuje własną pulę.
+
+Ustawienia puli (klucz konfiguracji lub zmienna środowiskowa o tej samej nazwie,
+zmienna środowiskowa ma pierwszeństwo):
+    DB_POOL_SIZE: Liczba stałych połączeń puli
+    DB_MAX_OVERFLOW: Liczba dodatkowych połączeń ponad DB_POOL_SIZE
+    DB_POOL_TIMEOUT: Maksymalny czas oczekiwania na połączenie (s)
+    DB_POOL_RECYCLE: Wiek, po którym połączenie jest odtwarzane (s)
+    DB_POOL_PRE_PING: Sprawdzanie połączenia przed wydaniem z puli
+"""
+
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Klucz konfiguracji -> (opcja create_engine, konwersja wartości)
+POOL_SETTINGS = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_POOL_PRE_PING': ('pool_pre_ping', _to_bool),
+}
+
+
+def configure_pool(app):
+    """
+    Uzupełnia SQLALCHEMY_ENGINE_OPTIONS o ustawienia puli (wywoływane przed db.init_app).
+
+    Dla baz innych niż SQLite pula mierzy czas oczekiwania na połączenie (TimedQueuePool).
+    """
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    for key, (option, convert) in POOL_SETTINGS.items():
+        value = os.environ.get(key, app.config.get(key))
+        if value is not None and value != '':
+            options[option] = convert(value)
+    if not str(app.config.get('SQLALCHEMY_DATABASE_URI', '')).startswith('sqlite'):
+        options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+class Histogram:
+    """Histogram o stałych przedziałach (liczności skumulowane jak w Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.buckets + ('+Inf',), self._counts):
+                cumulative += count
+                buckets.append({'le': bound, 'count': cumulative})
+            return {
+                'count': self.count,
+                'sum': round(self.sum, 3),
+                'max': round(self.max, 3),
+                'avg': round(self.sum / self.count, 3) if self.count else 0.0,
+                'buckets': buckets
+            }
+
+
+class PoolMetrics:
+    """Liczniki i histogramy zdarzeń puli połączeń silnika SQLAlchemy."""
+
+    WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+    AGE_BUCKETS_S = (1, 10, 60, 300, 900, 1800, 3600, 14400)
+    COUNTERS = (
+        'connects', 'closes', 'checkouts', 'checkins', 'checkout_timeouts',
+        'invalidations', 'soft_invalidations'
+    )
+
+    def __init__(self):
+        self.engine = None
+        self.checkout_wait_ms = Histogram(self.WAIT_BUCKETS_MS)
+        self.connection_age_s = Histogram(self.AGE_BUCKETS_S)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self.peak_checked_out = 0
+        self.checkout_wait_ms.reset()
+        self.connection_age_s.reset()
+
+    def init_app(self, app):
+        with app.app_context():
+            self.attach(app.extensions['sqlalchemy'].engine)
+
+    def attach(self, engine):
+        """Rejestruje obsługę zdarzeń puli silnika."""
+        self.engine = engine
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'close', self._on_close)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'soft_invalidate', self._on_soft_invalidate)
+
+    def _increment(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe_wait(self, seconds):
+        self.checkout_wait_ms.observe(seconds * 1000)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        connection_record.info['connected_at'] = time.monotonic()
+        self._increment('connects')
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._increment('closes')
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self._increment('checkouts')
+        connected_at = connection_record.info.get('connected_at')
+        if connected_at is not None:
+            self.connection_age_s.observe(time.monotonic() - connected_at)
+        checked_out = _pool_value(self.engine.pool, 'checkedout')
+        if checked_out is not None:
+            with self._lock:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self._increment('checkins')
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self._increment('invalidations')
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        self._increment('soft_invalidations')
+
+    def snapshot(self):
+        """Zwraca bieżący stan puli i zebrane metryki jako słownik."""
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            counters = dict(self.counters)
+            peak = self.peak_checked_out
+        return {
+            'pid': os.getpid(),
+            'pool': {
+                'class': type(pool).__name__ if pool is not None else None,
+                'size': _pool_value(pool, 'size'),
+                'checked_out': _pool_value(pool, 'checkedout'),
+                'checked_in': _pool_value(pool, 'checkedin'),
+                'overflow': _pool_value(pool, 'overflow'),
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'timeout': _pool_value(pool, 'timeout'),
+                'recycle': getattr(pool, '_recycle', None),
+                'pre_ping': getattr(pool, '_pre_ping', None),
+                'peak_checked_out': peak
+            },
+            'counters': counters,
+            'checkout_wait_ms': self.checkout_wait_ms.snapshot(),
+            'connection_age_s': self.connection_age_s.snapshot()
+        }
+
+
+def _pool_value(pool, name):
+    method = getattr(pool, name, None)
+    return method() if callable(method) else None
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool mierząca czas oczekiwania na wydanie połączenia (pool_metrics)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics._increment('checkout_timeouts')
+            raise
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - started)
+
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Narzędzia do kontroli planów zapytań (EXPLAIN) w MySQL.
+
+QueryRecorder zapisuje zapytania SELECT wykonane przez silnik podczas
+wywołania zwykłych metod modeli, a explain() i full_scans() pozwalają
+sprawdzić, czy któreś z nich czyta całą tabelę zamiast korzystać z indeksu.
+Dla zapytań stronicowanych (ORDER BY ... LIMIT) extra_sorts() wykrywa
+sortowanie wszystkich pasujących wierszy zamiast odczytu w kolejności indeksu.
+"""
+
+import re
+from sqlalchemy import event
+
+PAGINATED = re.compile(r'\bORDER\s+BY\b.*\bLIMIT\b', re.IGNORECASE | re.DOTALL)
+
+
+class QueryRecorder:
+    """
+    Menedżer kontekstu zapisujący zapytania SELECT wykonane na silniku.
+
+    Przykład:
+        with QueryRecorder(db.engine) as recorder:
+            DeliveryGeneral.get_by_status_keyset('new', supplier_id)
+        for statement, parameters in recorder.statements:
+            ...
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        return False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.statements.append((statement, parameters))
+
+
+def explain(connection, statement, parameters=None):
+    """
+    Zwraca plan zapytania jako listę słowników (kolumny wyniku EXPLAIN:
+    table, type, possible_keys, key, rows, Extra...).
+    """
+    result = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters or ())
+    return [dict(row) for row in result.mappings()]
+
+
+def full_scans(plan, tables):
+    """
+    Zwraca wiersze planu, w których tabela z tables czytana jest w całości
+    (type = ALL) lub przez pełny skan indeksu (type = index).
+    """
+    return [
+        row for row in plan
+        if row.get('table') in tables and row.get('type') in ('ALL', 'index')
+    ]
+
+
+def is_paginated(statement):
+    """Sprawdza, czy zapytanie pobiera stronę wyników (ORDER BY ... LIMIT)."""
+    return PAGINATED.search(statement) is not None
+
+
+def extra_sorts(plan, tables):
+    """
+    Zwraca wiersze planu, w których tabela z tables wymaga sortowania
+    (Extra: Using filesort) lub tabeli tymczasowej (Using temporary) - przy
+    ORDER BY ... LIMIT oznacza to odczyt i sortowanie wszystkich pasujących
+    wierszy, a nie tylko strony.
+    """
+    return [
+        row for row in plan
+        if row.get('table') in tables
+        and any(marker in (row.get('Extra') or '') for marker in ('Using filesort', 'Using temporary'))
+    ]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Role pracowników (admin / staff) przechowywane w sesji.
+
+Rola ustalana jest przy logowaniu i zapisywana w sesji razem z numerem wersji
+i czasem sprawdzenia, więc sprawdzenie uprawnień w kolejnych żądaniach nie
+wymaga zapytania o login_auth_data. Zatwierdzona zmiana (lub usunięcie)
+wiersza login_auth_data ze zmienioną rolą zwiększa wersję roli użytkownika -
+sesje z poprzednią wersją odczytują rolę ponownie z bazy.
+
+Wersje przechowywane są we wspólnym magazynie, tak jak sesje: w pliku SQLite
+współdzielonym przez procesy serwera lub - przy SESSION_BACKEND 'redis' -
+w tym samym serwerze Redis, więc zmiana roli zatwierdzona w dowolnym procesie
+obowiązuje od następnego żądania. Zmiany wykonane poza ORM (np. ręcznym
+zapytaniem SQL) obowiązują najpóźniej po ROLE_CACHE_TTL sekundach.
+
+Konfiguracja:
+    ROLE_CACHE_TTL: Czas ważności roli w sesji w sekundach (domyślnie 30)
+    ROLE_VERSION_STORE_PATH: Plik bazy wersji ról (domyślnie instance/role_versions.sqlite3)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from flask import session
+from sqlalchemy import event, inspect
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteRoleVersionStore:
+    """Wersje ról w pliku SQLite współdzielonym przez procesy (jedno połączenie na wątek)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS role_versions (related_id TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, related_id):
+        row = self._connection().execute(
+            'SELECT version FROM role_versions WHERE related_id = ?', (related_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def increment(self, related_id):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT INTO role_versions (related_id, version) VALUES (?, 1) '
+                'ON CONFLICT(related_id) DO UPDATE SET version = version + 1',
+                (related_id,)
+            )
+
+
+class RedisRoleVersionStore:
+    """Wersje ról w serwerze zgodnym z Redis (współdzielone także między hostami)."""
+
+    def __init__(self, client, prefix='role_version:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, related_id):
+        return int(self.client.get(self.prefix + related_id) or 0)
+
+    def increment(self, related_id):
+        self.client.incr(self.prefix + related_id)
+
+
+class RoleCache:
+    """Wersjonowana pamięć ról użytkowników w sesji Flask."""
+
+    SESSION_KEY = '_role'
+    DEFAULT_TTL = 30
+
+    def __init__(self):
+        self.ttl = self.DEFAULT_TTL
+        self._store = None
+        self._loader = None
+        self._model = None
+
+    def init_app(self, app, db_session, model, loader):
+        """
+        Args:
+            app: Aplikacja Flask
+            db_session: Sesja (lub scoped_session), której zatwierdzenia unieważniają role
+            model: Model danych logowania (kolumny related_id i role)
+            loader: Funkcja loader(related_id) zwracająca rolę z bazy (lub None)
+        """
+        self.ttl = app.config.get('ROLE_CACHE_TTL', self.DEFAULT_TTL)
+        if app.config.get('SESSION_BACKEND') == 'redis':
+            import redis
+            self._store = RedisRoleVersionStore(redis.Redis.from_url(app.config['SESSION_REDIS_URL']))
+        else:
+            self._store = SQLiteRoleVersionStore(
+                app.config.get('ROLE_VERSION_STORE_PATH') or os.path.join(app.instance_path, 'role_versions.sqlite3')
+            )
+        self._model = model
+        self._loader = loader
+        event.listen(db_session, 'before_flush', self._before_flush)
+        event.listen(db_session, 'after_commit', self._after_commit)
+
+    def version(self, related_id):
+        """Zwraca wersję roli użytkownika lub None, jeśli magazyn jest niedostępny."""
+        try:
+            return self._store.get(related_id)
+        except Exception:
+            logger.exception(f"Błąd odczytu wersji roli {related_id}")
+            return None
+
+    def remember(self, related_id, role):
+        """Zapisuje w sesji rolę ustaloną przy logowaniu."""
+        session[self.SESSION_KEY] = {
+            'id': related_id,
+            'role': role,
+            'v': self.version(related_id),
+            'at': time.time()
+        }
+
+    def resolve(self, related_id):
+        """
+        Zwraca rolę użytkownika - z sesji, jeśli wpis jest aktualny, w przeciwnym
+        razie z bazy (i zapisuje ją w sesji).
+        """
+        entry = session.get(self.SESSION_KEY)
+        version = self.version(related_id) if entry else None
+        # Bez dostępnej wersji rola zawsze odczytywana jest z bazy
+        if (
+            version is not None
+            and entry.get('id') == related_id
+            and entry.get('v') == version
+            and time.time() - entry.get('at', 0) < self.ttl
+        ):
+            return entry['role']
+
+        role = self._loader(related_id)
+        if role is not None:
+            self.remember(related_id, role)
+        else:
+            session.pop(self.SESSION_KEY, None)
+        return role
+
+    def invalidate(self, related_id):
+        try:
+            self._store.increment(related_id)
+        except Exception:
+            logger.exception(f"Błąd zapisu wersji roli {related_id}")
+
+    def _before_flush(self, db_session, flush_context, instances):
+        changed = db_session.info.setdefault('role_cache_changed', set())
+        for instance in db_session.dirty:
+            if isinstance(instance, self._model) and inspect(instance).attrs.role.history.has_changes():
+                changed.add(instance.related_id)
+        for instance in db_session.deleted:
+            if isinstance(instance, self._model):
+                changed.add(instance.related_id)
+
+    def _after_commit(self, db_session):
+        for related_id in db_session.info.pop('role_cache_changed', ()):
+            self.invalidate(related_id)
+
+
+role_cache = RoleCache()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dostęp do plików dostaw przechowywanych w S3.
+
+Obsługuje zarówno zapis przez serwer (upload_fileobj), jak i bezpośredni
+upload z przeglądarki na podstawie podpisanego formularza POST. Adres
+usługi można nadpisać (S3_ENDPOINT_URL), aby korzystać z lokalnego
+odpowiednika S3 (np. MinIO lub moto) w środowisku deweloperskim i testach.
+
+Trasy korzystają ze wspólnego obiektu s3_storage - klient boto3 tworzony jest
+przy pierwszej operacji na plikach (a nie przy imporcie modułu tras), więc
+import boto3 i budowa klienta nie wydłużają startu procesu. Klient tworzony
+jest po uruchomieniu workera (także po fork) i współdzielony przez jego
+wątki - klienci boto3 są bezpieczni wątkowo.
+"""
+
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from werkzeug.utils import secure_filename
+
+KEY_PREFIX = 'supplier_files'
+
+
+class S3Storage:
+    """Operacje na plikach dostaw w jednym buckecie S3."""
+
+    DEFAULT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+    DEFAULT_UPLOAD_URL_EXPIRES = 900
+
+    def __init__(self, client, bucket):
+        self.client = client
+        self.bucket = bucket
+
+    @classmethod
+    def from_config(cls, config):
+        """Tworzy klienta S3 na podstawie klasy konfiguracji lub app.config."""
+        import boto3
+        
+        if isinstance(config, Mapping):
+            get = config.get
+        else:
+            get = lambda name, default=None: getattr(config, name, default)
+        client = boto3.client(
+            's3',
+            aws_access_key_id=get('AWS_ACCESS_KEY_ID'),
+            aws_secret_access_key=get('AWS_SECRET_ACCESS_KEY'),
+            region_name=get('AWS_REGION'),
+            endpoint_url=get('S3_ENDPOINT_URL')
+        )
+        return cls(client, get('S3_BUCKET'))
+
+    @staticmethod
+    def supplier_prefix(supplier_id):
+        """Zwraca prefiks kluczy plików dostawcy."""
+        return f"{KEY_PREFIX}/{supplier_id}/"
+
+    @staticmethod
+    def build_key(supplier_id, delivery_id, filename):
+        """
+        Generuje unikalny klucz pliku.
+
+        Format: supplier_files/<dostawca>/DEL000001_20250312_140655_original_filename
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"{S3Storage.supplier_prefix(supplier_id)}{delivery_id}_{timestamp}_{secure_filename(filename)}"
+
+    @staticmethod
+    def owns_key(supplier_id, s3_key):
+        """Sprawdza, czy klucz leży w katalogu dostawcy (bez wyjścia poza prefiks)."""
+        return bool(s3_key) and s3_key.startswith(S3Storage.supplier_prefix(supplier_id)) and '..' not in s3_key
+
+    def upload_fileobj(self, file_obj, s3_key, content_type, metadata=None):
+        """Zapisuje plik przesłany przez serwer."""
+        self.client.upload_fileobj(
+            file_obj,
+            self.bucket,
+            s3_key,
+            ExtraArgs={
+                'ContentType': content_type,
+                'Metadata': metadata or {}
+            }
+        )
+
+    def presigned_post(self, s3_key, content_type, metadata=None, max_size=None, expires=None):
+        """
+        Generuje podpisany formularz POST do bezpośredniego uploadu z przeglądarki.
+
+        Podpis obejmuje dokładny klucz, typ MIME, metadane i limit rozmiaru,
+        więc przeglądarka nie może zapisać pliku pod innym kluczem.
+
+        Returns:
+            dict: {'url': ..., 'fields': {...}} - pola należy wysłać przed plikiem
+        """
+        fields = {'Content-Type': content_type}
+        conditions = [
+            {'Content-Type': content_type},
+            ['content-length-range', 1, max_size or self.DEFAULT_MAX_UPLOAD_SIZE]
+        ]
+        for name, value in (metadata or {}).items():
+            fields[f'x-amz-meta-{name}'] = str(value)
+            conditions.append({f'x-amz-meta-{name}': str(value)})
+
+        return self.client.generate_presigned_post(
+            self.bucket,
+            s3_key,
+            Fields=fields,
+            Conditions=conditions,
+            ExpiresIn=expires or self.DEFAULT_UPLOAD_URL_EXPIRES
+        )
+
+    def head(self, s3_key):
+        """Zwraca metadane obiektu (rozmiar, typ MIME, metadane użytkownika)."""
+        response = self.client.head_object(Bucket=self.bucket, Key=s3_key)
+        return {
+            'size': response['ContentLength'],
+            'content_type': response.get('ContentType'),
+            'metadata': response.get('Metadata', {})
+        }
+
+    def open(self, s3_key):
+        """Zwraca strumień (StreamingBody) z zawartością obiektu."""
+        return self.client.get_object(Bucket=self.bucket, Key=s3_key)['Body']
+
+
+class LazyS3Storage:
+    """
+    S3Storage tworzony przy pierwszym użyciu na podstawie konfiguracji aplikacji
+    i współdzielony przez wszystkie żądania procesu. Udostępnia te same metody
+    co S3Storage.
+    """
+
+    def __init__(self):
+        self._config = None
+        self._storage = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._config = app.config
+        self._storage = None
+
+    def get(self):
+        """Zwraca współdzielony S3Storage (tworzy klienta przy pierwszym wywołaniu)."""
+        storage = self._storage
+        if storage is None:
+            with self._lock:
+                if self._storage is None:
+                    if self._config is None:
+                        raise RuntimeError('s3_storage nie został zainicjalizowany (init_app)')
+                    self._storage = S3Storage.from_config(self._config)
+                storage = self._storage
+        return storage
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+s3_storage = LazyS3Storage()
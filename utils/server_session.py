@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sesje przechowywane po stronie serwera.
+
+Ciasteczko zawiera tylko losowy identyfikator sesji, a dane sesji (flash,
+tożsamość Flask-Login / Flask-Principal, rola) trafiają do magazynu:
+    sqlite - plik SQLite (bez zewnętrznych usług, współdzielony przez procesy),
+    redis  - serwer zgodny z Redis (wymaga pakietu redis).
+
+Dane wczytywane są dopiero przy pierwszym odwołaniu do sesji, więc żądania,
+które z niej nie korzystają, nie odczytują magazynu. Wygasłe sesje SQLite
+usuwane są w tle przez wątek porządkujący (Redis usuwa je sam).
+
+Konfiguracja:
+    SESSION_BACKEND: 'sqlite' (domyślnie), 'redis' lub 'cookie' (sesje Flask w ciasteczku)
+    SESSION_SQLITE_PATH: Plik bazy sesji (domyślnie instance/sessions.sqlite3)
+    SESSION_REDIS_URL: Adres serwera Redis (np. redis://localhost:6379/0)
+    SESSION_CLEANUP_INTERVAL: Odstęp usuwania wygasłych sesji w sekundach (domyślnie 600)
+"""
+
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+
+logger = logging.getLogger(__name__)
+
+_SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class ServerSession(SessionMixin):
+    """Sesja wczytywana z magazynu przy pierwszym odwołaniu."""
+
+    def __init__(self, sid, store, new=False):
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.expires_at = None
+        self.loaded_user_id = None
+        self._store = store
+        self._data = {} if new else None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    @property
+    def data(self):
+        if self._data is None:
+            record = self._store.load(self.sid)
+            if record is None:
+                # Sesja wygasła lub nie istnieje - dalej traktowana jak nowa
+                self._data, self.new = {}, True
+            else:
+                self._data, self.expires_at = record
+                self.loaded_user_id = self._data.get('_user_id')
+        self.accessed = True
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class SQLiteSessionStore:
+    """Magazyn sesji w pliku SQLite (jedno połączenie na wątek)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def load(self, sid):
+        row = self._connection().execute(
+            'SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?', (sid, time.time())
+        ).fetchone()
+        return row
+
+    def save(self, sid, data, expires_at):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)',
+                (sid, data, expires_at)
+            )
+
+    def delete(self, sid):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def purge_expired(self):
+        with self._connection() as connection:
+            return connection.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+
+
+class RedisSessionStore:
+    """Magazyn sesji w serwerze zgodnym z Redis (wygasanie przez TTL kluczy)."""
+
+    def __init__(self, client, prefix='session:'):
+        self.client = client
+        self.prefix = prefix
+
+    def load(self, sid):
+        pipeline = self.client.pipeline()
+        pipeline.get(self.prefix + sid)
+        pipeline.ttl(self.prefix + sid)
+        data, ttl = pipeline.execute()
+        if data is None:
+            return None
+        return data.decode('utf-8') if isinstance(data, bytes) else data, time.time() + max(ttl, 0)
+
+    def save(self, sid, data, expires_at):
+        self.client.set(self.prefix + sid, data, ex=max(int(expires_at - time.time()), 1))
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def purge_expired(self):
+        return 0
+
+
+class _SerializingStore:
+    """Serializacja danych sesji (format JSON z tagami, jak w sesjach Flask)."""
+
+    def __init__(self, store):
+        self.store = store
+        self.serializer = TaggedJSONSerializer()
+
+    def load(self, sid):
+        record = self.store.load(sid)
+        if record is None:
+            return None
+        data, expires_at = record
+        try:
+            return self.serializer.loads(data), expires_at
+        except ValueError:
+            logger.warning(f"Nieprawidłowe dane sesji {sid[:8]}... - sesja pominięta")
+            return None
+
+    def save(self, sid, data, expires_at):
+        self.store.save(sid, self.serializer.dumps(data), expires_at)
+
+    def delete(self, sid):
+        self.store.delete(sid)
+
+    def purge_expired(self):
+        return self.store.purge_expired()
+
+
+class ServerSessionInterface(SessionInterface):
+    """Interfejs sesji Flask zapisujący dane sesji w magazynie po stronie serwera."""
+
+    def __init__(self, store, cleanup_interval=600):
+        self.store = _SerializingStore(store)
+        self.cleanup_interval = cleanup_interval
+        self._cleanup_pid = None
+        self._cleanup_lock = threading.Lock()
+
+    def open_session(self, app, request):
+        self._ensure_cleanup()
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_PATTERN.match(sid):
+            return ServerSession(sid, self.store)
+        return ServerSession(self._new_sid(), self.store, new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Sesja nie była odczytywana - nic się nie zmieniło
+        if not session.loaded:
+            return
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session.data:
+            if not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        # Zapis przy zmianie danych lub gdy do wygaśnięcia została mniej niż połowa czasu życia
+        if not session.modified and session.expires_at and session.expires_at - now > lifetime / 2:
+            return
+
+        # Nowy identyfikator po zalogowaniu / wylogowaniu (ochrona przed utrwaleniem sesji)
+        if not session.new and session.data.get('_user_id') != session.loaded_user_id:
+            self.store.delete(session.sid)
+            session.sid = self._new_sid()
+
+        self.store.save(session.sid, dict(session.data), now + lifetime)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+    @staticmethod
+    def _new_sid():
+        return secrets.token_urlsafe(32)
+
+    def _ensure_cleanup(self):
+        """Uruchamia wątek usuwania wygasłych sesji (raz na proces, także po fork)."""
+        if self._cleanup_pid == os.getpid() or not self.cleanup_interval:
+            return
+        with self._cleanup_lock:
+            if self._cleanup_pid == os.getpid():
+                return
+            self._cleanup_pid = os.getpid()
+            threading.Thread(target=self._cleanup_loop, name='session-cleanup', daemon=True).start()
+
+    def _cleanup_loop(self):
+        while True:
+            time.sleep(self.cleanup_interval)
+            try:
+                removed = self.store.purge_expired()
+                if removed:
+                    logger.debug(f"Usunięto {removed} wygasłych sesji")
+            except Exception:
+                logger.exception("Błąd podczas usuwania wygasłych sesji")
+
+
+class ServerSessions:
+    """Wybór magazynu sesji na podstawie konfiguracji aplikacji."""
+
+    def init_app(self, app):
+        backend = app.config.get('SESSION_BACKEND', 'sqlite')
+        if backend == 'cookie':
+            return
+        if backend == 'sqlite':
+            store = SQLiteSessionStore(
+                app.config.get('SESSION_SQLITE_PATH') or os.path.join(app.instance_path, 'sessions.sqlite3')
+            )
+        elif backend == 'redis':
+            import redis
+            store = RedisSessionStore(redis.Redis.from_url(app.config['SESSION_REDIS_URL']))
+        else:
+            raise ValueError(f"Nieznany SESSION_BACKEND: {backend}")
+        app.session_interface = ServerSessionInterface(store, app.config.get('SESSION_CLEANUP_INTERVAL', 600))
+
+
+server_sessions = ServerSessions()
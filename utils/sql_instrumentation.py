@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pomiar zapytań SQL wykonywanych w trakcie pojedynczego żądania.
+
+Dla każdego żądania zliczane są zapytania i łączny czas ich wykonania,
+a zapytania o tym samym kształcie (ta sama treść SQL po pominięciu wartości)
+powtórzone co najmniej SQL_N_PLUS_ONE_THRESHOLD razy oznaczane są jako
+podejrzenie problemu N+1. Wyniki trafiają do nagłówka Server-Timing
+i do jednej linii logu (JSON) na żądanie.
+
+Konfiguracja:
+    SQL_INSTRUMENTATION: Włącza pomiar (domyślnie True)
+    SQL_SERVER_TIMING: Dodaje nagłówek Server-Timing (domyślnie True)
+    SQL_N_PLUS_ONE_THRESHOLD: Liczba powtórzeń kształtu zapytania (domyślnie 5)
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAMETER_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+
+
+def statement_shape(statement):
+    """
+    Zwraca kształt zapytania - treść SQL bez wartości literałów, ze zwiniętymi
+    listami parametrów IN (...) i znormalizowanymi odstępami.
+    """
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PARAMETER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class RequestQueryStats:
+    """Liczniki zapytań SQL jednego żądania."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def suspected_n_plus_one(self, threshold):
+        """Zwraca listę (kształt zapytania, liczba wykonań) powtórzonych co najmniej threshold razy."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class SqlInstrumentation:
+    """
+    Rejestruje zdarzenia silnika SQLAlchemy i obsługę żądań Flask.
+
+    Zapytania wykonywane poza żądaniem (np. w wątkach kolejki ingest_queue)
+    nie są liczone.
+    """
+
+    DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+    def __init__(self):
+        self.n_plus_one_threshold = self.DEFAULT_N_PLUS_ONE_THRESHOLD
+        self.server_timing = True
+
+    def init_app(self, app, engine=None):
+        """
+        Args:
+            app: Aplikacja Flask
+            engine: Silnik SQLAlchemy (domyślnie silnik rozszerzenia Flask-SQLAlchemy)
+        """
+        if not app.config.get('SQL_INSTRUMENTATION', True):
+            return
+        self.n_plus_one_threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', self.DEFAULT_N_PLUS_ONE_THRESHOLD)
+        self.server_timing = app.config.get('SQL_SERVER_TIMING', True)
+
+        if engine is None:
+            with app.app_context():
+                engine = app.extensions['sqlalchemy'].engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        # Pomiar zaczyna się przed innymi funkcjami before_request (np. wczytaniem
+        # tożsamości przez Flask-Principal), aby objąć także ich zapytania
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def current_stats():
+        """Zwraca liczniki bieżącego żądania lub None poza żądaniem."""
+        if not has_request_context():
+            return None
+        return g.get('sql_stats')
+
+    def _start_request(self):
+        g.sql_stats = RequestQueryStats()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self.current_stats() is not None:
+            context._sql_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = self.current_stats()
+        started = getattr(context, '_sql_started', None)
+        if stats is not None and started is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+    def _finish_request(self, response):
+        stats = self.current_stats()
+        if stats is None or request.endpoint == 'static':
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.duration * 1000
+        suspected = stats.suspected_n_plus_one(self.n_plus_one_threshold)
+
+        if self.server_timing:
+            timings = [
+                f'db;dur={db_ms:.2f};desc="SQL ({stats.count})"',
+                f'app;dur={total_ms:.2f}'
+            ]
+            if suspected:
+                timings.append(f'n-plus-one;desc="{len(suspected)}"')
+            response.headers.add('Server-Timing', ', '.join(timings))
+
+        entry = {
+            'event': 'request_sql',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'db_queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'n_plus_one': [{'count': count, 'statement': shape[:300]} for shape, count in suspected]
+        }
+        if suspected:
+            logger.warning(json.dumps(entry, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(entry, ensure_ascii=False))
+        return response
+
+
+sql_instrumentation = SqlInstrumentation()
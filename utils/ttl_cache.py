@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prosta, bezpieczna wątkowo pamięć podręczna w procesie z czasem życia wpisów
+i usuwaniem najdawniej używanych wpisów po przekroczeniu limitu liczby wpisów.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Pamięć podręczna TTL + LRU.
+
+    Args:
+        ttl: Czas życia wpisu w sekundach
+        max_entries: Maksymalna liczba wpisów
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Zwraca wartość dla klucza lub default, jeśli wpis nie istnieje albo wygasł."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Zapisuje wartość (opcjonalnie z innym czasem życia niż domyślny)."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """
+        Zwraca wartość z pamięci lub wylicza ją przez factory() i zapamiętuje.
+
+        Wartość wyliczana jest poza blokadą - równoległe wywołania mogą ją
+        policzyć kilka razy, ale nie blokują się nawzajem.
+        """
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
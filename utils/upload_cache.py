@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Odcisk treści (SHA-256) przesyłanych plików i pamięć podręczna wyników ich przetwarzania.
+
+Odcisk liczony jest w trakcie czytania strumienia pliku, więc nie wymaga
+dodatkowego przebiegu po danych. Wyniki przetwarzania (podsumowanie, plan
+mapowania, analiza LOT, podgląd wierszy) przechowywane są w pamięci procesu
+pod odciskiem pliku, z usuwaniem najdawniej używanych wpisów po przekroczeniu
+limitu rozmiaru.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class HashingReader:
+    """
+    Obiekt plikopodobny liczący SHA-256 z danych odczytanych przez konsumenta
+    (np. shutil.copyfileobj, pandas.read_csv).
+    """
+
+    def __init__(self, file_obj):
+        self._file = file_obj
+        self._hash = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        if data:
+            self._hash.update(data)
+            self.bytes_read += len(data)
+        return data
+
+    def readable(self):
+        return True
+
+    def __iter__(self):
+        return iter(lambda: self.read(READ_CHUNK_SIZE), b'')
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def sha256_stream(file_obj):
+    """
+    Liczy SHA-256 strumienia z możliwością przewijania i przewija go na początek.
+
+    Returns:
+        str: Odcisk w postaci szesnastkowej
+    """
+    reader = HashingReader(file_obj)
+    file_obj.seek(0)
+    while reader.read(READ_CHUNK_SIZE):
+        pass
+    file_obj.seek(0)
+    return reader.hexdigest()
+
+
+class ParseResultCache:
+    """
+    Pamięć podręczna LRU wyników przetwarzania plików ograniczona rozmiarem w bajtach.
+
+    Kluczem jest odcisk pliku razem z ID rekordu pliku (DeliveryFileData),
+    z którego pochodzi wynik - ten sam plik przesłany przez różnych dostawców
+    ma osobne wpisy, a usunięcie rekordu w bazie unieważnia wpis bez
+    dodatkowej synchronizacji.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get('PARSE_CACHE_MAX_BYTES', self.DEFAULT_MAX_BYTES)
+
+    def get(self, content_hash, file_data_id):
+        """Zwraca zapamiętany wynik dla pliku lub None."""
+        key = (content_hash, file_data_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[0])
+
+    def put(self, content_hash, file_data_id, processed_data):
+        """
+        Zapamiętuje wynik przetwarzania pliku.
+
+        Wynik przechowywany jest jako JSON - odczyt zwraca niezależną kopię,
+        a rozmiar wpisu jest znany dokładnie. Wpisy większe niż cały limit
+        nie są zapamiętywane.
+        """
+        payload = json.dumps(processed_data, default=str, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+
+        key = (content_hash, file_data_id)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (payload, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+        return True
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+parse_cache = ParseResultCache()
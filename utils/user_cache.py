@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pamięć podręczna użytkowników dla Flask-Login (user_loader).
+
+Wpisy przechowują wartości kolumn wiersza użytkownika (dostawcy, pracownika
+lub danych logowania) i są kluczowane jego ID (SUP/..., STF/..., ADM/...).
+Każde odczytanie zwraca nową, odłączoną od sesji kopię obiektu - żądania nie
+współdzielą instancji, a dodanie kopii do sesji (db.session.add) pozwala ją
+normalnie zmodyfikować i zapisać.
+
+Wpis usuwany jest po zatwierdzeniu transakcji, która zmieniła lub usunęła
+wiersz użytkownika przez ORM. Zmiany wykonane poza ORM (query.update(),
+surowy SQL) lub w innym procesie widoczne są najpóźniej po USER_CACHE_TTL
+sekundach.
+
+Konfiguracja:
+    USER_CACHE_TTL: Czas życia wpisu w sekundach (domyślnie 60, 0 wyłącza pamięć)
+    USER_CACHE_MAX_ENTRIES: Maksymalna liczba wpisów (domyślnie 10000)
+"""
+
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from utils.ttl_cache import TTLCache
+
+
+class UserCache:
+    """Pamięć podręczna TTL + LRU użytkowników z unieważnianiem po zatwierdzeniu zmian."""
+
+    DEFAULT_TTL = 60
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._cache = TTLCache(ttl=self.DEFAULT_TTL, max_entries=self.DEFAULT_MAX_ENTRIES)
+        self._models = ()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, session, models):
+        """
+        Args:
+            app: Aplikacja Flask
+            session: Sesja (lub scoped_session), której zatwierdzenia unieważniają wpisy
+            models: Klasy modeli użytkowników przechowywanych w pamięci
+        """
+        self._cache.ttl = app.config.get('USER_CACHE_TTL', self.DEFAULT_TTL)
+        self._cache.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', self.DEFAULT_MAX_ENTRIES)
+        self._models = tuple(models)
+        event.listen(session, 'before_flush', self._before_flush)
+        event.listen(session, 'after_commit', self._after_commit)
+
+    def load(self, user_id, loader):
+        """
+        Zwraca odłączoną kopię użytkownika o podanym ID.
+
+        Args:
+            user_id: ID użytkownika (klucz wpisu)
+            loader: Funkcja loader(user_id) pobierająca użytkownika z bazy (lub None)
+        """
+        if not self._cache.ttl:
+            return loader(user_id)
+
+        entry = self._cache.get(user_id)
+        if entry is None:
+            generation = self._generation
+            user = loader(user_id)
+            if user is None:
+                return None
+            entry = self._snapshot(user)
+            # Nie zapisuj wiersza odczytanego przed unieważnieniem wykonanym w międzyczasie
+            with self._lock:
+                if generation == self._generation:
+                    self._cache.set(user_id, entry)
+        return self._detached_copy(*entry)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._cache.delete(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+    @staticmethod
+    def _snapshot(user):
+        mapper = inspect(user).mapper
+        return type(user), {attribute.key: getattr(user, attribute.key) for attribute in mapper.column_attrs}
+
+    @staticmethod
+    def _detached_copy(model, values):
+        user = inspect(model).class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return user
+
+    def _before_flush(self, session, flush_context, instances):
+        changed = session.info.setdefault('user_cache_changed', set())
+        for instance in list(session.dirty) + list(session.deleted):
+            if isinstance(instance, self._models):
+                identity = inspect(instance).identity
+                if identity:
+                    changed.add(str(identity[0]))
+
+    def _after_commit(self, session):
+        # Identyfikatory z wycofanych zapisów też są unieważniane - zbędne unieważnienie
+        # kosztuje tylko jedno zapytanie, a pominięte zostawiłoby nieaktualny wpis
+        for user_id in session.info.pop('user_cache_changed', ()):
+            self.invalidate(user_id)
+
+
+user_cache = UserCache()